@@ -0,0 +1,58 @@
+"""Measure the memory used by many devices created with ``setup_device``.
+
+Run from the repository root::
+
+    python benchmarks/memory.py [devices]
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from womgr.entities import DeviceRegistry, setup_device  # noqa: E402
+
+
+def measure(count: int) -> tuple[int, int]:
+    """Return the bytes allocated for ``count`` devices with and without a registry."""
+    results = []
+    for with_registry in (False, True):
+        gc.collect()
+        tracemalloc.start()
+        registry = DeviceRegistry() if with_registry else None
+        devices = [
+            setup_device(
+                f"device {i}",
+                "02:00:%02x:%02x:%02x:%02x"
+                % (i >> 24 & 255, i >> 16 & 255, i >> 8 & 255, i & 255),
+                f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+                f"rack {i % 50}",
+                "linux" if i % 3 else "windows",
+                entry_id=f"entry{i}",
+                registry=registry,
+            )
+            for i in range(count)
+        ]
+        gc.collect()
+        current, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(current)
+        del devices, registry
+    return results[0], results[1]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    devices, registered = measure(count)
+    print(f"{count} devices: {devices / 1024 / 1024:.1f} MiB "
+          f"({devices / count:.0f} bytes per device)")
+    print(f"with registry: {registered / 1024 / 1024:.1f} MiB "
+          f"({registered / count:.0f} bytes per device)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Measure import time and setup cost of the integration.
+
+Run from the repository root::
+
+    python benchmarks/startup.py [devices]
+
+Home Assistant is replaced by the same kind of minimal stubs the tests
+use, so the numbers cover the integration's own code only. Import times
+come from ``python -X importtime`` in a fresh interpreter per module. The
+setup benchmark times ``async_setup`` and ``async_setup_entry`` of a hub
+holding ``devices`` devices; work deferred until Home Assistant has
+started (REST views, panel and dashboard cards) is not included.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODULES = (
+    "womgr",
+    "custom_components.womgr",
+    "custom_components.womgr.dashboard",
+    "custom_components.womgr.api",
+)
+
+
+def install_stubs() -> None:
+    """Register minimal ``homeassistant`` modules for importing the integration."""
+    modules = {}
+
+    def module(name: str, **attrs) -> types.ModuleType:
+        mod = modules[name] = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        return mod
+
+    class View:
+        def __init__(self, hass=None):
+            pass
+
+    registry = SimpleNamespace(
+        async_get_or_create=lambda **kw: SimpleNamespace(id="device"),
+        async_update_device=lambda *a, **kw: None,
+    )
+    module("homeassistant")
+    module("homeassistant.config_entries", ConfigEntry=object, ConfigFlow=object)
+    module("homeassistant.core", HomeAssistant=object, callback=lambda func: func)
+    module("homeassistant.const", EVENT_HOMEASSISTANT_STOP="homeassistant_stop")
+    module("homeassistant.helpers")
+    module("homeassistant.helpers.typing", ConfigType=dict)
+    module("homeassistant.helpers.device_registry", async_get=lambda hass: registry)
+    module("homeassistant.helpers.start", async_at_started=lambda hass, job: lambda: None)
+    module("homeassistant.components")
+    module("homeassistant.components.http", HomeAssistantView=View)
+    module("homeassistant.components.lovelace")
+    module(
+        "homeassistant.components.lovelace.const",
+        CONF_ALLOW_SINGLE_WORD="allow_single_word",
+        CONF_ICON="icon",
+        CONF_TITLE="title",
+        CONF_URL_PATH="url_path",
+    )
+    module(
+        "homeassistant.components.lovelace.dashboard",
+        DashboardsCollection=object,
+        LovelaceStorage=object,
+        ConfigNotFound=Exception,
+    )
+    for name, mod in modules.items():
+        sys.modules.setdefault(name, mod)
+
+
+def import_time(module: str) -> float | None:
+    """Return the cumulative import time of ``module`` in ms, or ``None``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--import", module],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return None
+
+
+def _device(i: int) -> dict:
+    return {
+        "device_name": f"device {i}",
+        "mac": "02:00:%02x:%02x:%02x:%02x"
+        % (i >> 24 & 255, i >> 16 & 255, i >> 8 & 255, i & 255),
+        "ip": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+        "location": f"rack {i % 50}",
+        "os_type": "linux" if i % 3 else "windows",
+    }
+
+
+async def _setup(count: int) -> tuple[float, float]:
+    import custom_components.womgr as integration
+    from custom_components.womgr.const import CONF_DEVICES
+
+    async def forward(entry, platforms):
+        pass
+
+    hass = SimpleNamespace(
+        data={},
+        services=SimpleNamespace(async_register=lambda *a, **kw: None),
+        bus=SimpleNamespace(async_listen_once=lambda *a: None),
+        config_entries=SimpleNamespace(
+            async_forward_entry_setups=forward, async_get_entry=lambda entry_id: None
+        ),
+    )
+    entry = SimpleNamespace(
+        entry_id="hub",
+        data={CONF_DEVICES: {f"device{i}": _device(i) for i in range(count)}},
+        async_on_unload=lambda func: None,
+        add_update_listener=lambda listener: lambda: None,
+    )
+    start = time.perf_counter()
+    await integration.async_setup(hass, {})
+    setup = time.perf_counter() - start
+    start = time.perf_counter()
+    await integration.async_setup_entry(hass, entry)
+    return setup, time.perf_counter() - start
+
+
+def setup_time(count: int) -> tuple[float, float]:
+    """Return the seconds taken by ``async_setup`` and ``async_setup_entry``."""
+    install_stubs()
+    return asyncio.run(_setup(count))
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--import"]:
+        install_stubs()
+        __import__(sys.argv[2])
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for module in MODULES:
+        elapsed = import_time(module)
+        if elapsed is None:
+            print(f"import {module}: skipped (import failed)")
+        else:
+            print(f"import {module}: {elapsed:.1f} ms")
+    setup, setup_entry = setup_time(count)
+    print(f"async_setup: {setup * 1000:.1f} ms")
+    print(f"async_setup_entry with {count} devices: {setup_entry * 1000:.1f} ms "
+          f"({setup_entry / count * 1e6:.0f} us per device)")
+
+
+if __name__ == "__main__":
+    main()
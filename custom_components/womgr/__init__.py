@@ -7,163 +7,87 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 import asyncio
 import os
-from homeassistant.components.lovelace.const import (
-    CONF_ALLOW_SINGLE_WORD,
-    CONF_ICON,
-    CONF_TITLE,
-    CONF_URL_PATH,
-)
-from homeassistant.components.http import StaticPathConfig
-from .api import DevicesView, ExportView, ImportView
-from homeassistant.components.lovelace.dashboard import (
-    DashboardsCollection,
-    LovelaceStorage,
-)
-from homeassistant.helpers import device_registry as dr
 
-from .core import setup_device, remove_device
-from .womgr import pastel_color
+import voluptuous as vol
+
+from .const import (
+    CONF_DEVICES,
+    CONF_PASSIVE_LIVENESS,
+    CONF_PROBE_BACKEND,
+    DATA_CONFIG,
+    DATA_HUB,
+    DATA_PLATFORMS,
+    DEFAULT_PASSIVE_LIVENESS,
+    DEFAULT_PROBE_BACKEND,
+    DOMAIN,
+)
 
-from .const import DOMAIN
+# Modules for the REST API, dashboards and device handling are imported
+# where they are first used, so loading the integration stays cheap.
 
 PLATFORMS: list[str] = ["switch", "binary_sensor", "button"]
 
+# Entry data used by the integration itself rather than setup_device
+_INTEGRATION_ONLY_KEYS = ("dashboard", "icon", "area")
 
-# Lock used to serialize dashboard modifications
-_dashboard_lock = asyncio.Lock()
-
-
-async def _async_update_dashboard(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Ensure a HaWoManager dashboard exists and contains the device card."""
-    if not entry.data:
-        return
-    lovelace = hass.data.get("lovelace")
-    if not lovelace:
-        return
-
-    from homeassistant.components.lovelace.dashboard import ConfigNotFound
-
-    dashboards: dict = getattr(lovelace, "dashboards", lovelace.get("dashboards", {}))
-    dashboards_collection: DashboardsCollection = getattr(
-        lovelace, "dashboards_collection", lovelace.get("dashboards_collection")
-    )
-
-    if dashboards_collection is None:
-        return
 
-    view_path = entry.data.get("dashboard") or "womgr"
-
-    async with _dashboard_lock:
-        if view_path not in dashboards:
-            await dashboards_collection.async_create_item(
-                {
-                    CONF_ALLOW_SINGLE_WORD: True,
-                    CONF_ICON: "mdi:server-network",
-                    CONF_TITLE: "HaWoManager",
-                    CONF_URL_PATH: view_path,
-                }
-            )
+def _probe_backend(value):
+    """Validate a probe backend name, importing the backends only when set."""
+    from .womgr.probe import PROBE_BACKENDS
 
-        dashboard: LovelaceStorage = dashboards[view_path]
-
-        try:
-            config = await dashboard.async_load(False)
-        except Exception as exc:  # ConfigNotFound in tests
-            if exc.__class__.__name__ == "ConfigNotFound":
-                config = {"views": []}
-            else:
-                raise
-
-        view = next((v for v in config.get("views", []) if v.get("path") == view_path), None)
-        color = entry.data.get("color") or pastel_color(entry.data["device_name"])
-        hash_tag = f"#{view_path}-{entry.data['device_name']}"
-        card = {
-            "type": "vertical-stack",
-            "title": entry.data["device_name"],
-            "cards": [
-                {
-                    "type": "custom:bubble-card",
-                    "card_type": "pop-up",
-                    "hash": hash_tag,
-                    "cards": [
-                        {"type": "entity", "entity": f"binary_sensor.{entry.data['device_name']}_ping"},
-                        {"type": "entity", "entity": f"switch.{entry.data['device_name']}_wake"},
-                        {"type": "button", "entity": f"button.{entry.data['device_name']}_restart"},
-                        {"type": "button", "entity": f"button.{entry.data['device_name']}_shutdown"},
-                    ],
-                },
-                {
-                    "type": "custom:bubble-card",
-                    "card_type": "button",
-                    "name": entry.data["device_name"],
-                    "icon": "mdi:server-network",
-                    "tap_action": {"action": "navigate", "navigation_path": hash_tag},
-                    "show_state": False,
-                    **({"style": f"ha-card {{ background-color: {color}; }}"}),
-                },
-            ],
-        }
-
-        if view is None:
-            view = {"path": view_path, "title": "HaWoManager", "cards": [card]}
-            config.setdefault("views", []).append(view)
-        else:
-            view.setdefault("cards", [])
-            for idx, existing in enumerate(view["cards"]):
-                if existing.get("title") == entry.data["device_name"]:
-                    view["cards"][idx] = card
-                    break
-            else:
-                view["cards"].append(card)
-
-        await dashboard.async_save(config)
-
-
-async def _async_remove_dashboard_card(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Remove the card for a device when the entry is unloaded."""
-    if not entry.data:
-        return
-    lovelace = hass.data.get("lovelace")
-    if not lovelace:
-        return
+    return vol.In(list(PROBE_BACKENDS))(value)
 
-    from homeassistant.components.lovelace.dashboard import ConfigNotFound
 
-    dashboards: dict = getattr(lovelace, "dashboards", lovelace.get("dashboards", {}))
-    view_path = entry.data.get("dashboard") or "womgr"
-    if view_path not in dashboards:
-        return
-
-    async with _dashboard_lock:
-        dashboard: LovelaceStorage = dashboards[view_path]
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(
+                    CONF_PROBE_BACKEND, default=DEFAULT_PROBE_BACKEND
+                ): _probe_backend,
+                vol.Optional(
+                    CONF_PASSIVE_LIVENESS, default=DEFAULT_PASSIVE_LIVENESS
+                ): bool,
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
 
-        try:
-            config = await dashboard.async_load(False)
-        except Exception as exc:  # ConfigNotFound in tests
-            if exc.__class__.__name__ == "ConfigNotFound":
-                return
-            raise
 
-        view = next((v for v in config.get("views", []) if v.get("path") == view_path), None)
-        if view is None:
-            return
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the WoMgr component from YAML."""
+    from homeassistant.helpers.start import async_at_started
 
-        cards = view.get("cards", [])
-        view["cards"] = [c for c in cards if c.get("title") != entry.data["device_name"]]
+    from .core import DeviceRegistry
+    from .services import async_setup_services
 
-        await dashboard.async_save(config)
+    hass.data.setdefault(DOMAIN, DeviceRegistry())
+    hass.data[DATA_CONFIG] = config.get(DOMAIN, {})
+    async_setup_services(hass)
+    async_at_started(hass, _async_register_frontend)
+    return True
 
 
-async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
-    """Set up the WoMgr component from YAML."""
-    hass.data.setdefault(DOMAIN, {})
+async def _async_register_frontend(hass: HomeAssistant) -> None:
+    """Register the REST API and the management panel once HA has started."""
+    from homeassistant.components import frontend
 
-    panel_path = os.path.join(os.path.dirname(__file__), "www", "panel.html")
-    await hass.http.async_register_static_paths(
-        [StaticPathConfig("/womgr-panel", panel_path, False)]
+    from .api import (
+        BatchView,
+        DashboardView,
+        DeviceEventsView,
+        DevicesView,
+        ExportView,
+        ImportView,
+        JobsView,
+        JobView,
+        PanelView,
+        WakeManyView,
     )
-    from homeassistant.components import frontend
 
+    panel_path = os.path.join(os.path.dirname(__file__), "www", "panel.html")
+    hass.http.register_view(PanelView(hass, panel_path))
     frontend.async_register_built_in_panel(
         hass,
         "iframe",
@@ -176,39 +100,260 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.http.register_view(DevicesView(hass))
     hass.http.register_view(ExportView(hass))
     hass.http.register_view(ImportView(hass))
-    return True
+    hass.http.register_view(WakeManyView(hass))
+    hass.http.register_view(BatchView(hass))
+    hass.http.register_view(DeviceEventsView(hass))
+    hass.http.register_view(JobsView(hass))
+    hass.http.register_view(JobView(hass))
+    hass.http.register_view(DashboardView(hass))
+
+
+def _async_add_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_id: str, data: dict
+) -> None:
+    """Create the device ``device_id`` of ``entry`` from its configuration."""
+    from homeassistant.helpers import device_registry as dr
+
+    from .core import setup_device
+    from .feed import publish_device
+    from .util import parse_ports
+
+    setup_args = {k: v for k, v in data.items() if k not in _INTEGRATION_ONLY_KEYS}
+    if "service_ports" in setup_args:
+        setup_args["service_ports"] = parse_ports(setup_args["service_ports"]) or None
+    setup_device(**setup_args, entry_id=device_id, registry=hass.data[DOMAIN])
+    publish_device(hass, device_id)
+    dev_reg = dr.async_get(hass)
+    device = dev_reg.async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, device_id)},
+        name=data.get("device_name"),
+        manufacturer="HaWoManager",
+        model=data.get("os_type"),
+    )
+    if area := data.get("area"):
+        dev_reg.async_update_device(device.id, area_id=area)
+
+
+async def _async_remove_device(
+    hass: HomeAssistant, device_id: str, data: dict, remove_card: bool = True
+) -> None:
+    """Remove the loaded device ``device_id`` and, optionally, its dashboard card."""
+    from .core import remove_device
+    from .dashboard import async_remove_card
+    from .feed import publish_device
+
+    config = hass.data[DOMAIN].pop(device_id, None)
+    if config:
+        remove_device(config)
+        publish_device(hass, device_id)
+        if remove_card:
+            await async_remove_card(hass, data)
+
+
+def _async_sync_cards(hass: HomeAssistant, entry: ConfigEntry, device_ids) -> None:
+    """Write the dashboard cards of ``device_ids`` once HA has started."""
+    from homeassistant.helpers.start import async_at_started
+
+    from .dashboard import async_update_card
+    from .hub import device_data
+
+    device_ids = set(device_ids)
+    if not device_ids:
+        return
+
+    async def sync_cards(hass: HomeAssistant) -> None:
+        # Cards of all devices set up during startup go out in one batch
+        await asyncio.gather(
+            *(
+                async_update_card(hass, data)
+                for device_id, data in device_data(entry)
+                if device_id in device_ids and device_id in hass.data[DOMAIN]
+            )
+        )
+
+    async_at_started(hass, sync_cards)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up WoMgr from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+    from .core import DeviceRegistry
+    from .hub import device_data, is_hub
+
+    hass.data.setdefault(DOMAIN, DeviceRegistry())
     if not entry.data:
         # Base configuration entry, nothing to set up yet
         return True
 
-    setup_args = {k: v for k, v in entry.data.items() if k != "dashboard"}
-    hass.data[DOMAIN][entry.entry_id] = setup_device(**setup_args)
-    dev_reg = dr.async_get(hass)
-    device = dev_reg.async_get_or_create(
-        config_entry_id=entry.entry_id,
-        identifiers={(DOMAIN, entry.entry_id)},
-        name=entry.data.get("device_name"),
-        manufacturer="HaWoManager",
-        model=entry.data.get("os_type"),
-    )
-    if area := entry.data.get("area"):
-        dev_reg.async_update_device(device.id, area_id=area)
+    devices = dict(device_data(entry))
+    for device_id, data in devices.items():
+        _async_add_device(hass, entry, device_id, data)
+    if is_hub(entry):
+        hass.data.setdefault(DATA_HUB, {})[entry.entry_id] = dict(devices)
+        # Devices merged into the hub from here on, e.g. by entries migrated
+        # while the platforms are set up, are picked up by the listener
+        entry.async_on_unload(entry.add_update_listener(_async_hub_updated))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    hass.async_create_task(_async_update_dashboard(hass, entry))
+    if is_hub(entry):
+        _async_adopt_entries(hass, entry, devices)
+    _async_sync_cards(hass, entry, devices)
     return True
 
 
+async def _async_hub_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changes to the device table of the hub without reloading it.
+
+    Removed devices are deleted with their entities and added devices are
+    set up. Devices whose configuration changed are re-created, keeping
+    their entity registry entries.
+    """
+    from homeassistant.helpers import device_registry as dr
+    from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+    from .dashboard import view_path
+    from .hub import (
+        SIGNAL_DEVICE_CHANGED,
+        SIGNAL_DEVICE_REMOVED,
+        added_devices,
+        device_data,
+    )
+
+    loaded: dict = hass.data[DATA_HUB][entry.entry_id]
+    devices = dict(device_data(entry))
+    removed = {
+        device_id: loaded.pop(device_id)
+        for device_id in list(loaded)
+        if device_id not in devices
+    }
+    changed = {
+        device_id: old
+        for device_id, old in loaded.items()
+        if old != devices[device_id]
+    }
+
+    dev_reg = dr.async_get(hass)
+    for device_id in removed:
+        async_dispatcher_send(hass, SIGNAL_DEVICE_REMOVED.format(device_id))
+        device = dev_reg.async_get_device(identifiers={(DOMAIN, device_id)})
+        if device is not None:
+            dev_reg.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+    # The old entities must be gone before they are added again
+    removals: list = []
+    for device_id in changed:
+        async_dispatcher_send(hass, SIGNAL_DEVICE_CHANGED.format(device_id), removals)
+    await asyncio.gather(
+        *removals,
+        *(_async_remove_device(hass, device_id, data) for device_id, data in removed.items()),
+        *(
+            # A card stays in place unless the device moves to another card
+            _async_remove_device(
+                hass,
+                device_id,
+                old,
+                remove_card=(view_path(old), old.get("device_name"))
+                != (view_path(devices[device_id]), devices[device_id].get("device_name")),
+            )
+            for device_id, old in changed.items()
+        ),
+    )
+
+    added = [device_id for device_id in devices if device_id not in loaded]
+    updated = [*added, *changed]
+    for device_id in updated:
+        _async_add_device(hass, entry, device_id, devices[device_id])
+        loaded[device_id] = devices[device_id]
+    added_devices(hass, entry, [hass.data[DOMAIN][device_id] for device_id in updated])
+    _async_adopt_entries(hass, entry, added)
+    _async_sync_cards(hass, entry, updated)
+
+
+def _async_adopt_entries(hass: HomeAssistant, entry: ConfigEntry, device_ids) -> None:
+    """Remove the migrated entries of ``device_ids`` once the hub set them up.
+
+    Their entities are moved to the hub first, so removing the entries
+    keeps the entity registry entries and the devices.
+    """
+    migrated = [
+        device_id
+        for device_id in device_ids
+        if (other := hass.config_entries.async_get_entry(device_id)) is not None
+        and other is not entry
+        and not other.data
+    ]
+    if not migrated:
+        return
+
+    from homeassistant.helpers import entity_registry as er
+
+    ent_reg = er.async_get(hass)
+    for device_id in migrated:
+        for entity in er.async_entries_for_config_entry(ent_reg, device_id):
+            ent_reg.async_update_entity(entity.entity_id, config_entry_id=entry.entry_id)
+        hass.async_create_task(hass.config_entries.async_remove(device_id))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a WoMgr config entry."""
+    from .hub import device_data
+
     if entry.data:
         await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    config = hass.data[DOMAIN].pop(entry.entry_id, None)
-    if config:
-        remove_device(config)
-        await _async_remove_dashboard_card(hass, entry)
+    hass.data.get(DATA_HUB, {}).pop(entry.entry_id, None)
+    hass.data.get(DATA_PLATFORMS, {}).pop(entry.entry_id, None)
+    # Card removals of all devices are written in one batch
+    await asyncio.gather(
+        *(
+            _async_remove_device(hass, device_id, data)
+            for device_id, data in list(device_data(entry))
+        )
+    )
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Merge entries holding a single device into the hub entry.
+
+    The base entry becomes the hub. Without one, the first migrated
+    device entry is turned into the hub. Other device entries move their
+    device into the hub table, keeping their entry id as device id, and
+    are removed by the hub after it has set up their devices.
+    """
+    from .hub import get_hub
+
+    if entry.version >= 3:
+        return True
+    update = hass.config_entries.async_update_entry
+    if not entry.data:
+        update(entry, data={CONF_DEVICES: {}}, version=3)
+        return True
+
+    hub = get_hub(hass)
+    if hub is None:
+        hub = next(
+            (
+                other
+                for other in hass.config_entries.async_entries(DOMAIN)
+                if not other.data and other.version < 3
+            ),
+            None,
+        )
+        if hub is not None:
+            update(hub, data={CONF_DEVICES: {}}, version=3)
+    if hub is None:
+        update(
+            entry,
+            title="HaWoManager",
+            data={CONF_DEVICES: {entry.entry_id: dict(entry.data)}},
+            unique_id=DOMAIN,
+            version=3,
+        )
+        return True
+
+    update(
+        hub,
+        data={CONF_DEVICES: {**hub.data[CONF_DEVICES], entry.entry_id: dict(entry.data)}},
+    )
+    # Leave an empty entry behind that sets up nothing; the hub removes it
+    # once it has set up the device and taken over its entities
+    update(entry, data={}, version=3)
     return True
@@ -3,10 +3,110 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from .const import (
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_WAKE_PACKETS,
+    DEFAULT_WAKE_RETRY_INTERVAL,
+    DEFAULT_WAKE_TIMEOUT,
+    DOMAIN,
+    EVENT_STREAM_KEEPALIVE,
+    FAST_SCAN_INTERVAL,
+    MAX_PAGE_SIZE,
+    REFRESH_REUSE,
+    SNAPSHOT_MAX_AGE,
+)
+from .coordinator import get_coordinator
+from .dashboard import async_regenerate
+from .feed import device_state, get_device_index, get_feed, get_revisions
+from .hub import all_device_data
+from .jobs import get_job_manager
+from .services import (
+    REGENERATE_DASHBOARD_SCHEMA,
+    WAKE_MANY_SCHEMA,
+    async_wake_many,
+    select_devices,
+)
+from .womgr.feed import format_event
+from .womgr.entities import DeviceRegistry
+from .womgr.index import SORT_KEYS
+from .womgr.jobs import FAILED
+from .womgr.snapshot import Rendered, SnapshotCache
+from .womgr.wol import wake_and_confirm
+
+
+WAKE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("packets", default=DEFAULT_WAKE_PACKETS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10)
+        ),
+        vol.Optional("retry_interval", default=DEFAULT_WAKE_RETRY_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=60)
+        ),
+        vol.Optional("timeout", default=DEFAULT_WAKE_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+ACTIONS = ("wake", "restart", "shutdown", "refresh")
+
+BATCH_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive("items", "target"): [
+                vol.Schema(
+                    {
+                        vol.Required("entry_id"): str,
+                        vol.Required("action"): vol.In(ACTIONS),
+                    },
+                    extra=vol.ALLOW_EXTRA,
+                )
+            ],
+            vol.Exclusive("selector", "target"): {
+                vol.Optional("location"): str,
+                vol.Optional("os_type"): str,
+                vol.Optional("online"): bool,
+            },
+            vol.Optional("action"): vol.In(ACTIONS),
+            vol.Optional("concurrency", default=DEFAULT_BATCH_CONCURRENCY): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=64)
+            ),
+        },
+        extra=vol.ALLOW_EXTRA,
+    ),
+    vol.Any(
+        vol.Schema({vol.Required("items"): list}, extra=vol.ALLOW_EXTRA),
+        vol.Schema(
+            {vol.Required("selector"): dict, vol.Required("action"): str},
+            extra=vol.ALLOW_EXTRA,
+        ),
+        msg="either items or a selector and action are required",
+    ),
+)
+
+
+PAGE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("location"): str,
+        vol.Optional("os_type"): str,
+        vol.Optional("online"): vol.Boolean(),
+        vol.Optional("prefix"): str,
+        vol.Optional("sort", default="name"): vol.In(SORT_KEYS),
+        vol.Optional("order", default="asc"): vol.In(("asc", "desc")),
+        vol.Optional("limit", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): str,
+    }
+)
+PAGE_OPTIONS = tuple(str(key) for key in PAGE_SCHEMA.schema)
 
 
 class DevicesView(HomeAssistantView):
@@ -18,22 +118,93 @@ class DevicesView(HomeAssistantView):
 
     def __init__(self, hass: HomeAssistant) -> None:
         self.hass = hass
+        self._snapshot = SnapshotCache(self._build, max_age=SNAPSHOT_MAX_AGE)
+
+    def _build(self) -> list[dict[str, Any]]:
+        return [
+            device_state(entry_id, config)
+            for entry_id, config in self.hass.data.get(DOMAIN, {}).items()
+        ]
 
     async def get(self, request):
-        data = []
-        for entry_id, config in self.hass.data.get(DOMAIN, {}).items():
-            device = {
-                "entry_id": entry_id,
-                "device_name": config.device_name,
-                "mac": config.mac,
-                "ip": config.ip,
-                "os_type": config.os_type,
-            }
-            for entity in config.entities:
-                if entity.entity_id.endswith("_ping"):
-                    device["online"] = entity.is_on
-            data.append(device)
-        return self.json(data)
+        """Return the devices.
+
+        Without options every device is returned. ``?since=<revision>``
+        returns only the changes after that revision. Filter (``location``,
+        ``os_type``, ``online``, ``prefix``), ``sort``, ``order``, ``limit``
+        or ``cursor`` options return one page of matching devices.
+        """
+        revisions = get_revisions(self.hass)
+        headers = {"X-WoMgr-Revision": str(revisions.revision)}
+        query = request.query
+        if "since" in query:
+            return self._delta(query["since"], headers)
+        if any(option in query for option in PAGE_OPTIONS):
+            return self._page(query, headers)
+        return cached_response(
+            request, self._snapshot.get(revisions.revision), headers
+        )
+
+    def _delta(self, since: str, headers: dict[str, str]):
+        """Return the devices changed after ``since``.
+
+        A delta holds the changed ``devices`` and the ids of ``removed``
+        ones; ``full`` is set when ``since`` is too old for a delta and
+        every device is returned instead.
+        """
+        loaded = self.hass.data.get(DOMAIN, {})
+        revisions = get_revisions(self.hass)
+        try:
+            delta = revisions.since(int(since))
+        except ValueError:
+            return self.json({"error": "invalid revision"}, status_code=400)
+        if delta is None:
+            changed, removed = list(loaded), []
+        else:
+            changed, removed = delta
+        return self.json(
+            {
+                "revision": revisions.revision,
+                "full": delta is None,
+                "devices": [
+                    device_state(entry_id, loaded[entry_id])
+                    for entry_id in changed
+                    if entry_id in loaded
+                ],
+                "removed": removed,
+            },
+            headers=headers,
+        )
+
+    def _page(self, query, headers: dict[str, str]):
+        """Return one page of devices from the device index."""
+        try:
+            options = PAGE_SCHEMA(dict(query))
+            entry_ids, next_cursor, total = get_device_index(self.hass).query(
+                location=options.get("location"),
+                os_type=options.get("os_type"),
+                online=options.get("online"),
+                prefix=options.get("prefix"),
+                sort=options["sort"],
+                descending=options["order"] == "desc",
+                cursor=options.get("cursor"),
+                limit=options["limit"],
+            )
+        except (vol.Invalid, ValueError) as exc:
+            return self.json({"error": str(exc)}, status_code=400)
+        loaded = self.hass.data.get(DOMAIN, {})
+        return self.json(
+            {
+                "devices": [
+                    device_state(entry_id, loaded[entry_id])
+                    for entry_id in entry_ids
+                    if entry_id in loaded
+                ],
+                "next_cursor": next_cursor,
+                "total": total,
+            },
+            headers=headers,
+        )
 
     async def post(self, request):
         body: dict[str, Any] = await request.json()
@@ -44,23 +215,270 @@ class DevicesView(HomeAssistantView):
         config = self.hass.data.get(DOMAIN, {}).get(entry_id)
         if not config:
             return self.json({"error": "unknown device"}, status_code=404)
-        if action == "wake":
-            wol = next(e for e in config.entities if e.entity_id.endswith("_wol"))
-            for _ in range(3):
-                await self.hass.async_add_executor_job(wol.turn_on)
-                await asyncio.sleep(1)
-        elif action in ("restart", "shutdown"):
-            sys_entity = next(
-                e for e in config.entities if e.entity_id.endswith("_system")
-            )
-            func = getattr(sys_entity, action)
-            await self.hass.async_add_executor_job(func)
-        elif action == "refresh":
-            ping = next(e for e in config.entities if e.entity_id.endswith("_ping"))
-            await ping.update()
-        else:
+        if action not in ACTIONS:
             return self.json({"error": "unknown action"}, status_code=400)
-        return self.json({"success": True})
+        try:
+            options = WAKE_SCHEMA(body) if action == "wake" else {}
+        except vol.Invalid as exc:
+            return self.json({"error": str(exc)}, status_code=400)
+        job = get_job_manager(self.hass).submit(
+            action,
+            entry_id,
+            lambda job: async_run_action(self.hass, config, action, options, job),
+            reuse=REFRESH_REUSE if action == "refresh" else 0.0,
+        )
+        return self.json(job.as_dict(), status_code=202)
+
+
+async def async_run_action(
+    hass: HomeAssistant, config, action: str, options: dict[str, Any], job=None
+) -> dict[str, Any]:
+    """Run ``action`` against a device and return the job result.
+
+    A wake ``job`` gives up its worker once the packets are sent, so
+    waiting for the device does not hold up other jobs.
+    """
+    coordinator = get_coordinator(hass)
+    if action == "wake":
+        on_sent = None
+        if job is not None:
+            on_sent = lambda: get_job_manager(hass).release(job)  # noqa: E731
+        return await _async_wake(hass, config, options, on_sent)
+    if action in ("restart", "shutdown"):
+        await hass.async_add_executor_job(getattr(config.system, action))
+        coordinator.boost_entry(config)
+        return {"success": True}
+    return {"online": await coordinator.async_refresh(config.ping)}
+
+
+async def _async_wake(
+    hass: HomeAssistant, config, options: dict[str, Any], on_sent=None
+) -> dict[str, Any]:
+    """Wake a device and wait until it answers."""
+    ping = config.ping
+    coordinator = get_coordinator(hass)
+    coordinator.boost_entry(config)
+    result = await wake_and_confirm(
+        config.wol,
+        lambda: coordinator.async_refresh(ping),
+        packets=options["packets"],
+        retry_interval=options["retry_interval"],
+        poll_interval=FAST_SCAN_INTERVAL,
+        timeout=options["timeout"],
+        on_sent=on_sent,
+    )
+    if result["online"]:
+        ping.last_wake_duration = result["wake_to_online"]
+    return result
+
+
+def _matches(config, selector: dict[str, Any]) -> bool:
+    if "location" in selector and config.location != selector["location"]:
+        return False
+    if "os_type" in selector and config.os_type != selector["os_type"]:
+        return False
+    if "online" in selector:
+        if config.ping is None or config.ping.is_on != selector["online"]:
+            return False
+    return True
+
+
+def _selector_candidates(loaded, selector: dict[str, Any]):
+    """Return ``(entry_id, config)`` pairs that may match ``selector``."""
+    if "location" in selector and isinstance(loaded, DeviceRegistry):
+        return [
+            (config.entry_id, config)
+            for config in loaded.by_location(selector["location"])
+        ]
+    return loaded.items()
+
+
+class DeviceEventsView(HomeAssistantView):
+    """Server-sent event stream of device state changes and job progress."""
+
+    url = "/api/womgr/devices/events"
+    name = "api:womgr:devices:events"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(self, request):
+        from aiohttp import web
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+        feed = get_feed(self.hass)
+        queue = feed.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+                if event is None:
+                    break
+                await response.write(format_event(*event))
+        except ConnectionResetError:
+            pass
+        finally:
+            feed.unsubscribe(queue)
+        return response
+
+
+class BatchView(HomeAssistantView):
+    """View to run actions on many devices in one request.
+
+    Every item is submitted as a background job, sharing a running job
+    for the same action and device, and the response lists the jobs.
+    At most ``concurrency`` jobs of one batch run at a time.
+    """
+
+    url = "/api/womgr/devices/batch"
+    name = "api:womgr:devices:batch"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def post(self, request):
+        try:
+            data = BATCH_SCHEMA(await request.json())
+        except vol.Invalid as exc:
+            return self.json({"error": str(exc)}, status_code=400)
+        loaded = self.hass.data.get(DOMAIN, {})
+        if "items" in data:
+            items = data["items"]
+        else:
+            items = [
+                {**data, "entry_id": entry_id}
+                for entry_id, config in _selector_candidates(loaded, data["selector"])
+                if _matches(config, data["selector"])
+            ]
+        limit = asyncio.Semaphore(data["concurrency"])
+        results = [self._submit_item(loaded, item, limit) for item in items]
+        return self.json({"results": results}, status_code=202)
+
+    def _submit_item(
+        self, loaded, item: dict[str, Any], limit: asyncio.Semaphore
+    ) -> dict[str, Any]:
+        entry_id = item["entry_id"]
+        action = item["action"]
+        result: dict[str, Any] = {"entry_id": entry_id, "action": action}
+        config = loaded.get(entry_id)
+        if config is None:
+            return {**result, "status": FAILED, "error": "unknown device"}
+        try:
+            options = WAKE_SCHEMA(item) if action == "wake" else {}
+        except vol.Invalid as exc:
+            return {**result, "status": FAILED, "error": str(exc)}
+        job = get_job_manager(self.hass).submit(
+            action,
+            entry_id,
+            lambda job: async_run_action(self.hass, config, action, options, job),
+            reuse=REFRESH_REUSE if action == "refresh" else 0.0,
+            limit=limit,
+        )
+        return {**result, **job.as_dict()}
+
+
+class JobsView(HomeAssistantView):
+    """View listing recent background jobs."""
+
+    url = "/api/womgr/jobs"
+    name = "api:womgr:jobs"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(self, request):
+        jobs = get_job_manager(self.hass).jobs()
+        status = request.query.get("status")
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+        return self.json([job.as_dict() for job in jobs])
+
+
+class JobView(HomeAssistantView):
+    """View reporting the state of a background job."""
+
+    url = "/api/womgr/jobs/{job_id}"
+    name = "api:womgr:job"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def get(self, request, job_id: str):
+        job = get_job_manager(self.hass).get(job_id)
+        if job is None:
+            return self.json({"error": "unknown job"}, status_code=404)
+        return self.json(job.as_dict())
+
+
+class WakeManyView(HomeAssistantView):
+    """View to wake a selection of devices in one staggered batch.
+
+    The batch runs as a background job whose result reports the progress
+    of the last completed device until every device has been woken.
+    """
+
+    url = "/api/womgr/wake"
+    name = "api:womgr:wake"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def post(self, request):
+        try:
+            data = WAKE_MANY_SCHEMA(await request.json())
+        except vol.Invalid as exc:
+            return self.json({"error": str(exc)}, status_code=400)
+        entries = select_devices(
+            self.hass, data["devices"], data.get("location"), data.get("group")
+        )
+        if not entries:
+            return self.json({"error": "no matching devices"}, status_code=404)
+        manager = get_job_manager(self.hass)
+
+        async def run(job) -> dict[str, Any]:
+            results = await async_wake_many(
+                self.hass,
+                entries,
+                data["stagger"],
+                data["concurrency"],
+                data["repeat"],
+                on_progress=lambda progress: manager.update(job, progress),
+            )
+            return {"results": results}
+
+        job = manager.submit("wake_many", ",".join(sorted(entries)), run)
+        return self.json(job.as_dict(), status_code=202)
+
+
+class DashboardView(HomeAssistantView):
+    """View to rebuild the WoMgr dashboard views in one pass."""
+
+    url = "/api/womgr/dashboard/regenerate"
+    name = "api:womgr:dashboard:regenerate"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+
+    async def post(self, request):
+        body = await request.json() if request.can_read_body else {}
+        try:
+            data = REGENERATE_DASHBOARD_SCHEMA(body)
+        except vol.Invalid as exc:
+            return self.json({"error": str(exc)}, status_code=400)
+        views = await async_regenerate(self.hass, data.get("dashboard") or None)
+        return self.json({"views": views})
 
 
 class ExportView(HomeAssistantView):
@@ -70,10 +488,65 @@ class ExportView(HomeAssistantView):
 
     def __init__(self, hass: HomeAssistant) -> None:
         self.hass = hass
+        self._snapshot = SnapshotCache(self._build)
+
+    def _build(self) -> list[dict[str, Any]]:
+        return [dict(data) for data in all_device_data(self.hass).values()]
 
     async def get(self, request):
-        entries = [entry.data for entry in self.hass.config_entries.async_entries(DOMAIN) if entry.data]
-        return self.json(entries)
+        revision = get_revisions(self.hass).revision
+        return cached_response(request, self._snapshot.get(revision))
+
+
+class PanelView(HomeAssistantView):
+    """Serve the management panel with cache validators."""
+
+    url = "/womgr-panel"
+    name = "womgr:panel"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        self.hass = hass
+        self.path = path
+        self._rendered: Rendered | None = None
+
+    async def get(self, request):
+        if self._rendered is None:
+            body = await self.hass.async_add_executor_job(_read_bytes, self.path)
+            self._rendered = Rendered(body, "text/html")
+        return cached_response(request, self._rendered)
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def cached_response(request, rendered: Rendered, headers: dict[str, str] | None = None):
+    """Answer ``request`` with ``rendered``, honouring conditional and encoding headers.
+
+    Clients have to revalidate on every use, which costs a ``304`` when
+    nothing changed.
+    """
+    from aiohttp import web
+
+    headers = {
+        **(headers or {}),
+        "ETag": rendered.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if rendered.not_modified(request.headers.get("If-None-Match")):
+        return web.Response(status=304, headers=headers)
+    body, encoding = rendered.encode(request.headers.get("Accept-Encoding"))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return web.Response(
+        body=body,
+        content_type=rendered.content_type,
+        charset="utf-8",
+        headers=headers,
+    )
 
 
 class ImportView(HomeAssistantView):
@@ -1,30 +1,82 @@
-"""Ping binary sensor platform for WoMgr."""
+"""Ping and service binary sensor platform for WoMgr."""
 
 from __future__ import annotations
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 
-from .const import DOMAIN
-from .womgr.entities import PingBinarySensor
+from .coordinator import get_coordinator
+from .entity import WoMgrDeviceEntity
+from .hub import register_platform
+from .womgr.coordinator import ReachabilityCoordinator
+from .womgr.entities import ConfigEntry, PingBinarySensor, ServiceBinarySensor
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    config = hass.data[DOMAIN][entry.entry_id]
-    sensors = [e for e in config.entities if isinstance(e, PingBinarySensor)]
-    async_add_entities(WoMgrPingBinarySensor(s) for s in sensors)
+    coordinator = get_coordinator(hass)
 
+    def add_devices(configs: list[ConfigEntry]) -> None:
+        entities = []
+        for config in configs:
+            if config.ping is not None:
+                entities.append(WoMgrPingBinarySensor(config.ping, coordinator))
+            if config.service is not None:
+                entities.append(WoMgrServiceBinarySensor(config.service, coordinator))
+        async_add_entities(entities)
 
-class WoMgrPingBinarySensor(BinarySensorEntity):
-    """Binary sensor that wraps PingBinarySensor."""
+    register_platform(hass, entry, add_devices)
 
-    def __init__(self, sensor: PingBinarySensor) -> None:
+
+class WoMgrPingBinarySensor(WoMgrDeviceEntity, BinarySensorEntity):
+    """Binary sensor that wraps PingBinarySensor.
+
+    Probing is scheduled by the shared coordinator which pushes results
+    to the entity, so Home Assistant does not poll it.
+    """
+
+    _attr_should_poll = False
+    # Latency statistics change with every probe; keep them out of the
+    # recorder so each probe does not write a new state row.
+    _unrecorded_attributes = frozenset({"samples", "loss", "min", "avg", "max", "jitter"})
+
+    def __init__(
+        self,
+        sensor: PingBinarySensor | ServiceBinarySensor,
+        coordinator: ReachabilityCoordinator,
+    ) -> None:
         self._sensor = sensor
+        self._coordinator = coordinator
+        self._device_id = sensor.config_entry.entry_id
         self._attr_unique_id = sensor.entity_id
         self._attr_name = f"{sensor.device_name} Ping"
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.add_sensor(self._sensor, self.async_write_ha_state)
+        )
+
     async def async_update(self) -> None:
-        await self._sensor.update()
+        await self._coordinator.async_refresh(self._sensor)
 
     @property
     def is_on(self) -> bool:
         return self._sensor.is_on
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return self._sensor.history.stats()
+
+
+class WoMgrServiceBinarySensor(WoMgrPingBinarySensor):
+    """Binary sensor that wraps ServiceBinarySensor."""
+
+    def __init__(
+        self, sensor: ServiceBinarySensor, coordinator: ReachabilityCoordinator
+    ) -> None:
+        super().__init__(sensor, coordinator)
+        self._attr_name = f"{sensor.device_name} Service"
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        ports = self._sensor.open_ports
+        return {"ports": {str(port): is_open for port, is_open in ports.items()}}
@@ -4,39 +4,42 @@ from __future__ import annotations
 
 from homeassistant.components.button import ButtonEntity
 
-from .const import DOMAIN
-from .womgr.entities import SystemCommandSwitch
+from .coordinator import get_coordinator
+from .entity import WoMgrDeviceEntity
+from .hub import register_platform
+from .womgr.entities import ConfigEntry, SystemCommandSwitch
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    config = hass.data[DOMAIN][entry.entry_id]
-    systems = [e for e in config.entities if isinstance(e, SystemCommandSwitch)]
-    buttons = []
-    for system in systems:
-        buttons.append(WoMgrRestartButton(system))
-        buttons.append(WoMgrShutdownButton(system))
-    async_add_entities(buttons)
+    def add_devices(configs: list[ConfigEntry]) -> None:
+        buttons = []
+        for config in configs:
+            if config.system is not None:
+                buttons.append(WoMgrRestartButton(config.system))
+                buttons.append(WoMgrShutdownButton(config.system))
+        async_add_entities(buttons)
 
+    register_platform(hass, entry, add_devices)
 
-class _SystemButton(ButtonEntity):
+
+class _SystemButton(WoMgrDeviceEntity, ButtonEntity):
     def __init__(self, system: SystemCommandSwitch, action: str) -> None:
         self._system = system
+        self._device_id = system.config_entry.entry_id
         self._action = action
         self._attr_unique_id = f"{system.entity_id}_{action}"
         self._attr_name = f"{system.device_name} {action.title()}"
 
+    async def async_press(self) -> None:
+        await self.hass.async_add_executor_job(getattr(self._system, self._action))
+        get_coordinator(self.hass).boost_entry(self._system.config_entry)
+
 
 class WoMgrRestartButton(_SystemButton):
     def __init__(self, system: SystemCommandSwitch) -> None:
         super().__init__(system, "restart")
 
-    async def async_press(self) -> None:
-        await self.hass.async_add_executor_job(self._system.restart)
-
 
 class WoMgrShutdownButton(_SystemButton):
     def __init__(self, system: SystemCommandSwitch) -> None:
         super().__init__(system, "shutdown")
-
-    async def async_press(self) -> None:
-        await self.hass.async_add_executor_job(self._system.shutdown)
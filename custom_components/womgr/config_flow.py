@@ -9,26 +9,37 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
 
-from .util import parse_mac_address
+from .hub import is_hub, new_device_id
+from .util import parse_mac_address, parse_ports
+from .womgr.entities import DeviceRegistry, normalize_ip, normalize_mac
+from .womgr.util import slugify
 
-from .const import DOMAIN
+from .const import CONF_DEVICES, DOMAIN
 
 
 class WoMgrConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    """Handle a config flow for WoMgr."""
+    """Handle a config flow for WoMgr.
 
-    VERSION = 2
+    All devices are kept in a single hub entry. Adding a device while the
+    hub exists updates its device table instead of creating an entry.
+    """
+
+    VERSION = 3
 
     async def async_step_user(self, user_input: dict | None = None):
         """Initial step for integration setup."""
-        base_exists = any(not entry.data for entry in self._async_current_entries())
+        base_exists = any(
+            not entry.data or is_hub(entry) for entry in self._async_current_entries()
+        )
 
         if not base_exists:
             if user_input is not None:
                 if not user_input.get("add_device"):
                     await self.async_set_unique_id(DOMAIN)
                     self._abort_if_unique_id_configured()
-                    return self.async_create_entry(title="HaWoManager", data={})
+                    return self.async_create_entry(
+                        title="HaWoManager", data={CONF_DEVICES: {}}
+                    )
                 return await self.async_step_device()
 
             return self.async_show_form(
@@ -52,22 +63,16 @@ class WoMgrConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except ValueError:
                 errors["ip"] = "invalid_ip"
 
-            if not errors:
-                for entry in self._async_current_entries():
-                    if not entry.data:
-                        continue
-                    if entry.data.get("device_name") == user_input["device_name"]:
-                        return self.async_abort(reason="duplicate_device_name")
-                    if entry.data.get("mac") == user_input["mac"]:
-                        return self.async_abort(reason="duplicate_mac")
-                    if entry.data.get("ip") == user_input["ip"]:
-                        return self.async_abort(reason="duplicate_ip")
+            try:
+                parse_ports(user_input.get("service_ports", ""))
+            except ValueError:
+                errors["service_ports"] = "invalid_ports"
 
             if not errors:
-                return self.async_create_entry(
-                    title=user_input["device_name"],
-                    data=user_input,
-                )
+                reason = self._duplicate_reason(user_input)
+                if reason is not None:
+                    return self.async_abort(reason=reason)
+                return await self._async_add_device(user_input)
 
         data_schema = vol.Schema(
             {
@@ -82,9 +87,65 @@ class WoMgrConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional("dashboard", default=""): str,
                 vol.Optional("icon", default="mdi:server-network"): str,
                 vol.Optional("area", default=""): str,
+                vol.Optional("service_ports", default=""): str,
+                vol.Optional("service_timeout", default=2.0): vol.Coerce(float),
             }
         )
 
         return self.async_show_form(
             step_id="device", data_schema=data_schema, errors=errors
         )
+
+    async def _async_add_device(self, user_input: dict):
+        devices = {new_device_id(): user_input}
+        hub = next((e for e in self._async_current_entries() if is_hub(e)), None)
+        if hub is not None:
+            self.hass.config_entries.async_update_entry(
+                hub, data={CONF_DEVICES: {**hub.data[CONF_DEVICES], **devices}}
+            )
+            return self.async_abort(reason="device_added")
+        await self.async_set_unique_id(DOMAIN)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title="HaWoManager", data={CONF_DEVICES: devices}
+        )
+
+    def _duplicate_reason(self, user_input: dict) -> str | None:
+        """Return the abort reason if the device is already configured.
+
+        Loaded devices are looked up in the device registry; only devices
+        that are not loaded, e.g. of disabled entries, are compared one by
+        one.
+        """
+        registry = self.hass.data.get(DOMAIN)
+        if not isinstance(registry, DeviceRegistry):
+            registry = DeviceRegistry()
+        if registry.by_slug(user_input["device_name"]):
+            return "duplicate_device_name"
+        if registry.by_mac(user_input["mac"]):
+            return "duplicate_mac"
+        if registry.by_ip(user_input["ip"]):
+            return "duplicate_ip"
+
+        mac = normalize_mac(user_input["mac"])
+        ip = normalize_ip(user_input["ip"])
+        for device_id, data in self._configured_devices():
+            if device_id in registry:
+                continue
+            if slugify(data.get("device_name", "")) == slugify(
+                user_input["device_name"]
+            ):
+                return "duplicate_device_name"
+            if normalize_mac(data.get("mac", "")) == mac:
+                return "duplicate_mac"
+            if normalize_ip(data.get("ip", "")) == ip:
+                return "duplicate_ip"
+        return None
+
+    def _configured_devices(self):
+        """Yield ``(device_id, data)`` of the devices of all entries."""
+        for entry in self._async_current_entries():
+            if is_hub(entry):
+                yield from entry.data[CONF_DEVICES].items()
+            elif entry.data:
+                yield entry.entry_id, entry.data
@@ -1,3 +1,69 @@
 """Constants for the WoMgr integration."""
 
 DOMAIN = "womgr"
+
+DATA_COORDINATOR = f"{DOMAIN}_coordinator"
+
+# Devices of the hub config entry, keyed by device id
+CONF_DEVICES = "devices"
+# Device configuration loaded by each hub entry
+DATA_HUB = f"{DOMAIN}_hub"
+# Entity factories of the platforms set up for each hub entry
+DATA_PLATFORMS = f"{DOMAIN}_platforms"
+
+# Seconds between reachability probes of a device
+DEFAULT_SCAN_INTERVAL = 30
+# Upper bound on probes running at the same time across all devices
+DEFAULT_MAX_CONCURRENT_PROBES = 16
+# Offline devices back off exponentially up to this many seconds
+DEFAULT_MAX_SCAN_INTERVAL = 600
+# Fast polling after a wake, restart or shutdown
+FAST_SCAN_INTERVAL = 2
+FAST_SCAN_DURATION = 90
+# Seconds a manual refresh result is shared with repeated refresh requests
+REFRESH_REUSE = 1.0
+
+# Options from the womgr section of configuration.yaml
+DATA_CONFIG = f"{DOMAIN}_config"
+# Probe backend ("auto", "fping" or "ping")
+CONF_PROBE_BACKEND = "probe_backend"
+DEFAULT_PROBE_BACKEND = "auto"
+# Answer probes from the kernel neighbor table where possible
+CONF_PASSIVE_LIVENESS = "passive_liveness"
+DEFAULT_PASSIVE_LIVENESS = True
+
+# Bulk wake defaults
+SERVICE_WAKE_MANY = "wake_many"
+EVENT_WAKE_PROGRESS = f"{DOMAIN}_wake_progress"
+DEFAULT_WAKE_STAGGER = 1.0
+DEFAULT_WAKE_CONCURRENCY = 4
+DEFAULT_WAKE_REPEAT = 3
+
+DATA_JOBS = f"{DOMAIN}_jobs"
+JOB_WORKERS = 8
+JOB_MAX_AGE = 3600
+JOB_MAX_COUNT = 200
+DEFAULT_BATCH_CONCURRENCY = 8
+
+DATA_FEED = f"{DOMAIN}_feed"
+DATA_REVISIONS = f"{DOMAIN}_revisions"
+DATA_INDEX = f"{DOMAIN}_index"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Seconds latency statistics in a cached device listing may lag behind
+SNAPSHOT_MAX_AGE = 10
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_KEEPALIVE = 30
+
+# Lovelace cards are written in batches once changes stop arriving
+DATA_DASHBOARD = f"{DOMAIN}_dashboard"
+DASHBOARD_DEBOUNCE = 0.5
+DASHBOARD_MAX_DELAY = 5.0
+# Upper bound on dashboards written at the same time
+DASHBOARD_CONCURRENCY = 4
+SERVICE_REGENERATE_DASHBOARD = "regenerate_dashboard"
+
+# Wake-and-confirm pipeline of the REST wake action
+DEFAULT_WAKE_PACKETS = 3
+DEFAULT_WAKE_RETRY_INTERVAL = 1.0
+DEFAULT_WAKE_TIMEOUT = 180.0
@@ -0,0 +1,53 @@
+"""Reachability coordinator shared by all WoMgr devices."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_PASSIVE_LIVENESS,
+    CONF_PROBE_BACKEND,
+    DATA_CONFIG,
+    DATA_COORDINATOR,
+    DEFAULT_MAX_CONCURRENT_PROBES,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_PASSIVE_LIVENESS,
+    DEFAULT_PROBE_BACKEND,
+    DEFAULT_SCAN_INTERVAL,
+    FAST_SCAN_DURATION,
+    FAST_SCAN_INTERVAL,
+    REFRESH_REUSE,
+)
+from .feed import sensor_updated
+from .womgr.coordinator import ReachabilityCoordinator
+from .womgr.neighbor import NeighborTable
+from .womgr.probe import get_backend
+
+
+def get_coordinator(hass: HomeAssistant) -> ReachabilityCoordinator:
+    """Return the coordinator for this Home Assistant instance."""
+    coordinator = hass.data.get(DATA_COORDINATOR)
+    if coordinator is None:
+        options = hass.data.get(DATA_CONFIG, {})
+        passive = options.get(CONF_PASSIVE_LIVENESS, DEFAULT_PASSIVE_LIVENESS)
+        coordinator = ReachabilityCoordinator(
+            DEFAULT_SCAN_INTERVAL,
+            DEFAULT_MAX_CONCURRENT_PROBES,
+            max_interval=DEFAULT_MAX_SCAN_INTERVAL,
+            fast_interval=FAST_SCAN_INTERVAL,
+            fast_duration=FAST_SCAN_DURATION,
+            backend=get_backend(
+                options.get(CONF_PROBE_BACKEND, DEFAULT_PROBE_BACKEND)
+            ),
+            neighbors=NeighborTable() if passive else None,
+            refresh_reuse=REFRESH_REUSE,
+        )
+        hass.data[DATA_COORDINATOR] = coordinator
+        coordinator.add_listener(lambda sensor: sensor_updated(hass, sensor))
+
+        from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, lambda _event: coordinator.stop()
+        )
+    return coordinator
@@ -2,7 +2,9 @@
 
 from ..womgr.entities import (
     ConfigEntry,
+    DeviceRegistry,
     PingBinarySensor,
+    ServiceBinarySensor,
     SystemCommandSwitch,
     WakeOnLanSwitch,
     setup_device,
@@ -11,7 +13,9 @@ from ..womgr.entities import (
 
 __all__ = [
     "ConfigEntry",
+    "DeviceRegistry",
     "PingBinarySensor",
+    "ServiceBinarySensor",
     "SystemCommandSwitch",
     "WakeOnLanSwitch",
     "setup_device",
@@ -0,0 +1,422 @@
+"""Lovelace dashboard cards for WoMgr devices."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Iterable
+
+from homeassistant.components.lovelace.const import (
+    CONF_ALLOW_SINGLE_WORD,
+    CONF_ICON,
+    CONF_TITLE,
+    CONF_URL_PATH,
+)
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DASHBOARD_CONCURRENCY,
+    DASHBOARD_DEBOUNCE,
+    DASHBOARD_MAX_DELAY,
+    DATA_DASHBOARD,
+    DOMAIN,
+)
+from .womgr import pastel_color
+from .womgr.entities import ConfigEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEW_PATH = "womgr"
+# Heading of devices without a location in regenerated views
+UNASSIGNED_LOCATION = "Unassigned"
+
+
+def view_path(data: dict[str, Any]) -> str:
+    """Return the dashboard and view path used by a device entry."""
+    return data.get("dashboard") or DEFAULT_VIEW_PATH
+
+
+def build_card(path: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Return the Bubble Card stack for the device described by ``data``."""
+    return _device_card(path, data)[0]
+
+
+def _device_card(path: str, data: dict[str, Any]) -> tuple[dict[str, Any], str]:
+    name = data["device_name"]
+    card, digest = _build_card(path, name, data.get("color") or pastel_color(name))
+    # The memoized card must not end up in, and be changed with, a config
+    return copy.deepcopy(card), digest
+
+
+@lru_cache(maxsize=4096)
+def _build_card(path: str, name: str, color: str) -> tuple[dict[str, Any], str]:
+    hash_tag = f"#{path}-{name}"
+    card = {
+        "type": "vertical-stack",
+        "title": name,
+        "cards": [
+            {
+                "type": "custom:bubble-card",
+                "card_type": "pop-up",
+                "hash": hash_tag,
+                "cards": [
+                    {"type": "entity", "entity": f"binary_sensor.{name}_ping"},
+                    {"type": "entity", "entity": f"switch.{name}_wake"},
+                    {"type": "button", "entity": f"button.{name}_restart"},
+                    {"type": "button", "entity": f"button.{name}_shutdown"},
+                ],
+            },
+            {
+                "type": "custom:bubble-card",
+                "card_type": "button",
+                "name": name,
+                "icon": "mdi:server-network",
+                "tap_action": {"action": "navigate", "navigation_path": hash_tag},
+                "show_state": False,
+                "style": f"ha-card {{ background-color: {color}; }}",
+            },
+        ],
+    }
+    return card, card_hash(card)
+
+
+def card_hash(card: dict[str, Any]) -> str:
+    """Return a digest of the content of ``card``."""
+    data = json.dumps(card, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class _CardIndex:
+    """Positions and content hashes of the cards in one dashboard view.
+
+    The index belongs to one loaded config object and is rebuilt when the
+    dashboard returns a different one, e.g. after an edit in the UI.
+    """
+
+    __slots__ = ("config", "view", "cards", "positions", "hashes")
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        view: dict[str, Any],
+        hashes: dict[str, str] | None = None,
+    ) -> None:
+        self.config = config
+        self.view = view
+        self.cards: list[dict[str, Any]] = view.setdefault("cards", [])
+        self.positions: dict[str, int] = {}
+        self.hashes: dict[str, str] = hashes or {}
+        self.reindex()
+
+    def matches(self, config: dict[str, Any]) -> bool:
+        return config is self.config and self.view.get("cards") is self.cards
+
+    def reindex(self) -> None:
+        self.cards = self.view["cards"]
+        hashes, self.hashes = self.hashes, {}
+        self.positions.clear()
+        for idx, card in enumerate(self.cards):
+            name = card.get("title")
+            if name not in self.positions:
+                self.positions[name] = idx
+                self.hashes[name] = hashes.get(name) or card_hash(card)
+
+
+class _Batch:
+    """Card changes for one dashboard waiting to be written."""
+
+    __slots__ = ("changes", "count", "done")
+
+    def __init__(self) -> None:
+        # Device name -> card and its hash, or None to remove the card
+        self.changes: dict[str, tuple[dict[str, Any], str] | None] = {}
+        self.count = 0
+        self.done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+
+class DashboardWriter:
+    """Write device cards to Lovelace dashboards in batches.
+
+    Card upserts and removals are queued per dashboard. A batch is written
+    once no change arrived for ``debounce`` seconds, or ``max_delay``
+    seconds after its first change, with a single load and save of the
+    dashboard. Only the last queued change of a device is applied, so
+    changes of one device take effect in the order they were made.
+    Callers wait until their change has been saved.
+
+    The position and content hash of every card are kept per dashboard,
+    so cards are found without scanning the view and the dashboard is
+    only saved when a card actually changed.
+
+    Batches of one dashboard are written one after another, in the order
+    they were closed; different dashboards are written in parallel, at
+    most ``concurrency`` at a time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        debounce: float = DASHBOARD_DEBOUNCE,
+        max_delay: float = DASHBOARD_MAX_DELAY,
+        concurrency: int = DASHBOARD_CONCURRENCY,
+    ) -> None:
+        self.hass = hass
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._batches: dict[str, _Batch] = {}
+        self._indexes: dict[str, _CardIndex] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._writers = asyncio.Semaphore(concurrency)
+
+    async def async_upsert(
+        self, path: str, card: dict[str, Any], digest: str | None = None
+    ) -> None:
+        """Add ``card`` to the view ``path`` or replace the card with its title.
+
+        ``digest`` is the :func:`card_hash` of ``card`` if already known.
+        """
+        await self._queue(path, card["title"], (card, digest or card_hash(card)))
+
+    async def async_remove(self, path: str, name: str) -> None:
+        """Remove the card titled ``name`` from the view ``path``."""
+        await self._queue(path, name, None)
+
+    async def async_rebuild(
+        self, path: str, cards: list[tuple[dict[str, Any], str]]
+    ) -> bool:
+        """Replace every card of the view ``path`` with ``cards`` in one save.
+
+        ``cards`` holds each card with its :func:`card_hash`. A missing
+        dashboard is only created for a non-empty ``cards``. Returns
+        whether the dashboard was saved.
+        """
+        async with self._lock(path), self._writers:
+            loaded = await self._load(path, create=bool(cards))
+            if loaded is None:
+                return False
+            dashboard, config = loaded
+            index = self._index(path, config, create=True)
+            new_cards = [card for card, _digest in cards]
+            if index.cards == new_cards:
+                return False
+            index.view["cards"] = new_cards
+            self._indexes[path] = _CardIndex(
+                config,
+                index.view,
+                {card["title"]: digest for card, digest in cards if "title" in card},
+            )
+            await dashboard.async_save(config)
+            return True
+
+    def _lock(self, path: str) -> asyncio.Lock:
+        lock = self._locks.get(path)
+        if lock is None:
+            lock = self._locks[path] = asyncio.Lock()
+        return lock
+
+    async def _queue(
+        self, path: str, name: str, change: tuple[dict[str, Any], str] | None
+    ) -> None:
+        batch = self._batches.get(path)
+        if batch is None:
+            batch = self._batches[path] = _Batch()
+            self.hass.async_create_task(self._flush_later(path, batch))
+        batch.changes.pop(name, None)
+        batch.changes[name] = change
+        batch.count += 1
+        await asyncio.shield(batch.done)
+
+    async def _flush_later(self, path: str, batch: _Batch) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while True:
+            seen = batch.count
+            await asyncio.sleep(min(self.debounce, max(deadline - loop.time(), 0)))
+            if batch.count == seen or loop.time() >= deadline:
+                break
+        # Changes queued from now on go into the next batch, which waits
+        # for this one on the dashboard lock
+        del self._batches[path]
+        try:
+            async with self._lock(path), self._writers:
+                await self._write(path, batch.changes)
+        except Exception as exc:
+            logger.exception("Updating dashboard %s failed", path)
+            batch.done.set_exception(exc)
+            # Waiters receive the error; avoid an unretrieved exception warning
+            batch.done.exception()
+        else:
+            batch.done.set_result(None)
+
+    async def _load(self, path: str, create: bool) -> tuple[Any, dict[str, Any]] | None:
+        """Return the dashboard ``path`` and its config.
+
+        Without ``create`` a missing dashboard or config gives ``None``.
+        """
+        lovelace = self.hass.data.get("lovelace")
+        if not lovelace:
+            return None
+        dashboards: dict = getattr(lovelace, "dashboards", None)
+        if dashboards is None:
+            dashboards = lovelace.get("dashboards", {})
+
+        if path not in dashboards:
+            if not create:
+                return None
+            collection = getattr(lovelace, "dashboards_collection", None)
+            if collection is None:
+                collection = lovelace.get("dashboards_collection")
+            if collection is None:
+                return None
+            await collection.async_create_item(
+                {
+                    CONF_ALLOW_SINGLE_WORD: True,
+                    CONF_ICON: "mdi:server-network",
+                    CONF_TITLE: "HaWoManager",
+                    CONF_URL_PATH: path,
+                }
+            )
+
+        dashboard = dashboards[path]
+        try:
+            config = await dashboard.async_load(False)
+        except Exception as exc:  # ConfigNotFound in tests
+            if exc.__class__.__name__ != "ConfigNotFound":
+                raise
+            if not create:
+                return None
+            config = {"views": []}
+        return dashboard, config
+
+    def _index(self, path: str, config: dict[str, Any], create: bool) -> _CardIndex | None:
+        """Return the card index of the view ``path``, adding the view if needed."""
+        index = self._indexes.get(path)
+        if index is None or not index.matches(config):
+            view = next(
+                (v for v in config.get("views", []) if v.get("path") == path), None
+            )
+            if view is None:
+                if not create:
+                    return None
+                view = {"path": path, "title": "HaWoManager", "cards": []}
+                config.setdefault("views", []).append(view)
+            index = self._indexes[path] = _CardIndex(config, view)
+        return index
+
+    async def _write(
+        self, path: str, changes: dict[str, tuple[dict[str, Any], str] | None]
+    ) -> None:
+        upserts = any(change is not None for change in changes.values())
+        loaded = await self._load(path, create=upserts)
+        if loaded is None:
+            return
+        dashboard, config = loaded
+        index = self._index(path, config, create=upserts)
+        if index is None:
+            return
+
+        changed = False
+        removed = set()
+        for name, change in changes.items():
+            idx = index.positions.get(name)
+            if change is None:
+                if idx is not None:
+                    removed.add(name)
+                continue
+            card, digest = change
+            if idx is None:
+                index.positions[name] = len(index.cards)
+                index.cards.append(card)
+            elif index.hashes[name] != digest:
+                index.cards[idx] = card
+            else:
+                continue
+            index.hashes[name] = digest
+            changed = True
+        if removed:
+            index.view["cards"] = [
+                card for card in index.cards if card.get("title") not in removed
+            ]
+            index.reindex()
+            changed = True
+
+        if changed:
+            await dashboard.async_save(config)
+
+
+def get_dashboard_writer(hass: HomeAssistant) -> DashboardWriter:
+    """Return the dashboard writer for this Home Assistant instance."""
+    writer = hass.data.get(DATA_DASHBOARD)
+    if writer is None:
+        writer = hass.data[DATA_DASHBOARD] = DashboardWriter(hass)
+    return writer
+
+
+async def async_update_card(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    """Create or update the dashboard card of a device entry."""
+    if not data or not hass.data.get("lovelace"):
+        return
+    path = view_path(data)
+    card, digest = _device_card(path, data)
+    await get_dashboard_writer(hass).async_upsert(path, card, digest)
+
+
+async def async_remove_card(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    """Remove the dashboard card of a device entry."""
+    if not data or not hass.data.get("lovelace"):
+        return
+    await get_dashboard_writer(hass).async_remove(view_path(data), data["device_name"])
+
+
+def location_cards(
+    path: str, devices: Iterable[ConfigEntry]
+) -> list[tuple[dict[str, Any], str]]:
+    """Return the cards of ``devices`` grouped under a heading per location.
+
+    Locations and the devices within them are sorted by name. Each card
+    comes with its :func:`card_hash`.
+    """
+    groups: dict[str, list[ConfigEntry]] = {}
+    for config in devices:
+        groups.setdefault(config.location or UNASSIGNED_LOCATION, []).append(config)
+    cards = []
+    for location in sorted(groups, key=str.casefold):
+        heading = {"type": "heading", "heading": location}
+        cards.append((heading, card_hash(heading)))
+        for config in sorted(groups[location], key=lambda c: c.device_name.casefold()):
+            cards.append(
+                _device_card(path, {"device_name": config.device_name, "color": config.color})
+            )
+    return cards
+
+
+async def async_regenerate(hass: HomeAssistant, path: str | None = None) -> dict[str, int]:
+    """Rebuild the WoMgr views from the loaded devices.
+
+    Every view used by a device is rebuilt, or only ``path`` if a device
+    uses it. Each view is replaced with :func:`location_cards` in a single
+    save. Returns the number of devices per rebuilt view.
+    """
+    by_path: dict[str, list[ConfigEntry]] = {}
+    from .hub import all_device_data
+
+    device_data = all_device_data(hass)
+    registry: dict[str, ConfigEntry] = hass.data.get(DOMAIN, {})
+    for device_id, config in registry.items():
+        device_path = view_path(device_data.get(device_id, {}))
+        if path is None or device_path == path:
+            by_path.setdefault(device_path, []).append(config)
+    if not hass.data.get("lovelace"):
+        return {}
+    writer = get_dashboard_writer(hass)
+    await asyncio.gather(
+        *(
+            writer.async_rebuild(view, location_cards(view, devices))
+            for view, devices in by_path.items()
+        )
+    )
+    return {view: len(devices) for view, devices in by_path.items()}
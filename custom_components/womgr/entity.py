@@ -0,0 +1,48 @@
+"""Base entity for WoMgr devices."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+from .hub import SIGNAL_DEVICE_CHANGED, SIGNAL_DEVICE_REMOVED
+
+
+class WoMgrDeviceEntity(Entity):
+    """Entity of one WoMgr device.
+
+    The entity removes itself, including its entity registry entry, when
+    its device is deleted from the hub entry. When the configuration of
+    its device changes it is removed without touching the registry and
+    re-created from the new configuration.
+    """
+
+    _device_id: str
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_REMOVED.format(self._device_id),
+                self._async_device_removed,
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DEVICE_CHANGED.format(self._device_id),
+                self._async_device_changed,
+            )
+        )
+
+    async def _async_device_removed(self) -> None:
+        if self.registry_entry is not None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            await self.async_remove(force_remove=True)
+
+    @callback
+    def _async_device_changed(self, removals: list) -> None:
+        removals.append(self.hass.async_create_task(self.async_remove(force_remove=True)))
@@ -0,0 +1,114 @@
+"""Device revisions and the live event feed for the WoMgr panel."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_FEED, DATA_INDEX, DATA_REVISIONS, DOMAIN
+from .jobs import get_job_manager
+from .womgr.entities import ConfigEntry, PingBinarySensor
+from .womgr.feed import DeviceFeed
+from .womgr.index import DeviceIndex
+from .womgr.revisions import RevisionLog
+
+
+def device_state(entry_id: str, config: ConfigEntry) -> dict[str, Any]:
+    """Return the API representation of a device."""
+    device: dict[str, Any] = {
+        "entry_id": entry_id,
+        "device_name": config.device_name,
+        "mac": config.mac,
+        "ip": config.ip,
+        "os_type": config.os_type,
+    }
+    ping, service = config.ping, config.service
+    if ping is not None:
+        device["online"] = ping.is_on
+        device["latency"] = ping.history.stats()
+        device["last_wake_duration"] = ping.last_wake_duration
+    if service is not None:
+        device["service_online"] = service.is_on
+        device["services"] = {
+            str(port): is_open for port, is_open in service.open_ports.items()
+        }
+    return device
+
+
+def _fingerprint(device: dict[str, Any]) -> tuple:
+    """Return the parts of a device state that bump its revision.
+
+    Latency statistics change with every probe and are left out.
+    """
+    return tuple(value for key, value in device.items() if key != "latency")
+
+
+def get_revisions(hass: HomeAssistant) -> RevisionLog:
+    """Return the revision log of all devices."""
+    revisions = hass.data.get(DATA_REVISIONS)
+    if revisions is None:
+        revisions = hass.data[DATA_REVISIONS] = RevisionLog()
+    return revisions
+
+
+def get_device_index(hass: HomeAssistant) -> DeviceIndex:
+    """Return the sort and filter index of all loaded devices."""
+    index = hass.data.get(DATA_INDEX)
+    if index is None:
+        index = hass.data[DATA_INDEX] = DeviceIndex()
+    return index
+
+
+def get_feed(hass: HomeAssistant) -> DeviceFeed:
+    """Return the device feed, publishing job progress to it."""
+    feed = hass.data.get(DATA_FEED)
+    if feed is None:
+        feed = DeviceFeed()
+        hass.data[DATA_FEED] = feed
+
+        def job_changed(job) -> None:
+            if feed.subscribers:
+                feed.publish("job", job.as_dict())
+
+        get_job_manager(hass).add_listener(job_changed)
+
+        from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, lambda _event: feed.close()
+        )
+    return feed
+
+
+def sensor_updated(hass: HomeAssistant, sensor) -> None:
+    """Record and publish the new state of the device owning ``sensor``."""
+    config = sensor.config_entry
+    if config is None or hass.data.get(DOMAIN, {}).get(config.entry_id) is not config:
+        return
+    if isinstance(sensor, PingBinarySensor):
+        get_device_index(hass).set_online(config.entry_id, sensor.is_on)
+    device = device_state(config.entry_id, config)
+    revisions = get_revisions(hass)
+    revisions.touch(config.entry_id, _fingerprint(device))
+    feed: DeviceFeed | None = hass.data.get(DATA_FEED)
+    if feed is not None and feed.subscribers:
+        feed.publish("device", {**device, "revision": revisions.revision})
+
+
+def publish_device(hass: HomeAssistant, entry_id: str) -> None:
+    """Record and announce that a device was added, changed or removed."""
+    revisions = get_revisions(hass)
+    config = hass.data.get(DOMAIN, {}).get(entry_id)
+    if config is None:
+        revisions.remove(entry_id)
+        get_device_index(hass).remove(entry_id)
+        event = ("removed", {"entry_id": entry_id})
+    else:
+        device = device_state(entry_id, config)
+        revisions.touch(entry_id)
+        get_device_index(hass).add(entry_id, config)
+        event = ("device", device)
+    feed: DeviceFeed | None = hass.data.get(DATA_FEED)
+    if feed is not None and feed.subscribers:
+        feed.publish(event[0], {**event[1], "revision": revisions.revision})
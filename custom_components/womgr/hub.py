@@ -0,0 +1,83 @@
+"""Hub config entry holding the table of WoMgr devices.
+
+A hub entry stores every device under ``data["devices"]``, keyed by a
+device id that takes the place of the per-device config entry id used by
+older installations. Entries created before the hub keep one device in
+their ``data`` and are merged into the hub by ``async_migrate_entry``.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Callable, Iterator
+
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DEVICES, DATA_PLATFORMS, DOMAIN
+from .womgr.entities import ConfigEntry
+
+# Signal sent with the device id when a device leaves its hub entry
+SIGNAL_DEVICE_REMOVED = f"{DOMAIN}_device_removed_{{}}"
+# Signal sent with the device id before a changed device is re-created;
+# receivers append the task removing their entity to the list passed along
+SIGNAL_DEVICE_CHANGED = f"{DOMAIN}_device_changed_{{}}"
+
+
+def is_hub(entry) -> bool:
+    """Return whether ``entry`` is a hub entry."""
+    return CONF_DEVICES in entry.data
+
+
+def new_device_id() -> str:
+    return uuid.uuid4().hex
+
+
+def device_data(entry) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield ``(device_id, data)`` for each device configured by ``entry``."""
+    if is_hub(entry):
+        yield from entry.data[CONF_DEVICES].items()
+    elif entry.data:
+        yield entry.entry_id, entry.data
+
+
+def all_device_data(hass: HomeAssistant) -> dict[str, dict[str, Any]]:
+    """Return the configuration of every device by device id."""
+    return {
+        device_id: data
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        for device_id, data in device_data(entry)
+    }
+
+
+def get_hub(hass: HomeAssistant):
+    """Return the hub entry, or ``None`` if there is none yet."""
+    return next(
+        (entry for entry in hass.config_entries.async_entries(DOMAIN) if is_hub(entry)),
+        None,
+    )
+
+
+def entry_devices(hass: HomeAssistant, entry) -> list[ConfigEntry]:
+    """Return the loaded devices of ``entry``."""
+    loaded = hass.data[DOMAIN]
+    return [loaded[device_id] for device_id, _data in device_data(entry) if device_id in loaded]
+
+
+def register_platform(
+    hass: HomeAssistant, entry, add_devices: Callable[[list[ConfigEntry]], None]
+) -> None:
+    """Set up the entities of the devices of ``entry`` and of devices added later.
+
+    ``add_devices`` receives the devices to create entities for.
+    """
+    add_devices(entry_devices(hass, entry))
+    if is_hub(entry):
+        hass.data.setdefault(DATA_PLATFORMS, {}).setdefault(entry.entry_id, []).append(
+            add_devices
+        )
+
+
+def added_devices(hass: HomeAssistant, entry, devices: list[ConfigEntry]) -> None:
+    """Create the entities of ``devices`` newly added to the hub ``entry``."""
+    for add_devices in hass.data.get(DATA_PLATFORMS, {}).get(entry.entry_id, []):
+        add_devices(devices)
@@ -0,0 +1,23 @@
+"""Background job manager shared by the WoMgr REST API."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_JOBS, JOB_MAX_AGE, JOB_MAX_COUNT, JOB_WORKERS
+from .womgr.jobs import JobManager
+
+
+def get_job_manager(hass: HomeAssistant) -> JobManager:
+    """Return the job manager for this Home Assistant instance."""
+    manager = hass.data.get(DATA_JOBS)
+    if manager is None:
+        manager = JobManager(JOB_WORKERS, JOB_MAX_AGE, JOB_MAX_COUNT)
+        hass.data[DATA_JOBS] = manager
+
+        from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, lambda _event: manager.cancel_all()
+        )
+    return manager
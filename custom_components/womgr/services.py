@@ -0,0 +1,171 @@
+"""Services for the WoMgr integration."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DEFAULT_WAKE_CONCURRENCY,
+    DEFAULT_WAKE_REPEAT,
+    DEFAULT_WAKE_STAGGER,
+    DOMAIN,
+    EVENT_WAKE_PROGRESS,
+    SERVICE_REGENERATE_DASHBOARD,
+    SERVICE_WAKE_MANY,
+)
+from .womgr.entities import ConfigEntry, DeviceRegistry, WakeOnLanSwitch
+from .womgr.wol import wake_many
+
+WAKE_MANY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("devices", default=list): [str],
+        vol.Optional("location"): str,
+        vol.Optional("group"): str,
+        vol.Optional("stagger", default=DEFAULT_WAKE_STAGGER): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=60)
+        ),
+        vol.Optional("concurrency", default=DEFAULT_WAKE_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+        vol.Optional("repeat", default=DEFAULT_WAKE_REPEAT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10)
+        ),
+    }
+)
+
+REGENERATE_DASHBOARD_SCHEMA = vol.Schema({vol.Optional("dashboard"): str})
+
+
+def select_devices(
+    hass: HomeAssistant,
+    devices: Iterable[str] = (),
+    location: str | None = None,
+    group: str | None = None,
+) -> dict[str, ConfigEntry]:
+    """Return loaded devices matching any of the selectors.
+
+    ``devices`` may contain entry ids or device names. ``group`` is the
+    entity id of a group whose members belong to WoMgr devices.
+    """
+    loaded: DeviceRegistry = hass.data.get(DOMAIN, DeviceRegistry())
+    selected: dict[str, ConfigEntry] = {}
+    for wanted in devices:
+        if wanted in loaded:
+            selected[wanted] = loaded[wanted]
+            continue
+        for config in loaded.by_slug(wanted):
+            if config.device_name == wanted:
+                selected[config.entry_id] = config
+    if location:
+        for config in loaded.by_location(location):
+            selected[config.entry_id] = config
+    if group:
+        for entry_id in _group_entry_ids(hass, group):
+            if entry_id in loaded:
+                selected[entry_id] = loaded[entry_id]
+    return selected
+
+
+def _group_entry_ids(hass: HomeAssistant, group: str) -> set[str]:
+    from homeassistant.helpers import entity_registry as er
+
+    state = hass.states.get(group)
+    if state is None:
+        return set()
+    registry = er.async_get(hass)
+    loaded: DeviceRegistry = hass.data.get(DOMAIN, DeviceRegistry())
+    # Entities of a hub entry are matched to their device by unique id
+    owners = {
+        entity.entity_id: config.entry_id
+        for config in loaded.values()
+        for entity in config.entities
+    }
+    entry_ids = set()
+    for entity_id in state.attributes.get("entity_id", []):
+        entity = registry.async_get(entity_id)
+        if entity is None:
+            continue
+        owner = owners.get(entity.unique_id) or owners.get(
+            entity.unique_id.rsplit("_", 1)[0]
+        )
+        if owner is not None:
+            entry_ids.add(owner)
+        elif entity.config_entry_id:
+            entry_ids.add(entity.config_entry_id)
+    return entry_ids
+
+
+async def async_wake_many(
+    hass: HomeAssistant,
+    entries: dict[str, ConfigEntry],
+    stagger: float = DEFAULT_WAKE_STAGGER,
+    concurrency: int = DEFAULT_WAKE_CONCURRENCY,
+    repeat: int = DEFAULT_WAKE_REPEAT,
+    on_progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, bool]:
+    """Wake ``entries`` in a staggered, rate limited batch.
+
+    A ``womgr_wake_progress`` event is fired, and ``on_progress`` called
+    with the same data, as each device completes. Returns whether sending
+    succeeded per entry id.
+    """
+    from .coordinator import get_coordinator
+
+    owners: dict[WakeOnLanSwitch, str] = {
+        config.wol: entry_id
+        for entry_id, config in entries.items()
+        if config.wol is not None
+    }
+    coordinator = get_coordinator(hass)
+
+    def progress(switch: WakeOnLanSwitch, ok: bool, done: int, total: int) -> None:
+        coordinator.boost_entry(switch.config_entry)
+        data = {
+            "entry_id": owners[switch],
+            "device_name": switch.device_name,
+            "success": ok,
+            "done": done,
+            "total": total,
+        }
+        hass.bus.async_fire(EVENT_WAKE_PROGRESS, data)
+        if on_progress is not None:
+            on_progress(data)
+
+    switches = list(owners)
+    results = await wake_many(
+        switches, stagger, concurrency, repeat, progress=progress
+    )
+    return {owners[switch]: ok for switch, ok in zip(switches, results)}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the WoMgr services."""
+
+    async def handle_wake_many(call) -> None:
+        data = call.data
+        entries = select_devices(
+            hass, data["devices"], data.get("location"), data.get("group")
+        )
+        await async_wake_many(
+            hass, entries, data["stagger"], data["concurrency"], data["repeat"]
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_WAKE_MANY, handle_wake_many, schema=WAKE_MANY_SCHEMA
+    )
+
+    async def handle_regenerate_dashboard(call) -> None:
+        from .dashboard import async_regenerate
+
+        await async_regenerate(hass, call.data.get("dashboard") or None)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REGENERATE_DASHBOARD,
+        handle_regenerate_dashboard,
+        schema=REGENERATE_DASHBOARD_SCHEMA,
+    )
@@ -4,27 +4,41 @@ from __future__ import annotations
 
 from homeassistant.components.switch import SwitchEntity
 
-from .const import DOMAIN
-from .womgr.entities import WakeOnLanSwitch
+from .coordinator import get_coordinator
+from .entity import WoMgrDeviceEntity
+from .hub import register_platform
+from .jobs import get_job_manager
+from .womgr.entities import ConfigEntry, WakeOnLanSwitch
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    config = hass.data[DOMAIN][entry.entry_id]
-    switches = [e for e in config.entities if isinstance(e, WakeOnLanSwitch)]
-    async_add_entities(WoMgrWakeSwitch(s) for s in switches)
+    def add_devices(configs: list[ConfigEntry]) -> None:
+        async_add_entities(
+            [
+                WoMgrWakeSwitch(config.wol, config.entry_id)
+                for config in configs
+                if config.wol is not None
+            ]
+        )
 
+    register_platform(hass, entry, add_devices)
 
-class WoMgrWakeSwitch(SwitchEntity):
+
+class WoMgrWakeSwitch(WoMgrDeviceEntity, SwitchEntity):
     """Switch that sends a Wake-on-LAN packet when turned on."""
 
-    def __init__(self, switch: WakeOnLanSwitch) -> None:
+    def __init__(self, switch: WakeOnLanSwitch, entry_id: str) -> None:
         self._switch = switch
+        self._entry_id = self._device_id = entry_id
         self._attr_unique_id = switch.entity_id
         self._attr_name = f"{switch.device_name} Wake"
         self._attr_is_on = False
 
     async def async_turn_on(self, **kwargs) -> None:
-        await self.hass.async_add_executor_job(self._switch.turn_on)
+        # A running REST wake job is already sending packets to this device.
+        if get_job_manager(self.hass).active("wake", self._entry_id) is None:
+            await self._switch.async_turn_on()
+        get_coordinator(self.hass).boost_entry(self._switch.config_entry)
         self._attr_is_on = False
         self.async_write_ha_state()
 
@@ -2,6 +2,6 @@
 
 from __future__ import annotations
 
-from .womgr.util import parse_mac_address
+from .womgr.util import parse_mac_address, parse_ports
 
-__all__ = ["parse_mac_address"]
+__all__ = ["parse_mac_address", "parse_ports"]
@@ -1,15 +1,24 @@
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
 import asyncio
+import ipaddress
 import logging
 import socket
 import subprocess
-import sys
 import shutil
-from typing import List
+from typing import Iterator, List
 
 logger = logging.getLogger(__name__)
 
+from .probe import ProbeBackend, build_ping_args, tcp_connect
+from .stats import LatencyHistory
 from .util import parse_mac_address, slugify
+from .wol import build_magic_packet, get_sender
+
+_DEFAULT_BACKEND = ProbeBackend()
+
+# Ports checked by ServiceBinarySensor when none are configured
+DEFAULT_SERVICE_PORTS = {"linux": [22], "windows": [3389]}
 
 
 def _create_entity_id(device_name: str, entity: str) -> str:
@@ -18,9 +27,14 @@ def _create_entity_id(device_name: str, entity: str) -> str:
     return f"womgr_{name}_{entity}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfigEntry:
-    """Simple representation of a device config entry."""
+    """Simple representation of a device config entry.
+
+    ``mac_bytes`` holds the MAC address as 6 bytes, parsed once per
+    address. ``wol``, ``ping``, ``system`` and ``service`` reference the
+    entities added with :meth:`add_entity`.
+    """
 
     device_name: str
     mac: str
@@ -31,18 +45,53 @@ class ConfigEntry:
     password: str = ""
     color: str = ""
     entities: List["WoMgrEntity"] = field(default_factory=list)
+    entry_id: str = ""
+    wol: "WakeOnLanSwitch | None" = field(default=None, repr=False, compare=False)
+    ping: "PingBinarySensor | None" = field(default=None, repr=False, compare=False)
+    system: "SystemCommandSwitch | None" = field(
+        default=None, repr=False, compare=False
+    )
+    service: "ServiceBinarySensor | None" = field(
+        default=None, repr=False, compare=False
+    )
+    _parsed_mac: "tuple[str, bytes | None] | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def mac_bytes(self) -> bytes | None:
+        """The MAC address as 6 bytes, or ``None`` if it is invalid."""
+        parsed = self._parsed_mac
+        if parsed is None or parsed[0] is not self.mac:
+            try:
+                mac_bytes = parse_mac_address(self.mac)
+            except ValueError:
+                mac_bytes = None
+            parsed = self._parsed_mac = (self.mac, mac_bytes)
+        return parsed[1]
 
     def add_entity(self, entity: "WoMgrEntity") -> None:
         self.entities.append(entity)
         entity.config_entry = self
+        if isinstance(entity, WakeOnLanSwitch):
+            self.wol = entity
+        elif isinstance(entity, PingBinarySensor):
+            self.ping = entity
+        elif isinstance(entity, SystemCommandSwitch):
+            self.system = entity
+        elif isinstance(entity, ServiceBinarySensor):
+            self.service = entity
 
     def remove_entities(self) -> None:
         self.entities.clear()
+        self.wol = self.ping = self.system = self.service = None
 
 
 class WoMgrEntity:
     """Base entity with a consistent entity_id scheme."""
 
+    __slots__ = ("device_name", "entity_id", "config_entry")
+
     def __init__(self, device_name: str, entity_type: str) -> None:
         self.device_name = device_name
         self.entity_id = _create_entity_id(device_name, entity_type)
@@ -50,7 +99,13 @@ class WoMgrEntity:
 
 
 class WakeOnLanSwitch(WoMgrEntity):
-    """Switch that sends a Wake-on-LAN magic packet."""
+    """Switch that sends a Wake-on-LAN magic packet.
+
+    The packet is built on the first send and reused afterwards.
+    ``ValueError`` is raised when sending to an invalid MAC address.
+    """
+
+    __slots__ = ("mac", "broadcast", "port", "_packet", "_sending")
 
     def __init__(
         self,
@@ -63,16 +118,21 @@ class WakeOnLanSwitch(WoMgrEntity):
         self.mac = mac
         self.broadcast = broadcast
         self.port = port
+        self._packet: bytes | None = None
+        self._sending: asyncio.Task | None = None
+
+    @property
+    def packet(self) -> bytes:
+        if self._packet is None:
+            self._packet = build_magic_packet(self.mac)
+        return self._packet
 
     def turn_on(self) -> None:
-        mac_bytes = parse_mac_address(self.mac)
-        packet = b"\xff" * 6 + mac_bytes * 16
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
                 sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                sock.sendto(packet, (self.broadcast, self.port))
+                sock.sendto(self.packet, (self.broadcast, self.port))
         except OSError as exc:
-            logger = logging.getLogger(__name__)
             logger.error(
                 "Failed to send WOL packet to %s:%s: %s",
                 self.broadcast,
@@ -80,42 +140,102 @@ class WakeOnLanSwitch(WoMgrEntity):
                 exc,
             )
 
+    async def async_turn_on(self) -> None:
+        """Send the magic packet over the shared transport of the running loop.
+
+        Calls made while a send is still pending share it.
+        """
+        if self._sending is None:
+            self._sending = asyncio.get_running_loop().create_task(self._async_send())
+            self._sending.add_done_callback(self._sent)
+        await asyncio.shield(self._sending)
+
+    async def _async_send(self) -> None:
+        try:
+            sender = await get_sender()
+        except OSError as exc:
+            logger.error("Failed to open WOL socket: %s", exc)
+            return
+        sender.send(self.packet, self.broadcast, self.port)
+
+    def _sent(self, _task: asyncio.Task) -> None:
+        self._sending = None
+
 
 class PingBinarySensor(WoMgrEntity):
-    """Binary sensor that checks reachability via ping."""
+    """Binary sensor that checks reachability via ping.
+
+    Round-trip times and losses of recent probes are kept in ``history``.
+    ``last_wake_duration`` holds the seconds it took the device to answer
+    after the last confirmed wake.
+    """
+
+    __slots__ = ("ip", "is_on", "history", "last_wake_duration")
 
-    def __init__(self, device_name: str, ip: str) -> None:
+    def __init__(self, device_name: str, ip: str, history_size: int = 60) -> None:
         super().__init__(device_name, "ping")
         self.ip = ip
         self.is_on = False
+        self.history = LatencyHistory(history_size)
+        self.last_wake_duration: float | None = None
 
     def _build_ping_args(self) -> list[str]:
-        ping_bin = shutil.which("ping") or "ping"
-        args = [ping_bin]
-        if sys.platform.startswith("win"):
-            args += ["-n", "1", "-w", "1000", self.ip]
-        else:
-            args += ["-c", "1", "-W", "1", self.ip]
-        return args
+        return build_ping_args(self.ip)
+
+    async def update(self, backend: ProbeBackend | None = None) -> bool:
+        """Probe the device with ``backend`` and update ``is_on``.
+
+        The default backend uses the shared ICMP socket and falls back to
+        the ``ping`` command.
+        """
+        backend = backend or _DEFAULT_BACKEND
+        rtt = await backend.probe(self.ip)
+        self.history.add(rtt)
+        self.is_on = rtt is not None
+        return self.is_on
+
+
+class ServiceBinarySensor(WoMgrEntity):
+    """Binary sensor that checks whether TCP services accept connections.
+
+    The sensor is on when any of ``ports`` accepts a connection within
+    ``timeout`` seconds. ``ports`` defaults to SSH on Linux and RDP on
+    Windows.
+    """
+
+    __slots__ = ("ip", "ports", "timeout", "open_ports", "is_on")
+
+    def __init__(
+        self,
+        device_name: str,
+        ip: str,
+        os_type: str,
+        ports: list[int] | None = None,
+        timeout: float = 2.0,
+    ) -> None:
+        super().__init__(device_name, "service")
+        self.ip = ip
+        self.ports = list(ports or DEFAULT_SERVICE_PORTS.get(os_type.lower(), []))
+        self.timeout = timeout
+        self.open_ports: dict[int, bool] = {port: False for port in self.ports}
+        self.is_on = False
 
     async def update(self) -> bool:
-        args = self._build_ping_args()
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                *args,
-                stdout=asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.DEVNULL,
-            )
-            await proc.communicate()
-            self.is_on = proc.returncode == 0
-        except FileNotFoundError:
-            self.is_on = False
+        results = await asyncio.gather(
+            *(tcp_connect(self.ip, port, self.timeout) for port in self.ports)
+        )
+        self.open_ports = {
+            port: rtt is not None for port, rtt in zip(self.ports, results)
+        }
+        self.is_on = any(self.open_ports.values())
         return self.is_on
 
 
 class SystemCommandSwitch(WoMgrEntity):
     """Switch that issues restart or shutdown commands."""
 
+    __slots__ = ("os_type", "username", "password", "shutdown_cmd", "reboot_cmd")
+
     def __init__(
         self,
         device_name: str,
@@ -176,6 +296,90 @@ class SystemCommandSwitch(WoMgrEntity):
         raise ValueError(f"Unsupported OS type: {self.os_type}")
 
 
+def normalize_mac(mac: str | bytes) -> bytes | str:
+    """Return ``mac`` as 6 bytes, or stripped and lowercased if it is invalid."""
+    if isinstance(mac, bytes):
+        return mac
+    try:
+        return parse_mac_address(mac)
+    except ValueError:
+        return mac.strip().lower()
+
+
+def normalize_ip(ip: str) -> str:
+    """Return the canonical form of ``ip``, or ``ip`` itself if it is invalid."""
+    try:
+        return str(ipaddress.ip_address(ip.strip()))
+    except ValueError:
+        return ip.strip()
+
+
+class DeviceRegistry(MutableMapping):
+    """Loaded devices by entry id, indexed by MAC, IP, name slug and location.
+
+    Assigning an entry to an entry id indexes it and deleting it removes
+    it from every index, so all lookups take constant time. MAC and IP
+    addresses are normalized, so ``AA-BB-...`` finds ``aa:bb:...``.
+    Several entries may share a key; lookups return all of them.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, ConfigEntry] = {}
+        self._by_mac: dict[bytes | str, dict[str, ConfigEntry]] = {}
+        self._by_ip: dict[str, dict[str, ConfigEntry]] = {}
+        self._by_slug: dict[str, dict[str, ConfigEntry]] = {}
+        self._by_location: dict[str, dict[str, ConfigEntry]] = {}
+
+    def __getitem__(self, entry_id: str) -> ConfigEntry:
+        return self._entries[entry_id]
+
+    def __setitem__(self, entry_id: str, entry: ConfigEntry) -> None:
+        if entry_id in self._entries:
+            del self[entry_id]
+        self._entries[entry_id] = entry
+        for index, key in self._keys(entry):
+            index.setdefault(key, {})[entry_id] = entry
+
+    def __delitem__(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id)
+        for index, key in self._keys(entry):
+            group = index.get(key)
+            if group is not None:
+                group.pop(entry_id, None)
+                if not group:
+                    del index[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._entries
+
+    def _keys(self, entry: ConfigEntry):
+        return (
+            (self._by_mac, entry.mac_bytes or normalize_mac(entry.mac)),
+            (self._by_ip, normalize_ip(entry.ip)),
+            (self._by_slug, slugify(entry.device_name)),
+            (self._by_location, entry.location),
+        )
+
+    def by_mac(self, mac: str | bytes) -> list[ConfigEntry]:
+        return list(self._by_mac.get(normalize_mac(mac), {}).values())
+
+    def by_ip(self, ip: str) -> list[ConfigEntry]:
+        return list(self._by_ip.get(normalize_ip(ip), {}).values())
+
+    def by_slug(self, name: str) -> list[ConfigEntry]:
+        """Return entries whose device name slugifies like ``name``."""
+        return list(self._by_slug.get(slugify(name), {}).values())
+
+    def by_location(self, location: str) -> list[ConfigEntry]:
+        return list(self._by_location.get(location, {}).values())
+
+
 def setup_device(
     device_name: str,
     mac: str,
@@ -187,10 +391,18 @@ def setup_device(
     color: str = "",
     broadcast: str = "<broadcast>",
     port: int = 9,
+    service_ports: list[int] | None = None,
+    service_timeout: float = 2.0,
+    entry_id: str = "",
+    registry: DeviceRegistry | None = None,
 ) -> ConfigEntry:
     """Create a ConfigEntry and associated entities.
 
     Wake-on-LAN packets use ``broadcast`` and ``port`` when initialized.
+    ``service_ports`` and ``service_timeout`` configure the TCP service
+    check, which defaults to the usual remote access port of ``os_type``.
+    ``entry_id`` identifies the entry to its owner, e.g. Home Assistant,
+    and is the key the entry is added to ``registry`` under.
     """
     entry = ConfigEntry(
         device_name=device_name,
@@ -201,14 +413,25 @@ def setup_device(
         username=username,
         password=password,
         color=color,
+        entry_id=entry_id,
     )
 
     entry.add_entity(WakeOnLanSwitch(device_name, mac, broadcast, port))
     entry.add_entity(PingBinarySensor(device_name, ip))
     entry.add_entity(SystemCommandSwitch(device_name, os_type, username, password))
+    entry.add_entity(
+        ServiceBinarySensor(device_name, ip, os_type, service_ports, service_timeout)
+    )
+    if registry is not None:
+        registry[entry_id] = entry
     return entry
 
 
-def remove_device(entry: ConfigEntry) -> None:
-    """Remove all entities associated with the config entry."""
+def remove_device(entry: ConfigEntry, registry: DeviceRegistry | None = None) -> None:
+    """Remove all entities associated with the config entry.
+
+    The entry is also dropped from ``registry`` if it is registered there.
+    """
+    if registry is not None and registry.get(entry.entry_id) is entry:
+        del registry[entry.entry_id]
     entry.remove_entities()
@@ -0,0 +1,57 @@
+"""Fan-out of device events to streaming subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+Event = tuple[str, dict[str, Any]]
+
+
+class DeviceFeed:
+    """Deliver published events to every subscriber's queue.
+
+    Each subscriber has a queue of at most ``maxsize`` events. A slow
+    subscriber loses its oldest events rather than blocking publishers
+    or growing without bound. :meth:`close` ends every subscription by
+    queueing ``None``.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._queues: set[asyncio.Queue[Event | None]] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._queues)
+
+    def subscribe(self) -> asyncio.Queue[Event | None]:
+        queue: asyncio.Queue[Event | None] = asyncio.Queue(self.maxsize)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Event | None]) -> None:
+        self._queues.discard(queue)
+
+    def publish(self, kind: str, data: dict[str, Any]) -> None:
+        """Queue the ``kind`` event carrying ``data`` for all subscribers."""
+        for queue in self._queues:
+            _put(queue, (kind, data))
+
+    def close(self) -> None:
+        for queue in self._queues:
+            _put(queue, None)
+        self._queues.clear()
+
+
+def _put(queue: asyncio.Queue[Event | None], item: Event | None) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+def format_event(kind: str, data: dict[str, Any]) -> bytes:
+    """Encode an event in the ``text/event-stream`` format."""
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"event: {kind}\ndata: {payload}\n\n".encode()
@@ -0,0 +1,251 @@
+"""Background jobs for long running device actions."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of a single background action."""
+
+    action: str
+    target: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "action": self.action,
+            "target": self.target,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Run actions in the background and keep track of their state.
+
+    At most ``max_workers`` jobs run at the same time; further jobs stay
+    pending until a worker is free. A job only waiting for something, e.g.
+    a device to come online, can give up its worker with :meth:`release`.
+    Finished jobs are evicted once they
+    are older than ``max_age`` seconds or when more than ``max_jobs`` are
+    tracked, oldest first.
+    """
+
+    def __init__(
+        self, max_workers: int = 4, max_age: float = 3600.0, max_jobs: int = 200
+    ) -> None:
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+        self._workers = asyncio.Semaphore(max_workers)
+        self._holding: set[str] = set()
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._by_key: dict[tuple[str, str], Job] = {}
+        self._listeners: list[Callable[[Job], None]] = []
+
+    def add_listener(self, listener: Callable[[Job], None]) -> Callable[[], None]:
+        """Call ``listener(job)`` whenever a job is queued, starts or finishes."""
+        self._listeners.append(listener)
+
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    def _notify(self, job: Job) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(job)
+            except Exception:
+                logger.exception("Job listener failed")
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        """Return all tracked jobs, newest first."""
+        self._evict()
+        return sorted(self._jobs.values(), key=lambda job: job.created, reverse=True)
+
+    def active(self, action: str, target: str) -> Job | None:
+        """Return the unfinished ``action`` job for ``target``, if any."""
+        job = self._by_key.get((action, target))
+        if job is None or job.done:
+            return None
+        return job
+
+    def submit(
+        self,
+        action: str,
+        target: str,
+        func: Callable[[Job], Awaitable[Any]],
+        reuse: float = 0.0,
+        limit: asyncio.Semaphore | None = None,
+    ) -> Job:
+        """Queue ``func(job)`` for a worker and return its job.
+
+        The return value of ``func`` becomes the job result. While an
+        ``action`` job for ``target`` is unfinished, or succeeded less than
+        ``reuse`` seconds ago, that job is returned instead of a new one.
+        Jobs sharing a ``limit`` semaphore stay pending until they acquire
+        it, before taking a worker.
+        """
+        key = (action, target)
+        job = self._by_key.get(key)
+        if job is not None and job.id in self._jobs:
+            if not job.done:
+                return job
+            if (
+                job.status == SUCCEEDED
+                and job.finished is not None
+                and time.time() - job.finished < reuse
+            ):
+                return job
+        job = Job(action, target)
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, func, limit))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _t: self._tasks.pop(job.id, None))
+        self._evict()
+        self._notify(job)
+        return job
+
+    async def wait(self, job_id: str) -> Job | None:
+        """Wait for a job to finish."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._jobs.get(job_id)
+
+    def update(self, job: Job, result: Any) -> None:
+        """Report the partial ``result`` of a running job to listeners."""
+        job.result = result
+        self._notify(job)
+
+    def release(self, job: Job) -> None:
+        """Free the worker of the running ``job`` for other jobs."""
+        if job.id in self._holding:
+            self._holding.discard(job.id)
+            self._workers.release()
+
+    async def _run(
+        self,
+        job: Job,
+        func: Callable[[Job], Awaitable[Any]],
+        limit: asyncio.Semaphore | None = None,
+    ) -> None:
+        try:
+            async with limit or contextlib.nullcontext():
+                await self._workers.acquire()
+                self._holding.add(job.id)
+                try:
+                    job.status = RUNNING
+                    job.started = time.time()
+                    self._notify(job)
+                    job.result = await func(job)
+                finally:
+                    self.release(job)
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s %s) failed", job.id, job.action, job.target)
+            job.status = FAILED
+            job.error = str(exc) or exc.__class__.__name__
+        else:
+            job.status = SUCCEEDED
+        finally:
+            job.finished = time.time()
+            self._notify(job)
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.max_age
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in finished:
+            if job.finished is not None and job.finished < cutoff:
+                del self._jobs[job.id]
+        excess = len(self._jobs) - self.max_jobs
+        if excess > 0:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.done),
+                key=lambda job: job.finished or 0,
+            )
+            for job in finished[:excess]:
+                del self._jobs[job.id]
+        for key, job in list(self._by_key.items()):
+            if job.id not in self._jobs:
+                del self._by_key[key]
+
+    def cancel_all(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+
+class SingleFlight:
+    """Share one running call between concurrent callers with the same key.
+
+    Callers arriving while a call for their key is in flight await its
+    result instead of starting another. A successful result is reused for
+    ``reuse`` seconds after the call finished.
+    """
+
+    def __init__(self, reuse: float = 0.0) -> None:
+        self.reuse = reuse
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            cached = self._results.get(key)
+            if cached is not None:
+                if loop.time() - cached[0] < self.reuse:
+                    return cached[1]
+                del self._results[key]
+            fut = loop.create_task(func())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._done(key, f))
+        return await asyncio.shield(fut)
+
+    def forget(self, key: Hashable) -> None:
+        """Drop any reusable result for ``key``."""
+        self._results.pop(key, None)
+
+    def _done(self, key: Hashable, fut: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if self.reuse > 0 and not fut.cancelled() and fut.exception() is None:
+            self._results[key] = (fut.get_loop().time(), fut.result())
@@ -0,0 +1,335 @@
+"""Passive device liveness from the kernel neighbor (ARP) table."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PROC_NET_ARP = "/proc/net/arp"
+
+# Neighbor states from linux/neighbour.h
+NUD_INCOMPLETE = 0x01
+NUD_REACHABLE = 0x02
+NUD_STALE = 0x04
+NUD_DELAY = 0x08
+NUD_PROBE = 0x10
+NUD_FAILED = 0x20
+NUD_NOARP = 0x40
+NUD_PERMANENT = 0x80
+
+# /proc/net/arp flag for a resolved entry
+ATF_COM = 0x02
+
+NETLINK_ROUTE = 0
+RTMGRP_NEIGH = 0x4
+RTM_NEWNEIGH = 28
+RTM_DELNEIGH = 29
+RTM_GETNEIGH = 30
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NDA_DST = 1
+NDA_LLADDR = 2
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NDMSG = struct.Struct("=BxxxiHBB")
+_RTATTR = struct.Struct("=HH")
+
+
+@dataclass
+class Neighbor:
+    """A single neighbor table entry."""
+
+    ip: str
+    mac: bytes | None
+    state: int
+    updated: float = 0.0
+
+
+def parse_proc_arp(text: str) -> list[Neighbor]:
+    """Parse the contents of ``/proc/net/arp``.
+
+    The file does not distinguish reachable from stale entries, so
+    resolved entries are reported as ``NUD_STALE`` and unresolved ones as
+    ``NUD_INCOMPLETE``.
+    """
+    now = time.monotonic()
+    result = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 4:
+            continue
+        ip, _hw_type, flags, hw_addr = fields[:4]
+        try:
+            resolved = int(flags, 16) & ATF_COM
+            mac = bytes.fromhex(hw_addr.replace(":", ""))
+        except ValueError:
+            continue
+        if resolved:
+            result.append(Neighbor(ip, mac, NUD_STALE, now))
+        else:
+            result.append(Neighbor(ip, None, NUD_INCOMPLETE, now))
+    return result
+
+
+def parse_neigh_messages(data: bytes) -> tuple[list[tuple[int, Neighbor]], bool]:
+    """Parse rtnetlink neighbor messages.
+
+    Returns ``(messages, done)`` where ``messages`` holds
+    ``(message_type, neighbor)`` pairs for IPv4 entries and ``done`` is
+    true once the end of a dump was reached.
+    """
+    now = time.monotonic()
+    messages = []
+    done = False
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _flags, _seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        body = data[offset + _NLMSGHDR.size : offset + length]
+        offset += (length + 3) & ~3
+        if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+            done = True
+            continue
+        if msg_type not in (RTM_NEWNEIGH, RTM_DELNEIGH) or len(body) < _NDMSG.size:
+            continue
+        family, _ifindex, state, _flags, _type = _NDMSG.unpack_from(body)
+        if family != socket.AF_INET:
+            continue
+        ip = None
+        mac = None
+        pos = _NDMSG.size
+        while pos + _RTATTR.size <= len(body):
+            rta_len, rta_type = _RTATTR.unpack_from(body, pos)
+            if rta_len < _RTATTR.size:
+                break
+            value = body[pos + _RTATTR.size : pos + rta_len]
+            if rta_type == NDA_DST and len(value) == 4:
+                ip = socket.inet_ntoa(value)
+            elif rta_type == NDA_LLADDR and len(value) == 6:
+                mac = value
+            pos += (rta_len + 3) & ~3
+        if ip is not None:
+            messages.append((msg_type, Neighbor(ip, mac, state, now)))
+    return messages, done
+
+
+def _neigh_dump_request(seq: int) -> bytes:
+    body = _NDMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+    header = _NLMSGHDR.pack(
+        _NLMSGHDR.size + len(body), RTM_GETNEIGH, NLM_F_REQUEST | NLM_F_DUMP, seq, 0
+    )
+    return header + body
+
+
+def dump_netlink() -> list[Neighbor]:
+    """Read the IPv4 neighbor table over rtnetlink.
+
+    ``OSError`` is raised where netlink is not available.
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        raise OSError("netlink is not supported on this platform")
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+        sock.settimeout(1.0)
+        sock.sendall(_neigh_dump_request(1))
+        result = []
+        done = False
+        while not done:
+            messages, done = parse_neigh_messages(sock.recv(65536))
+            result.extend(n for _type, n in messages)
+        return result
+
+
+def read_neighbors(path: str = PROC_NET_ARP) -> list[Neighbor]:
+    """Read the neighbor table over rtnetlink, falling back to ``path``.
+
+    This blocks; run it in an executor from the event loop.
+    """
+    try:
+        return dump_netlink()
+    except OSError:
+        pass
+    try:
+        with open(path) as fh:
+            return parse_proc_arp(fh.read())
+    except OSError as exc:
+        logger.debug("Neighbor table unavailable: %s", exc)
+        return []
+
+
+class NeighborTable:
+    """Cache of the kernel neighbor table keyed by MAC and IP address.
+
+    :meth:`refresh` loads the table in bulk over rtnetlink, falling back
+    to ``/proc/net/arp``; on the event loop the table is read in an
+    executor instead. :meth:`start` additionally subscribes to neighbor
+    events so entries stay current without rereading the table.
+    Listeners are called with every entry that changes.
+    """
+
+    def __init__(self, max_age: float = 10.0, path: str = PROC_NET_ARP) -> None:
+        self.max_age = max_age
+        self.path = path
+        self._by_mac: dict[bytes, Neighbor] = {}
+        self._by_ip: dict[str, Neighbor] = {}
+        self._loaded = 0.0
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._listeners: list[Callable[[Neighbor], None]] = []
+        self._refreshing: asyncio.Task | None = None
+
+    @property
+    def subscribed(self) -> bool:
+        return self._sock is not None
+
+    def add_listener(self, listener: Callable[[Neighbor], None]) -> Callable[[], None]:
+        """Call ``listener`` for changed entries; returns a callable to undo it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def refresh(self) -> None:
+        """Reload the whole table, blocking until it has been read."""
+        self._load(read_neighbors(self.path))
+
+    async def async_refresh(self) -> None:
+        """Reload the whole table without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        self._load(await loop.run_in_executor(None, read_neighbors, self.path))
+
+    def _schedule_refresh(self) -> None:
+        """Start a background reload unless one is already running."""
+        if self._refreshing is not None and not self._refreshing.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.refresh()
+            return
+        # Stop a stale table from scheduling again while this one runs
+        self._loaded = time.monotonic()
+        self._refreshing = loop.create_task(self.async_refresh())
+
+    def _load(self, neighbors: list[Neighbor]) -> None:
+        self._by_mac.clear()
+        self._by_ip.clear()
+        for neighbor in neighbors:
+            self._store(neighbor)
+        self._loaded = time.monotonic()
+
+    def start(self) -> None:
+        """Subscribe to neighbor events on the running loop.
+
+        Silently does nothing where netlink is not available.
+        """
+        if self._sock is not None or not hasattr(socket, "AF_NETLINK"):
+            return
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        except OSError as exc:
+            logger.debug("Cannot subscribe to neighbor events: %s", exc)
+            return
+        try:
+            sock.bind((0, RTMGRP_NEIGH))
+            sock.setblocking(False)
+            loop = asyncio.get_running_loop()
+            loop.add_reader(sock.fileno(), self._read)
+        except OSError as exc:
+            logger.debug("Cannot subscribe to neighbor events: %s", exc)
+            sock.close()
+            return
+        self._sock = sock
+        self._loop = loop
+        self._schedule_refresh()
+
+    def stop(self) -> None:
+        """Stop listening for neighbor events."""
+        if self._sock is None:
+            return
+        try:
+            self._loop.remove_reader(self._sock.fileno())
+        except (RuntimeError, ValueError):
+            pass
+        self._sock.close()
+        self._sock = None
+        if self._refreshing is not None:
+            self._refreshing.cancel()
+            self._refreshing = None
+
+    def lookup(self, mac: bytes | None, ip: str | None = None) -> Neighbor | None:
+        """Return the entry for ``mac``, or for ``ip`` if ``mac`` is unknown.
+
+        A table older than ``max_age`` is reloaded in the background; the
+        cached entries are returned meanwhile.
+        """
+        if self._sock is None and time.monotonic() - self._loaded > self.max_age:
+            self._schedule_refresh()
+        neighbor = self._by_mac.get(mac) if mac is not None else None
+        if neighbor is None and ip is not None:
+            neighbor = self._by_ip.get(ip)
+        return neighbor
+
+    def liveness(self, mac: bytes | None, ip: str | None = None) -> bool | None:
+        """Return whether the device is alive according to the kernel.
+
+        ``True`` means the kernel recently confirmed the MAC reachable and
+        ``False`` that address resolution failed. ``None`` is returned when
+        the entry is stale, still resolving, missing or static and an
+        active probe is needed. A failed entry is only refreshed by traffic
+        to the device, so callers should still probe it now and then.
+        """
+        neighbor = self.lookup(mac, ip)
+        if neighbor is None:
+            return None
+        if neighbor.state & NUD_REACHABLE:
+            return True
+        if neighbor.state & NUD_FAILED:
+            return False
+        return None
+
+    def _store(self, neighbor: Neighbor) -> None:
+        old = self._by_ip.get(neighbor.ip)
+        if old is not None and old.mac is not None and old.mac != neighbor.mac:
+            if self._by_mac.get(old.mac) is old:
+                if neighbor.mac is None:
+                    # Resolution of the address failed; keep that visible
+                    # to lookups by the previously known MAC.
+                    self._by_mac[old.mac] = neighbor
+                else:
+                    del self._by_mac[old.mac]
+        self._by_ip[neighbor.ip] = neighbor
+        if neighbor.mac is not None:
+            self._by_mac[neighbor.mac] = neighbor
+
+    def _forget(self, neighbor: Neighbor) -> None:
+        old = self._by_ip.pop(neighbor.ip, None)
+        if old is not None and old.mac is not None and self._by_mac.get(old.mac) is old:
+            del self._by_mac[old.mac]
+
+    def _read(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                # ENOBUFS means events were dropped; resynchronize.
+                logger.debug("Neighbor event read failed: %s", exc)
+                self._schedule_refresh()
+                return
+            messages, _done = parse_neigh_messages(data)
+            for msg_type, neighbor in messages:
+                if msg_type == RTM_DELNEIGH:
+                    self._forget(neighbor)
+                else:
+                    self._store(neighbor)
+                for listener in list(self._listeners):
+                    listener(neighbor)
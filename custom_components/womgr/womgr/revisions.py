@@ -0,0 +1,79 @@
+"""Revision tracking for incremental synchronisation."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+_UNSET = object()
+
+
+class RevisionLog:
+    """Assign increasing revision numbers to changes of a set of keys.
+
+    Every change of a key bumps :attr:`revision` and records it against
+    the key, so the keys changed after a given revision are found without
+    looking at unchanged ones. Removed keys leave tombstones; only the
+    newest ``max_tombstones`` are kept and :meth:`since` reports that a
+    full resync is needed for revisions older than the oldest one dropped.
+
+    Revisions start from the current time in milliseconds so they keep
+    increasing across restarts.
+    """
+
+    def __init__(self, max_tombstones: int = 1024) -> None:
+        self.max_tombstones = max_tombstones
+        self.revision = self.floor = int(time.time() * 1000)
+        self._changed: OrderedDict[str, int] = OrderedDict()
+        self._removed: OrderedDict[str, int] = OrderedDict()
+        self._fingerprints: dict[str, Any] = {}
+
+    def touch(self, key: str, fingerprint: Any = _UNSET) -> bool:
+        """Record a change of ``key`` and return whether it bumped the revision.
+
+        When ``fingerprint`` is given and equal to the previous one of
+        ``key``, nothing changed and the revision stays the same.
+        """
+        if fingerprint is not _UNSET:
+            if key in self._changed and self._fingerprints.get(key) == fingerprint:
+                return False
+            self._fingerprints[key] = fingerprint
+        else:
+            self._fingerprints.pop(key, None)
+        self.revision += 1
+        self._removed.pop(key, None)
+        self._changed[key] = self.revision
+        self._changed.move_to_end(key)
+        return True
+
+    def remove(self, key: str) -> None:
+        """Record the removal of ``key``."""
+        self._changed.pop(key, None)
+        self._fingerprints.pop(key, None)
+        self.revision += 1
+        self._removed[key] = self.revision
+        self._removed.move_to_end(key)
+        while len(self._removed) > self.max_tombstones:
+            _key, dropped = self._removed.popitem(last=False)
+            self.floor = dropped
+
+    def since(self, revision: int) -> tuple[list[str], list[str]] | None:
+        """Return ``(changed, removed)`` keys after ``revision``.
+
+        ``None`` means ``revision`` is unknown or too old for a delta and
+        the caller has to fetch everything.
+        """
+        if revision < self.floor or revision > self.revision:
+            return None
+        return _newer(self._changed, revision), _newer(self._removed, revision)
+
+
+def _newer(log: OrderedDict[str, int], revision: int) -> list[str]:
+    keys = []
+    for key, rev in reversed(log.items()):
+        if rev <= revision:
+            break
+        keys.append(key)
+    keys.reverse()
+    return keys
@@ -0,0 +1,130 @@
+"""Rolling latency and packet loss statistics."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+
+
+class LatencyHistory:
+    """Fixed-size ring buffer of recent probe results.
+
+    Each sample is a round-trip time in seconds or ``None`` for a lost
+    probe. Sums and monotonic min/max queues are maintained as samples
+    enter and leave the window, so :meth:`add` and :meth:`stats` run in
+    constant (amortized) time and memory never grows beyond ``size``
+    samples. Jitter is the mean absolute difference between consecutive
+    successful round-trip times. The buffers are allocated on the first
+    :meth:`add`, so histories of devices that were never probed stay small.
+    """
+
+    __slots__ = (
+        "size",
+        "_rtt",
+        "_diff",
+        "_index",
+        "_count",
+        "_seq",
+        "_lost",
+        "_rtt_sum",
+        "_rtt_count",
+        "_diff_sum",
+        "_diff_count",
+        "_last_rtt",
+        "_min",
+        "_max",
+    )
+
+    def __init__(self, size: int = 60) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._rtt: array | None = None
+        self._diff: array | None = None
+        self._index = 0
+        self._count = 0
+        self._seq = 0
+        self._lost = 0
+        self._rtt_sum = 0.0
+        self._rtt_count = 0
+        self._diff_sum = 0.0
+        self._diff_count = 0
+        self._last_rtt: float | None = None
+        self._min: deque[tuple[int, float]] | None = None
+        self._max: deque[tuple[int, float]] | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, rtt: float | None) -> None:
+        """Record the result of one probe."""
+        if self._rtt is None:
+            self._rtt = array("d", [math.nan]) * self.size
+            self._diff = array("d", [math.nan]) * self.size
+            self._min = deque()
+            self._max = deque()
+        idx = self._index
+        if self._count == self.size:
+            self._evict(idx)
+        else:
+            self._count += 1
+
+        if rtt is None:
+            self._rtt[idx] = math.nan
+            self._diff[idx] = math.nan
+            self._lost += 1
+        else:
+            self._rtt[idx] = rtt
+            self._rtt_sum += rtt
+            self._rtt_count += 1
+            if self._last_rtt is not None:
+                diff = abs(rtt - self._last_rtt)
+                self._diff[idx] = diff
+                self._diff_sum += diff
+                self._diff_count += 1
+            else:
+                self._diff[idx] = math.nan
+            self._last_rtt = rtt
+            while self._min and self._min[-1][1] >= rtt:
+                self._min.pop()
+            self._min.append((self._seq, rtt))
+            while self._max and self._max[-1][1] <= rtt:
+                self._max.pop()
+            self._max.append((self._seq, rtt))
+
+        self._seq += 1
+        self._index = (idx + 1) % self.size
+
+    def _evict(self, idx: int) -> None:
+        old = self._rtt[idx]
+        if math.isnan(old):
+            self._lost -= 1
+        else:
+            self._rtt_sum -= old
+            self._rtt_count -= 1
+        diff = self._diff[idx]
+        if not math.isnan(diff):
+            self._diff_sum -= diff
+            self._diff_count -= 1
+        oldest = self._seq - self.size
+        if self._min and self._min[0][0] == oldest:
+            self._min.popleft()
+        if self._max and self._max[0][0] == oldest:
+            self._max.popleft()
+
+    def stats(self) -> dict[str, float | int | None]:
+        """Return rolling statistics with times in milliseconds."""
+        has_rtt = self._rtt_count > 0
+        return {
+            "samples": self._count,
+            "loss": round(100 * self._lost / self._count, 1) if self._count else None,
+            "min": _ms(self._min[0][1]) if has_rtt else None,
+            "avg": _ms(self._rtt_sum / self._rtt_count) if has_rtt else None,
+            "max": _ms(self._max[0][1]) if has_rtt else None,
+            "jitter": _ms(self._diff_sum / self._diff_count) if self._diff_count else None,
+        }
+
+
+def _ms(seconds: float) -> float:
+    return round(max(seconds, 0.0) * 1000, 3)
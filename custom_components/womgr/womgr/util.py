@@ -50,3 +50,19 @@ def slugify(text: str) -> str:
     text = text.strip().lower().replace("-", "_").replace(" ", "_")
     text = _SLUG_RE.sub("_", text)
     return re.sub(r"_+", "_", text).strip("_")
+
+
+def parse_ports(text: str) -> list[int]:
+    """Parse a comma or space separated list of TCP ports.
+
+    ``ValueError`` is raised for entries that are not valid port numbers.
+    """
+    ports = []
+    for item in re.split(r"[,\s]+", text.strip()):
+        if not item:
+            continue
+        port = int(item)
+        if not 0 < port < 65536:
+            raise ValueError(f"Invalid port: {item}")
+        ports.append(port)
+    return ports
@@ -107,30 +107,34 @@ def _valid_input(**overrides):
     return data
 
 
+def _flow(*entries):
+    flow = WoMgrConfigFlow()
+    flow.hass = SimpleNamespace(data={})
+    flow._async_current_entries = lambda: list(entries)
+    return flow
+
+
 class TestConfigFlow(unittest.TestCase):
     def test_step_device_invalid_ip(self):
-        flow = WoMgrConfigFlow()
+        flow = _flow()
         result = asyncio.run(flow.async_step_device(_valid_input(ip="invalid")))
         self.assertEqual(result["type"], "form")
         self.assertEqual(result["errors"], {"ip": "invalid_ip"})
 
     def test_step_device_duplicate_device_name(self):
-        flow = WoMgrConfigFlow()
-        flow._async_current_entries = lambda: [SimpleNamespace(data=_valid_input())]
+        flow = _flow(SimpleNamespace(entry_id="1", data=_valid_input()))
         result = asyncio.run(flow.async_step_device(_valid_input()))
         self.assertEqual(result["type"], "abort")
         self.assertEqual(result["reason"], "duplicate_device_name")
 
     def test_step_device_duplicate_mac(self):
-        flow = WoMgrConfigFlow()
-        flow._async_current_entries = lambda: [SimpleNamespace(data=_valid_input())]
+        flow = _flow(SimpleNamespace(entry_id="1", data=_valid_input()))
         result = asyncio.run(flow.async_step_device(_valid_input(device_name="dev2")))
         self.assertEqual(result["type"], "abort")
         self.assertEqual(result["reason"], "duplicate_mac")
 
     def test_step_device_duplicate_ip(self):
-        flow = WoMgrConfigFlow()
-        flow._async_current_entries = lambda: [SimpleNamespace(data=_valid_input())]
+        flow = _flow(SimpleNamespace(entry_id="1", data=_valid_input()))
         result = asyncio.run(flow.async_step_device(_valid_input(device_name="dev2", mac="11:22:33:44:55:66")))
         self.assertEqual(result["type"], "abort")
         self.assertEqual(result["reason"], "duplicate_ip")
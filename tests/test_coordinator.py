@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+
+from womgr.coordinator import ReachabilityCoordinator
+
+
+class FakeSensor:
+    def __init__(self, name, tracker):
+        self.entity_id = name
+        self.is_on = False
+        self.updates = 0
+        self._tracker = tracker
+
+    async def update(self, backend=None):
+        self._tracker["running"] += 1
+        self._tracker["peak"] = max(self._tracker["peak"], self._tracker["running"])
+        await asyncio.sleep(0.01)
+        self._tracker["running"] -= 1
+        self.updates += 1
+        self.is_on = True
+        return True
+
+
+class TestReachabilityCoordinator(unittest.IsolatedAsyncioTestCase):
+    async def test_bounded_concurrency_and_push(self):
+        tracker = {"running": 0, "peak": 0}
+        coordinator = ReachabilityCoordinator(interval=0.05, max_concurrency=3)
+        sensors = [FakeSensor(f"s{i}", tracker) for i in range(20)]
+        pushed = []
+        removers = [
+            coordinator.add_sensor(s, lambda s=s: pushed.append(s)) for s in sensors
+        ]
+        await asyncio.sleep(0.3)
+        for remove in removers:
+            remove()
+
+        self.assertLessEqual(tracker["peak"], 3)
+        self.assertTrue(all(s.updates >= 1 for s in sensors))
+        self.assertEqual(set(pushed), set(sensors))
+        self.assertEqual(coordinator.sensors, [])
+
+    async def test_refresh_notifies_listeners(self):
+        tracker = {"running": 0, "peak": 0}
+        coordinator = ReachabilityCoordinator(interval=60)
+        sensor = FakeSensor("s", tracker)
+        pushed = []
+        remove = coordinator.add_sensor(sensor, lambda: pushed.append(True))
+        try:
+            self.assertTrue(await coordinator.async_refresh(sensor))
+        finally:
+            remove()
+        self.assertEqual(pushed, [True])
+        self.assertEqual(sensor.updates, 1)
+
+    async def test_global_listener(self):
+        tracker = {"running": 0, "peak": 0}
+        coordinator = ReachabilityCoordinator(interval=60)
+        sensors = [FakeSensor(f"s{i}", tracker) for i in range(2)]
+        updated = []
+        unsubscribe = coordinator.add_listener(updated.append)
+        removers = [coordinator.add_sensor(s) for s in sensors]
+        try:
+            for sensor in sensors:
+                await coordinator.async_refresh(sensor)
+            unsubscribe()
+            await coordinator.async_refresh(sensors[0])
+        finally:
+            for remove in removers:
+                remove()
+        self.assertEqual(updated, sensors)
+
+    async def test_concurrent_refreshes_share_probe(self):
+        tracker = {"running": 0, "peak": 0}
+        coordinator = ReachabilityCoordinator(interval=60, refresh_reuse=60)
+        sensor = FakeSensor("s", tracker)
+        remove = coordinator.add_sensor(sensor, lambda: None)
+        try:
+            results = await asyncio.gather(
+                *(coordinator.async_refresh(sensor) for _ in range(5))
+            )
+            self.assertEqual(results, [True] * 5)
+            self.assertEqual(sensor.updates, 1)
+            await coordinator.async_refresh(sensor)
+            self.assertEqual(sensor.updates, 1)
+        finally:
+            remove()
+
+    async def test_offline_backoff_is_capped(self):
+        coordinator = ReachabilityCoordinator(interval=10, jitter=0, max_interval=60)
+        sensor = FakeSensor("s", {"running": 0, "peak": 0})
+        remove = coordinator.add_sensor(sensor)
+        try:
+            intervals = [coordinator._next_interval(sensor) for _ in range(6)]
+            sensor.is_on = True
+            online = coordinator._next_interval(sensor)
+            sensor.is_on = False
+            after_online = coordinator._next_interval(sensor)
+        finally:
+            remove()
+        self.assertEqual(intervals, [10, 20, 40, 60, 60, 60])
+        self.assertEqual(online, 10)
+        self.assertEqual(after_online, 10)
+
+    async def test_boost_polls_fast(self):
+        coordinator = ReachabilityCoordinator(
+            interval=60, fast_interval=0.01, fast_duration=0.2
+        )
+        sensor = FakeSensor("s", {"running": 0, "peak": 0})
+        remove = coordinator.add_sensor(sensor)
+        try:
+            coordinator.boost(sensor)
+            await asyncio.sleep(0.15)
+            self.assertGreaterEqual(sensor.updates, 3)
+            await asyncio.sleep(0.1)
+            self.assertGreater(coordinator._next_interval(sensor), 1)
+        finally:
+            remove()
+
+
+if __name__ == "__main__":
+    unittest.main()
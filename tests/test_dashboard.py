@@ -18,6 +18,8 @@ ha.helpers.device_registry.async_get = lambda hass: types.SimpleNamespace(
     async_get_or_create=lambda **kw: types.SimpleNamespace(id="dev"),
     async_update_device=lambda *a, **k: None,
 )
+ha.helpers.start = types.ModuleType("start")
+ha.helpers.start.async_at_started = lambda hass, job: hass.async_create_task(job(hass))
 ha.components = types.ModuleType("components")
 ha.components.http = types.ModuleType("http")
 class DummyView:
@@ -80,6 +82,7 @@ sys.modules.setdefault("homeassistant.config_entries", ha.config_entries)
 sys.modules.setdefault("homeassistant.core", ha.core)
 sys.modules.setdefault("homeassistant.helpers", ha.helpers)
 sys.modules.setdefault("homeassistant.helpers.typing", ha.helpers.typing)
+sys.modules.setdefault("homeassistant.helpers.start", ha.helpers.start)
 sys.modules.setdefault("homeassistant.components", ha.components)
 sys.modules.setdefault("homeassistant.components.http", ha.components.http)
 sys.modules.setdefault("homeassistant.components.lovelace", lovelace)
@@ -183,3 +186,290 @@ def test_custom_dashboard_path():
         assert view is not None
 
     asyncio.run(run_test())
+
+
+def test_changes_are_written_in_one_batch():
+    from custom_components.womgr.const import DATA_DASHBOARD
+    from custom_components.womgr.dashboard import (
+        DashboardWriter,
+        async_remove_card,
+        async_update_card,
+    )
+
+    async def run_test():
+        dashboards = {}
+        hass = SimpleNamespace(
+            data={
+                "lovelace": {
+                    "dashboards": dashboards,
+                    "dashboards_collection": DummyDashboardsCollection(dashboards),
+                }
+            },
+            async_create_task=asyncio.create_task,
+        )
+        hass.data[DATA_DASHBOARD] = DashboardWriter(hass, debounce=0.01)
+        saves = []
+
+        def device(name):
+            return {"device_name": name, "dashboard": ""}
+
+        await async_update_card(hass, device("first"))
+        storage = dashboards["womgr"]
+        original_save = storage.async_save
+
+        async def counting_save(cfg):
+            saves.append([c["title"] for c in cfg["views"][0]["cards"]])
+            await original_save(cfg)
+
+        storage.async_save = counting_save
+
+        await asyncio.gather(
+            *(async_update_card(hass, device(f"dev{i}")) for i in range(20)),
+            async_update_card(hass, device("gone")),
+            async_remove_card(hass, device("first")),
+            async_remove_card(hass, device("gone")),
+        )
+
+        assert saves == [[f"dev{i}" for i in range(20)]]
+
+    asyncio.run(run_test())
+
+
+def test_built_cards_are_not_shared():
+    from custom_components.womgr.dashboard import build_card
+
+    card = build_card("womgr", {"device_name": "server"})
+    card["cards"][0]["cards"].clear()
+    card["title"] = "changed"
+    fresh = build_card("womgr", {"device_name": "server"})
+    assert fresh["title"] == "server"
+    assert len(fresh["cards"][0]["cards"]) == 4
+
+
+def test_unchanged_cards_are_not_saved():
+    from custom_components.womgr.const import DATA_DASHBOARD
+    from custom_components.womgr.dashboard import (
+        DashboardWriter,
+        async_update_card,
+        build_card,
+    )
+
+    async def run_test():
+        storage = DummyLovelaceStorage()
+        storage.config = {
+            "views": [
+                {
+                    "path": "womgr",
+                    "cards": [
+                        {"type": "markdown", "title": "notes"},
+                        build_card("womgr", {"device_name": "server"}),
+                    ],
+                }
+            ]
+        }
+        saves = []
+        original_save = storage.async_save
+
+        async def counting_save(cfg):
+            saves.append(cfg)
+            await original_save(cfg)
+
+        storage.async_save = counting_save
+        dashboards = {"womgr": storage}
+        hass = SimpleNamespace(
+            data={
+                "lovelace": {
+                    "dashboards": dashboards,
+                    "dashboards_collection": DummyDashboardsCollection(dashboards),
+                }
+            },
+            async_create_task=asyncio.create_task,
+        )
+        hass.data[DATA_DASHBOARD] = DashboardWriter(hass, debounce=0.01)
+
+        await async_update_card(hass, {"device_name": "server"})
+        assert saves == []
+
+        await async_update_card(hass, {"device_name": "server", "color": "#123456"})
+        assert len(saves) == 1
+        cards = storage.config["views"][0]["cards"]
+        assert cards[0]["title"] == "notes"
+        assert "#123456" in cards[1]["cards"][1]["style"]
+
+    asyncio.run(run_test())
+
+
+def test_dashboards_are_written_in_parallel():
+    from custom_components.womgr.const import DATA_DASHBOARD
+    from custom_components.womgr.dashboard import DashboardWriter, async_update_card
+
+    async def run_test():
+        active = []
+        peak = []
+
+        class SlowStorage(DummyLovelaceStorage):
+            async def async_save(self, cfg):
+                active.append(self)
+                peak.append(len(active))
+                await asyncio.sleep(0.02)
+                active.remove(self)
+                await super().async_save(cfg)
+
+        dashboards = {"one": SlowStorage(), "two": SlowStorage()}
+        hass = SimpleNamespace(
+            data={
+                "lovelace": {
+                    "dashboards": dashboards,
+                    "dashboards_collection": DummyDashboardsCollection(dashboards),
+                }
+            },
+            async_create_task=asyncio.create_task,
+        )
+        hass.data[DATA_DASHBOARD] = DashboardWriter(hass, debounce=0.01)
+
+        first = asyncio.create_task(
+            async_update_card(hass, {"device_name": "a", "dashboard": "one"})
+        )
+        # Closes the first batch of "one" while it is still being saved
+        await asyncio.sleep(0.015)
+        await asyncio.gather(
+            first,
+            async_update_card(hass, {"device_name": "a", "dashboard": "one", "color": "red"}),
+            async_update_card(hass, {"device_name": "b", "dashboard": "two"}),
+        )
+
+        assert max(peak) == 2
+        card = dashboards["one"].config["views"][0]["cards"][0]
+        assert "red" in card["cards"][1]["style"]
+
+    asyncio.run(run_test())
+
+
+def test_regenerate_groups_cards_by_location():
+    from custom_components.womgr.const import DATA_DASHBOARD
+    from custom_components.womgr.dashboard import DashboardWriter, async_regenerate
+    from womgr.entities import DeviceRegistry, setup_device
+
+    async def run_test():
+        storage = DummyLovelaceStorage()
+        storage.config = {
+            "views": [{"path": "womgr", "cards": [{"type": "markdown", "title": "old"}]}]
+        }
+        saves = []
+        original_save = storage.async_save
+
+        async def counting_save(cfg):
+            saves.append(cfg)
+            await original_save(cfg)
+
+        storage.async_save = counting_save
+        dashboards = {"womgr": storage}
+        registry = DeviceRegistry()
+        entries = {}
+        devices = [("b", "lab"), ("A", "office"), ("c", "lab"), ("other", "lab")]
+        for idx, (name, location) in enumerate(devices):
+            entry_id = str(idx)
+            setup_device(name, "00:11:22:33:44:55", "192.0.2.1", location, "linux",
+                         entry_id=entry_id, registry=registry)
+            dashboard = "elsewhere" if name == "other" else ""
+            entries[entry_id] = SimpleNamespace(
+                entry_id=entry_id, data={"device_name": name, "dashboard": dashboard}
+            )
+        hass = SimpleNamespace(
+            data={
+                DOMAIN: registry,
+                "lovelace": {
+                    "dashboards": dashboards,
+                    "dashboards_collection": DummyDashboardsCollection(dashboards),
+                },
+            },
+            config_entries=SimpleNamespace(
+                async_entries=lambda domain: list(entries.values())
+            ),
+            async_create_task=asyncio.create_task,
+        )
+        hass.data[DATA_DASHBOARD] = DashboardWriter(hass, debounce=0.01)
+
+        assert await async_regenerate(hass, "womgr") == {"womgr": 3}
+        cards = storage.config["views"][0]["cards"]
+        assert [c.get("heading") or c["title"] for c in cards] == [
+            "lab", "b", "c", "office", "A",
+        ]
+        assert len(saves) == 1
+
+        assert await async_regenerate(hass) == {"womgr": 3, "elsewhere": 1}
+        assert len(saves) == 1
+        assert dashboards["elsewhere"].config["views"][0]["cards"][1]["title"] == "other"
+
+        assert await async_regenerate(hass, "unused") == {}
+        assert "unused" not in dashboards
+        assert len(saves) == 1
+
+    asyncio.run(run_test())
+
+
+def test_hub_entry_sets_up_all_devices():
+    from custom_components.womgr.const import DATA_DASHBOARD
+    from custom_components.womgr.dashboard import DashboardWriter
+
+    async def run_test():
+        dashboards = {}
+        forwarded = []
+
+        class HubConfigEntries(DummyConfigEntries):
+            async def async_forward_entry_setups(self, entry, platforms):
+                forwarded.append(entry.entry_id)
+
+            def async_get_entry(self, entry_id):
+                return entry if entry_id == "hub" else None
+
+        tasks = []
+
+        def async_create_task(coro):
+            task = asyncio.create_task(coro)
+            tasks.append(task)
+            return task
+
+        hass = SimpleNamespace(
+            data={
+                DOMAIN: {},
+                "lovelace": {
+                    "dashboards": dashboards,
+                    "dashboards_collection": DummyDashboardsCollection(dashboards),
+                },
+            },
+            config_entries=HubConfigEntries(),
+            async_create_task=async_create_task,
+        )
+        hass.data[DATA_DASHBOARD] = DashboardWriter(hass, debounce=0.01)
+        listeners = []
+        entry = SimpleNamespace(
+            entry_id="hub",
+            data={
+                "devices": {
+                    f"dev{i}": {
+                        "device_name": f"server{i}",
+                        "mac": "00:11:22:33:44:55",
+                        "ip": f"192.0.2.{i}",
+                        "location": "here",
+                        "os_type": "linux",
+                        "dashboard": "",
+                    }
+                    for i in range(3)
+                }
+            },
+            add_update_listener=lambda listener: listeners.append(listener),
+            async_on_unload=lambda remove: None,
+        )
+
+        assert await async_setup_entry(hass, entry)
+        await asyncio.gather(*tasks)
+
+        assert forwarded == ["hub"]
+        assert len(listeners) == 1
+        assert sorted(hass.data[DOMAIN]) == ["dev0", "dev1", "dev2"]
+        assert hass.data[DOMAIN]["dev1"].entry_id == "dev1"
+        cards = dashboards["womgr"].config["views"][0]["cards"]
+        assert [c["title"] for c in cards] == ["server0", "server1", "server2"]
+
+    asyncio.run(run_test())
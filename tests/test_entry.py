@@ -18,6 +18,21 @@ ha.helpers.device_registry.async_get = lambda hass: types.SimpleNamespace(
     async_get_or_create=lambda **kw: types.SimpleNamespace(id="dev"),
     async_update_device=lambda *a, **k: None,
 )
+ha.helpers.start = types.ModuleType("start")
+ha.helpers.start.async_at_started = lambda hass, job: hass.async_create_task(job(hass))
+ha.helpers.dispatcher = types.ModuleType("dispatcher")
+ha.helpers.dispatcher.async_dispatcher_send = lambda hass, signal, *args: SIGNALS.append(signal)
+SIGNALS = []
+ha.helpers.entity_registry = types.ModuleType("entity_registry")
+ENTITY_ROWS = {}
+ha.helpers.entity_registry.async_get = lambda hass: types.SimpleNamespace(
+    async_update_entity=lambda entity_id, **changes: ENTITY_ROWS[entity_id].update(changes),
+)
+ha.helpers.entity_registry.async_entries_for_config_entry = lambda registry, entry_id: [
+    types.SimpleNamespace(entity_id=entity_id, **row)
+    for entity_id, row in ENTITY_ROWS.items()
+    if row["config_entry_id"] == entry_id
+]
 ha.components = types.ModuleType("components")
 ha.components.http = types.ModuleType("http")
 class DummyView:
@@ -68,6 +83,13 @@ sys.modules.setdefault("homeassistant.config_entries", ha.config_entries)
 sys.modules.setdefault("homeassistant.core", ha.core)
 sys.modules.setdefault("homeassistant.helpers", ha.helpers)
 sys.modules.setdefault("homeassistant.helpers.typing", ha.helpers.typing)
+sys.modules.setdefault("homeassistant.helpers.start", ha.helpers.start)
+sys.modules.setdefault("homeassistant.helpers.dispatcher", ha.helpers.dispatcher)
+sys.modules.setdefault("homeassistant.helpers.entity_registry", ha.helpers.entity_registry)
+# Another test module's helpers stub may have been registered first
+for _name in ("start", "dispatcher", "entity_registry"):
+    if not hasattr(sys.modules["homeassistant.helpers"], _name):
+        setattr(sys.modules["homeassistant.helpers"], _name, getattr(ha.helpers, _name))
 sys.modules.setdefault("homeassistant.components", ha.components)
 sys.modules.setdefault("homeassistant.components.http", ha.components.http)
 sys.modules.setdefault("homeassistant.components.lovelace", lovelace)
@@ -86,3 +108,174 @@ def test_unload_entry_without_data():
     entry = SimpleNamespace(data={}, entry_id="dummy")
     assert asyncio.run(async_unload_entry(hass, entry))
 
+
+class DummyMigrationEntries:
+    def __init__(self, entries):
+        self.entries = entries
+        self.removed = []
+
+    def async_entries(self, domain):
+        return list(self.entries)
+
+    def async_update_entry(self, entry, **changes):
+        for key, value in changes.items():
+            setattr(entry, key, value)
+
+    async def async_remove(self, entry_id):
+        self.removed.append(entry_id)
+
+
+def _legacy_entry(entry_id, name):
+    return SimpleNamespace(
+        entry_id=entry_id, version=2, unique_id=None, title=name,
+        data={
+            "device_name": name,
+            "mac": "00:11:22:33:44:55",
+            "ip": "192.0.2.1",
+            "location": "lab",
+            "os_type": "linux",
+        },
+    )
+
+
+def _migrate(entries):
+    from custom_components.womgr import async_migrate_entry
+
+    async def run():
+        config_entries = DummyMigrationEntries(entries)
+        hass = SimpleNamespace(
+            data={DOMAIN: {}},
+            config_entries=config_entries,
+            async_create_task=asyncio.ensure_future,
+        )
+        for entry in list(entries):
+            assert await async_migrate_entry(hass, entry)
+        await asyncio.sleep(0)
+        return config_entries.removed
+
+    return asyncio.run(run())
+
+
+def test_migrate_device_entries_into_base_entry():
+    base = SimpleNamespace(entry_id="base", version=2, unique_id=DOMAIN, data={})
+    first, second = _legacy_entry("a", "one"), _legacy_entry("b", "two")
+    removed = _migrate([first, base, second])
+
+    assert base.version == 3
+    assert list(base.data["devices"]) == ["a", "b"]
+    assert base.data["devices"]["b"]["device_name"] == "two"
+    # Migrated entries are removed by the hub once it adopted their devices
+    assert removed == []
+    assert first.data == {} and second.version == 3
+
+
+def test_migrate_first_device_entry_becomes_hub():
+    first, second = _legacy_entry("a", "one"), _legacy_entry("b", "two")
+    removed = _migrate([first, second])
+
+    assert first.unique_id == DOMAIN and first.title == "HaWoManager"
+    assert list(first.data["devices"]) == ["a", "b"]
+    assert removed == []
+
+
+class DummyHubEntry(SimpleNamespace):
+    def __init__(self, **kwargs):
+        super().__init__(listeners=[], **kwargs)
+
+    def add_update_listener(self, listener):
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def async_on_unload(self, func):
+        pass
+
+
+class DummyHubEntries(DummyMigrationEntries):
+    def __init__(self, hass, entries):
+        super().__init__(entries)
+        self.hass = hass
+        self.added = []
+
+    def async_get_entry(self, entry_id):
+        return next((e for e in self.entries if e.entry_id == entry_id), None)
+
+    def async_update_entry(self, entry, **changes):
+        super().async_update_entry(entry, **changes)
+        if "data" in changes:
+            for listener in getattr(entry, "listeners", []):
+                self.hass.async_create_task(listener(self.hass, entry))
+
+    async def async_forward_entry_setups(self, entry, platforms):
+        from custom_components.womgr.hub import register_platform
+
+        await asyncio.sleep(0)
+        register_platform(
+            self.hass, entry, lambda configs: self.added.extend(c.entry_id for c in configs)
+        )
+
+    async def async_remove(self, entry_id):
+        owned = [e for e, row in ENTITY_ROWS.items() if row["config_entry_id"] == entry_id]
+        self.removed.append((entry_id, owned))
+
+
+def _hub_hass(hub, *entries):
+    from custom_components.womgr.core import DeviceRegistry
+
+    hass = SimpleNamespace(data={DOMAIN: DeviceRegistry()}, async_create_task=asyncio.ensure_future)
+    hass.config_entries = DummyHubEntries(hass, [hub, *entries])
+    return hass
+
+
+def test_hub_adopts_entries_migrated_after_setup():
+    from custom_components.womgr import async_migrate_entry, async_setup_entry
+
+    hub = DummyHubEntry(entry_id="hub", version=3, unique_id=DOMAIN, data={"devices": {}})
+    first, second = _legacy_entry("a", "one"), _legacy_entry("b", "two")
+    second.data["mac"] = "00:11:22:33:44:66"
+    ENTITY_ROWS.clear()
+    ENTITY_ROWS["switch.one_wake"] = {"config_entry_id": "a"}
+
+    async def run():
+        hass = _hub_hass(hub, first, second)
+        setup = asyncio.ensure_future(async_setup_entry(hass, hub))
+        # The first entry migrates while the platforms are being set up
+        await asyncio.sleep(0)
+        assert await async_migrate_entry(hass, first)
+        assert await setup
+        assert await async_migrate_entry(hass, second)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return hass
+
+    hass = asyncio.run(run())
+    assert sorted(hass.data[DOMAIN]) == ["a", "b"]
+    assert sorted(hass.config_entries.added) == ["a", "b"]
+    assert ENTITY_ROWS["switch.one_wake"]["config_entry_id"] == "hub"
+    assert sorted(hass.config_entries.removed) == [("a", []), ("b", [])]
+
+
+def test_hub_recreates_only_changed_devices():
+    from custom_components.womgr import async_setup_entry
+    from custom_components.womgr.hub import SIGNAL_DEVICE_CHANGED
+
+    one = {**_legacy_entry("a", "one").data}
+    two = {**_legacy_entry("b", "two").data, "mac": "00:11:22:33:44:66", "ip": "192.0.2.2"}
+    hub = DummyHubEntry(entry_id="hub", version=3, unique_id=DOMAIN, data={"devices": {"a": one, "b": two}})
+    SIGNALS.clear()
+
+    async def run():
+        hass = _hub_hass(hub)
+        assert await async_setup_entry(hass, hub)
+        unchanged = hass.data[DOMAIN]["a"]
+        hass.config_entries.async_update_entry(
+            hub, data={"devices": {"a": one, "b": {**two, "ip": "192.0.2.3"}}}
+        )
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return hass, unchanged
+
+    hass, unchanged = asyncio.run(run())
+    assert hass.data[DOMAIN]["a"] is unchanged
+    assert hass.data[DOMAIN]["b"].ip == "192.0.2.3"
+    assert SIGNALS == [SIGNAL_DEVICE_CHANGED.format("b")]
+    assert hass.config_entries.added == ["a", "b", "b"]
@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from womgr.feed import DeviceFeed, format_event
+from womgr.jobs import PENDING, RUNNING, SUCCEEDED, JobManager
+
+
+class TestDeviceFeed(unittest.IsolatedAsyncioTestCase):
+    async def test_fan_out_and_close(self):
+        feed = DeviceFeed()
+        first, second = feed.subscribe(), feed.subscribe()
+        feed.publish("device", {"entry_id": "a"})
+        self.assertEqual(await first.get(), ("device", {"entry_id": "a"}))
+        self.assertEqual(await second.get(), ("device", {"entry_id": "a"}))
+        feed.unsubscribe(second)
+        feed.close()
+        self.assertIsNone(await first.get())
+        self.assertTrue(second.empty())
+        self.assertEqual(feed.subscribers, 0)
+
+    async def test_slow_subscriber_drops_oldest(self):
+        feed = DeviceFeed(maxsize=2)
+        queue = feed.subscribe()
+        for i in range(3):
+            feed.publish("device", {"n": i})
+        self.assertEqual([queue.get_nowait()[1]["n"] for _ in range(2)], [1, 2])
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event("job", {"status": "running"}),
+            b'event: job\ndata: {"status":"running"}\n\n',
+        )
+
+    async def test_job_listener(self):
+        manager = JobManager()
+        seen = []
+        remove = manager.add_listener(lambda job: seen.append(job.status))
+
+        async def action(job):
+            await asyncio.sleep(0)
+
+        job = manager.submit("refresh", "entry", action)
+        await manager.wait(job.id)
+        remove()
+        self.assertEqual(seen, [PENDING, RUNNING, SUCCEEDED])
+
+
+if __name__ == "__main__":
+    unittest.main()
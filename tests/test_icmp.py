@@ -0,0 +1,76 @@
+import asyncio
+import struct
+import unittest
+
+from womgr.icmp import (
+    IcmpProber,
+    build_echo_request,
+    checksum,
+    parse_echo_reply,
+)
+
+
+def _reply(ident, seq, ip_header=False):
+    packet = bytearray(build_echo_request(ident, seq))
+    packet[0] = 0
+    struct.pack_into("!H", packet, 2, 0)
+    struct.pack_into("!H", packet, 2, checksum(bytes(packet)))
+    if ip_header:
+        return bytes([0x45]) + bytes(19) + bytes(packet)
+    return bytes(packet)
+
+
+class TestPackets(unittest.TestCase):
+    def test_checksum_verifies(self):
+        packet = build_echo_request(0x1234, 7)
+        self.assertEqual(checksum(packet), 0)
+
+    def test_request_is_not_a_reply(self):
+        self.assertIsNone(parse_echo_reply(build_echo_request(1, 2)))
+
+    def test_parse_reply(self):
+        self.assertEqual(parse_echo_reply(_reply(1, 2)), (1, 2))
+
+    def test_parse_raw_reply(self):
+        self.assertEqual(parse_echo_reply(_reply(5, 9, True), raw=True), (5, 9))
+
+    def test_truncated(self):
+        self.assertIsNone(parse_echo_reply(b"\x00\x00"))
+
+
+class TestReplyMatching(unittest.IsolatedAsyncioTestCase):
+    async def test_matches_by_sequence_and_source(self):
+        prober = IcmpProber()
+        prober.raw = True
+        prober.ident = 42
+        loop = asyncio.get_running_loop()
+        first, second = loop.create_future(), loop.create_future()
+        prober._pending[(42, 1)] = ("192.0.2.1", first)
+        prober._pending[(42, 2)] = ("192.0.2.2", second)
+
+        prober._handle(_reply(42, 2, True), ("192.0.2.1", 0), 1.0)
+        prober._handle(_reply(43, 1, True), ("192.0.2.1", 0), 1.0)
+        self.assertFalse(first.done())
+        self.assertFalse(second.done())
+
+        prober._handle(_reply(42, 2, True), ("192.0.2.2", 0), 2.5)
+        self.assertEqual(second.result(), 2.5)
+        self.assertFalse(first.done())
+
+    async def test_loopback(self):
+        prober = IcmpProber()
+        try:
+            prober.open()
+        except OSError:
+            self.skipTest("ICMP sockets not permitted")
+        try:
+            results = await asyncio.gather(
+                *(prober.ping("127.0.0.1", timeout=2) for _ in range(5))
+            )
+        finally:
+            prober.close()
+        self.assertTrue(all(r is not None for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import random
+import unittest
+
+from womgr.entities import ConfigEntry
+from womgr.index import SORT_KEYS, DeviceIndex
+
+
+def _entry(name, ip, location="lab", os_type="linux"):
+    return ConfigEntry(name, "00:11:22:33:44:55", ip, os_type, location)
+
+
+class TestDeviceIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = DeviceIndex()
+        for i, name in enumerate(["delta", "Alpha", "charlie", "bravo", "echo"]):
+            location = "office" if i % 2 else "lab"
+            os_type = "windows" if name == "echo" else "linux"
+            self.index.add(name, _entry(name, f"192.0.2.{10 - i}", location, os_type))
+
+    def test_pagination(self):
+        pages = []
+        cursor = None
+        while True:
+            ids, cursor, total = self.index.query(limit=2, cursor=cursor)
+            pages.append(ids)
+            if cursor is None:
+                break
+        self.assertEqual(pages, [["Alpha", "bravo"], ["charlie", "delta"], ["echo"]])
+        self.assertEqual(total, 5)
+
+    def test_descending_and_ip_sort(self):
+        ids, cursor, _ = self.index.query(sort="ip", limit=3)
+        self.assertEqual(ids, ["echo", "bravo", "charlie"])
+        ids, cursor, _ = self.index.query(descending=True, limit=3)
+        self.assertEqual(ids, ["echo", "delta", "charlie"])
+        ids, cursor, _ = self.index.query(descending=True, limit=3, cursor=cursor)
+        self.assertEqual(ids, ["bravo", "Alpha"])
+        self.assertIsNone(cursor)
+
+    def test_filters(self):
+        self.assertEqual(self.index.query(location="office")[0], ["Alpha", "bravo"])
+        self.assertEqual(self.index.query(os_type="windows")[0], ["echo"])
+        self.assertEqual(self.index.query(prefix="ch")[0], ["charlie"])
+        self.index.set_online("delta", True)
+        self.index.set_online("bravo", True)
+        self.assertEqual(self.index.query(online=True)[0], ["bravo", "delta"])
+        self.assertEqual(
+            self.index.query(online=False, location="lab")[0], ["charlie", "echo"]
+        )
+        ids, cursor, total = self.index.query(online=False, limit=1)
+        self.assertEqual((ids, total), (["Alpha"], 3))
+        self.assertEqual(self.index.query(online=False, cursor=cursor)[0], ["charlie", "echo"])
+
+    def test_filtered_pages_match_full_sort(self):
+        rng = random.Random(1)
+        index = DeviceIndex()
+        configs = {}
+        for i in range(200):
+            config = _entry(
+                f"dev{rng.randrange(1000):03d}",
+                f"10.0.{rng.randrange(4)}.{i}",
+                rng.choice(["lab", "office", "rack"]),
+                rng.choice(["linux", "windows"]),
+            )
+            configs[str(i)] = config
+            index.add(str(i), config)
+        online = {str(i) for i in range(0, 200, 3)}
+        for entry_id in online:
+            index.set_online(entry_id, True)
+        index.set_online("3", False)
+        online.discard("3")
+        for options in (
+            {"online": False},
+            {"online": True, "location": "lab"},
+            {"os_type": "windows", "prefix": "dev1"},
+            {"location": "rack", "online": False},
+        ):
+            for sort in ("name", "ip"):
+                for descending in (False, True):
+                    expected = sorted(
+                        (
+                            entry_id
+                            for entry_id, config in configs.items()
+                            if config.location == options.get("location", config.location)
+                            and config.os_type == options.get("os_type", config.os_type)
+                            and config.device_name.startswith(options.get("prefix", ""))
+                            and (entry_id in online) == options.get("online", entry_id in online)
+                        ),
+                        key=lambda entry_id: (SORT_KEYS[sort](configs[entry_id]), entry_id),
+                        reverse=descending,
+                    )
+                    ids, cursor = [], None
+                    while True:
+                        page, cursor, total = index.query(
+                            sort=sort, descending=descending, cursor=cursor, limit=7, **options
+                        )
+                        ids += page
+                        if cursor is None:
+                            break
+                    self.assertEqual(ids, expected)
+                    self.assertEqual(total, len(expected))
+
+    def test_remove_and_replace(self):
+        self.index.set_online("delta", True)
+        self.index.remove("delta")
+        self.assertNotIn("delta", self.index)
+        self.assertEqual(self.index.query(online=True)[0], [])
+        self.index.add("bravo", _entry("zulu", "192.0.2.99"))
+        self.assertEqual(self.index.query()[0][-1], "bravo")
+        self.assertEqual(len(self.index), 4)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            self.index.query(sort="mac")
+        with self.assertRaises(ValueError):
+            self.index.query(cursor="!!!")
+        _ids, cursor, _ = self.index.query(limit=1)
+        with self.assertRaises(ValueError):
+            self.index.query(sort="ip", cursor=cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import unittest
+
+from womgr.jobs import FAILED, PENDING, RUNNING, SUCCEEDED, JobManager, SingleFlight
+from womgr.wol import wake_and_confirm
+
+
+class FakeSwitch:
+    def __init__(self):
+        self.sent = 0
+
+    async def async_turn_on(self):
+        self.sent += 1
+
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+    async def test_success(self):
+        manager = JobManager()
+
+        async def action(job):
+            await asyncio.sleep(0)
+            return {"value": job.target}
+
+        job = manager.submit("refresh", "entry", action)
+        self.assertFalse(job.done)
+        await manager.wait(job.id)
+        self.assertEqual(job.status, SUCCEEDED)
+        self.assertEqual(job.as_dict()["result"], {"value": "entry"})
+        self.assertIs(manager.get(job.id), job)
+
+    async def test_failure(self):
+        manager = JobManager()
+
+        async def action(job):
+            raise RuntimeError("boom")
+
+        job = manager.submit("restart", "entry", action)
+        await manager.wait(job.id)
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, "boom")
+        self.assertIsNotNone(job.finished)
+
+    async def test_worker_limit(self):
+        manager = JobManager(max_workers=2)
+        running = []
+        peak = 0
+        release = asyncio.Event()
+
+        async def action(job):
+            nonlocal peak
+            running.append(job)
+            peak = max(peak, len(running))
+            await release.wait()
+            running.remove(job)
+
+        jobs = [manager.submit("refresh", str(i), action) for i in range(5)]
+        await asyncio.sleep(0.01)
+        self.assertEqual(sum(job.status == RUNNING for job in jobs), 2)
+        self.assertEqual(sum(job.status == PENDING for job in jobs), 3)
+        release.set()
+        for job in jobs:
+            await manager.wait(job.id)
+        self.assertEqual(peak, 2)
+        self.assertTrue(all(job.status == SUCCEEDED for job in jobs))
+
+    async def test_shared_limit(self):
+        manager = JobManager(max_workers=4)
+        limit = asyncio.Semaphore(1)
+        release = asyncio.Event()
+
+        async def action(job):
+            await release.wait()
+
+        limited = [manager.submit("refresh", str(i), action, limit=limit) for i in range(3)]
+        other = manager.submit("refresh", "other", action)
+        await asyncio.sleep(0.01)
+        self.assertEqual([job.status for job in limited], [RUNNING, PENDING, PENDING])
+        self.assertEqual(other.status, RUNNING)
+        release.set()
+        for job in [*limited, other]:
+            await manager.wait(job.id)
+        self.assertTrue(all(job.status == SUCCEEDED for job in limited))
+
+    async def test_release(self):
+        manager = JobManager(max_workers=8)
+        online = asyncio.Event()
+
+        async def wake(job):
+            manager.release(job)
+            await online.wait()
+
+        async def refresh(job):
+            return None
+
+        wakes = [manager.submit("wake", str(i), wake) for i in range(8)]
+        await asyncio.sleep(0.01)
+        other = manager.submit("refresh", "other", refresh)
+        await asyncio.wait_for(manager.wait(other.id), 1)
+        self.assertEqual(other.status, SUCCEEDED)
+        self.assertTrue(all(job.status == RUNNING for job in wakes))
+        online.set()
+        for job in wakes:
+            await manager.wait(job.id)
+        self.assertTrue(all(job.status == SUCCEEDED for job in wakes))
+
+    async def test_eviction(self):
+        manager = JobManager(max_jobs=3, max_age=60)
+
+        async def action(job):
+            return None
+
+        jobs = []
+        for i in range(5):
+            job = manager.submit("refresh", str(i), action)
+            await manager.wait(job.id)
+            jobs.append(job)
+        self.assertEqual([job.target for job in manager.jobs()], ["4", "3", "2"])
+
+        jobs[-1].finished -= 120
+        self.assertEqual([job.target for job in manager.jobs()], ["3", "2"])
+
+
+class TestCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def test_submit_joins_running_job(self):
+        manager = JobManager()
+        calls = []
+
+        async def action(job):
+            calls.append(job.id)
+            await asyncio.sleep(0.01)
+
+        first = manager.submit("wake", "entry", action)
+        self.assertIs(manager.submit("wake", "entry", action), first)
+        self.assertIs(manager.active("wake", "entry"), first)
+        other = manager.submit("wake", "other", action)
+        self.assertIsNot(other, first)
+        await manager.wait(first.id)
+        self.assertIsNone(manager.active("wake", "entry"))
+
+        refresh = manager.submit("refresh", "entry", action, reuse=60)
+        await manager.wait(refresh.id)
+        self.assertIs(manager.submit("refresh", "entry", action, reuse=60), refresh)
+        again = manager.submit("wake", "entry", action)
+        self.assertIsNot(again, first)
+        await manager.wait(again.id)
+        self.assertEqual(len(calls), 4)
+
+    async def test_single_flight(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def probe():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(flight.run("a", probe), flight.run("a", probe))
+        self.assertEqual(results, [1, 1])
+        self.assertEqual(await flight.run("a", probe), 2)
+
+
+class TestWakeAndConfirm(unittest.IsolatedAsyncioTestCase):
+    async def test_comes_online(self):
+        switch = FakeSwitch()
+        checks = []
+
+        async def is_online():
+            checks.append(True)
+            return len(checks) >= 4
+
+        sent = []
+        result = await wake_and_confirm(
+            switch,
+            is_online,
+            packets=2,
+            retry_interval=0.01,
+            poll_interval=0.01,
+            timeout=5,
+            on_sent=lambda: sent.append(switch.sent),
+        )
+        self.assertTrue(result["online"])
+        self.assertEqual(switch.sent, 2)
+        self.assertEqual(sent, [2])
+        self.assertIsNotNone(result["wake_to_online"])
+
+    async def test_deadline(self):
+        switch = FakeSwitch()
+
+        async def is_online():
+            return False
+
+        result = await wake_and_confirm(
+            switch, is_online, packets=3, retry_interval=0.01, poll_interval=0.01, timeout=0.1
+        )
+        self.assertEqual(result, {"online": False, "packets": 3, "wake_to_online": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
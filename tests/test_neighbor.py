@@ -0,0 +1,150 @@
+import socket
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from womgr.coordinator import ReachabilityCoordinator
+from womgr.entities import setup_device
+from womgr.neighbor import (
+    NUD_FAILED,
+    NUD_INCOMPLETE,
+    NUD_REACHABLE,
+    NUD_STALE,
+    RTM_NEWNEIGH,
+    Neighbor,
+    NeighborTable,
+    parse_neigh_messages,
+    parse_proc_arp,
+)
+
+PROC_ARP = """IP address       HW type     Flags       HW address            Mask     Device
+192.0.2.1        0x1         0x2         00:11:22:33:44:55     *        eth0
+192.0.2.2        0x1         0x0         00:00:00:00:00:00     *        eth0
+"""
+
+MAC = bytes.fromhex("001122334455")
+
+
+def _neigh_message(ip, mac, state):
+    attrs = struct.pack("=HH", 8, 1) + socket.inet_aton(ip)
+    if mac is not None:
+        attrs += struct.pack("=HH", 10, 2) + mac + b"\x00\x00"
+    body = struct.pack("=BxxxiHBB", socket.AF_INET, 2, state, 0, 1) + attrs
+    return struct.pack("=IHHII", 16 + len(body), RTM_NEWNEIGH, 0, 0, 0) + body
+
+
+def _table(*neighbors):
+    table = NeighborTable(max_age=3600)
+    table._loaded = time.monotonic()
+    for neighbor in neighbors:
+        table._store(neighbor)
+    return table
+
+
+class TestParsing(unittest.TestCase):
+    def test_proc_arp(self):
+        entries = parse_proc_arp(PROC_ARP)
+        first = entries[0]
+        self.assertEqual((first.ip, first.mac, first.state), ("192.0.2.1", MAC, NUD_STALE))
+        self.assertIsNone(entries[1].mac)
+
+    def test_netlink_messages(self):
+        data = _neigh_message("192.0.2.1", MAC, NUD_REACHABLE) + _neigh_message(
+            "192.0.2.2", None, NUD_FAILED
+        )
+        messages, done = parse_neigh_messages(data)
+        self.assertFalse(done)
+        self.assertEqual(
+            [(n.ip, n.mac, n.state) for _t, n in messages],
+            [("192.0.2.1", MAC, NUD_REACHABLE), ("192.0.2.2", None, NUD_FAILED)],
+        )
+
+
+class TestLiveness(unittest.TestCase):
+    def test_states(self):
+        table = _table(Neighbor("192.0.2.1", MAC, NUD_REACHABLE))
+        self.assertTrue(table.liveness(MAC))
+        table._store(Neighbor("192.0.2.1", MAC, NUD_STALE))
+        self.assertIsNone(table.liveness(MAC))
+        table._store(Neighbor("192.0.2.1", None, NUD_FAILED))
+        self.assertFalse(table.liveness(MAC))
+        table._store(Neighbor("192.0.2.1", MAC, NUD_INCOMPLETE))
+        self.assertIsNone(table.liveness(MAC))
+        self.assertIsNone(table.liveness(bytes(6), "192.0.2.50"))
+
+
+class TestRefresh(unittest.IsolatedAsyncioTestCase):
+    async def test_stale_table_reloads_in_background(self):
+        with tempfile.NamedTemporaryFile("w", suffix="arp") as fh:
+            fh.write(PROC_ARP)
+            fh.flush()
+            table = NeighborTable(max_age=0, path=fh.name)
+            with mock.patch("womgr.neighbor.dump_netlink", side_effect=OSError):
+                self.assertIsNone(table.lookup(MAC))
+                await table._refreshing
+        self.assertEqual(table.lookup(MAC).ip, "192.0.2.1")
+
+
+class TestPassiveCoordinator(unittest.IsolatedAsyncioTestCase):
+    async def test_reachable_skips_probe(self):
+        entry = setup_device("dev", "00:11:22:33:44:55", "192.0.2.1", "lab", "linux")
+        sensor = entry.entities[1]
+
+        class Backend:
+            calls = 0
+
+            async def probe(self, ip, timeout=1.0):
+                Backend.calls += 1
+                return None
+
+            def close(self):
+                pass
+
+        table = _table(Neighbor("192.0.2.1", MAC, NUD_REACHABLE))
+        table.start = lambda: None
+        coordinator = ReachabilityCoordinator(interval=60, backend=Backend(), neighbors=table)
+        pushed = []
+        remove = coordinator.add_sensor(sensor, lambda: pushed.append(sensor.is_on))
+        try:
+            self.assertTrue(await coordinator.async_refresh(sensor))
+            self.assertEqual(Backend.calls, 0)
+
+            table._store(Neighbor("192.0.2.1", MAC, NUD_STALE))
+            self.assertFalse(await coordinator.async_refresh(sensor))
+            self.assertEqual(Backend.calls, 1)
+
+            table._store(Neighbor("192.0.2.1", MAC, NUD_REACHABLE))
+            coordinator._on_neighbor(Neighbor("192.0.2.1", MAC, NUD_REACHABLE))
+        finally:
+            remove()
+        self.assertEqual(pushed, [True, False, True])
+
+    async def test_failed_entry_still_probes(self):
+        entry = setup_device("dev", "00:11:22:33:44:55", "192.0.2.1", "lab", "linux")
+        sensor = entry.entities[1]
+
+        class Backend:
+            calls = 0
+
+            async def probe(self, ip, timeout=1.0):
+                Backend.calls += 1
+                return 0.001
+
+            def close(self):
+                pass
+
+        table = _table(Neighbor("192.0.2.1", MAC, NUD_FAILED))
+        table.start = lambda: None
+        coordinator = ReachabilityCoordinator(interval=60, backend=Backend(), neighbors=table)
+        remove = coordinator.add_sensor(sensor, lambda: None)
+        try:
+            self.assertTrue(await coordinator.async_refresh(sensor))
+            self.assertEqual(Backend.calls, 1)
+        finally:
+            remove()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from womgr.probe import FpingBackend, get_backend, parse_fping_line
+
+FAKE_FPING = """#!{python}
+import sys
+with open({log!r}, "a") as fh:
+    fh.write(" ".join(sys.argv[1:]) + "\\n")
+for host in sys.argv[1:]:
+    if host.startswith("-") or host.isdigit():
+        continue
+    if host.startswith("127."):
+        print(host, "is alive (0.25 ms)", flush=True)
+    else:
+        print(host, "is unreachable", flush=True)
+"""
+
+
+class TestParseFping(unittest.TestCase):
+    def test_alive(self):
+        self.assertEqual(
+            parse_fping_line("10.0.0.1 is alive (1.50 ms)\n"), ("10.0.0.1", 0.0015)
+        )
+
+    def test_unreachable(self):
+        self.assertEqual(parse_fping_line("10.0.0.2 is unreachable"), ("10.0.0.2", None))
+
+    def test_noise(self):
+        self.assertIsNone(parse_fping_line("ICMP Host Unreachable from 10.0.0.9"))
+
+
+class TestGetBackend(unittest.TestCase):
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_backend("carrier-pigeon")
+
+
+class TestFpingBackend(unittest.IsolatedAsyncioTestCase):
+    async def test_single_process_per_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "calls.log")
+            script = os.path.join(tmp, "fping")
+            with open(script, "w") as fh:
+                fh.write(FAKE_FPING.format(python=sys.executable, log=log))
+            os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+
+            backend = FpingBackend(window=0.01)
+            with patch("womgr.probe.shutil.which", return_value=script):
+                results = await asyncio.gather(
+                    backend.probe("127.0.0.1"),
+                    backend.probe("192.0.2.1"),
+                    backend.probe("127.0.0.2"),
+                )
+            batches = list(backend._batches)
+            backend.close()
+            await asyncio.gather(*batches, return_exceptions=True)
+            with open(log) as fh:
+                calls = fh.read().splitlines()
+
+        self.assertEqual(results, [0.00025, None, 0.00025])
+        self.assertEqual(len(calls), 1)
+
+    async def test_close_reaps_process(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "fping")
+            with open(script, "w") as fh:
+                fh.write(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+            os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+
+            backend = FpingBackend(window=0.01)
+            processes = []
+            spawn = asyncio.create_subprocess_exec
+
+            async def create_subprocess_exec(*args, **kwargs):
+                processes.append(await spawn(*args, **kwargs))
+                return processes[-1]
+
+            with patch("womgr.probe.shutil.which", return_value=script), patch(
+                "womgr.probe.asyncio.create_subprocess_exec", create_subprocess_exec
+            ):
+                probe = asyncio.ensure_future(backend.probe("127.0.0.1"))
+                while not processes:
+                    await asyncio.sleep(0.01)
+                batches = list(backend._batches)
+                backend.close()
+                await asyncio.gather(*batches, return_exceptions=True)
+
+        self.assertIsNotNone(processes[0].returncode)
+        self.assertTrue(probe.cancelled() or probe.result() is None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import dataclasses
+import unittest
+
+from womgr.entities import (
+    ConfigEntry,
+    DeviceRegistry,
+    PingBinarySensor,
+    SystemCommandSwitch,
+    WakeOnLanSwitch,
+    remove_device,
+    setup_device,
+)
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = DeviceRegistry()
+        self.entry = setup_device(
+            "Office PC",
+            "AA-BB-CC-DD-EE-FF",
+            "192.0.2.10",
+            "office",
+            "windows",
+            entry_id="a",
+            registry=self.registry,
+        )
+
+    def test_typed_references(self):
+        self.assertIsInstance(self.entry.wol, WakeOnLanSwitch)
+        self.assertIsInstance(self.entry.ping, PingBinarySensor)
+        self.assertIsInstance(self.entry.system, SystemCommandSwitch)
+        self.assertEqual(self.entry.service.entity_id, "womgr_office_pc_service")
+
+    def test_lookups(self):
+        self.assertIs(self.registry["a"], self.entry)
+        self.assertEqual(self.registry.by_mac("aa:bb:cc:dd:ee:ff"), [self.entry])
+        self.assertEqual(self.registry.by_mac(bytes.fromhex("aabbccddeeff")), [self.entry])
+        self.assertEqual(self.registry.by_ip(" 192.0.2.10"), [self.entry])
+        self.assertEqual(self.registry.by_slug("office-pc"), [self.entry])
+        self.assertEqual(self.registry.by_location("office"), [self.entry])
+        self.assertEqual(self.registry.by_location("lab"), [])
+
+    def test_replace_and_remove(self):
+        other = setup_device(
+            "Lab PC", "11:22:33:44:55:66", "192.0.2.11", "lab", "linux", entry_id="a"
+        )
+        self.registry["a"] = other
+        self.assertEqual(self.registry.by_slug("office pc"), [])
+        self.assertEqual(self.registry.by_location("lab"), [other])
+
+        remove_device(self.entry, self.registry)
+        self.assertIn("a", self.registry)
+        remove_device(other, self.registry)
+        self.assertEqual(len(self.registry), 0)
+        self.assertEqual(self.registry.by_mac("11:22:33:44:55:66"), [])
+        self.assertIsNone(other.ping)
+
+
+class TestCompactEntries(unittest.TestCase):
+    def test_mac_parsed_once(self):
+        entry = setup_device("Office PC", "aa-bb-cc-dd-ee-ff", "192.0.2.10", "", "")
+        self.assertEqual(entry.mac, "aa-bb-cc-dd-ee-ff")
+        self.assertEqual(entry.wol.mac, "aa-bb-cc-dd-ee-ff")
+        self.assertEqual(entry.mac_bytes, bytes.fromhex("aabbccddeeff"))
+        self.assertIs(entry.mac_bytes, entry.mac_bytes)
+        entry.mac = "11:22:33:44:55:66"
+        self.assertEqual(entry.mac_bytes, bytes.fromhex("112233445566"))
+
+    def test_invalid_mac_kept(self):
+        entry = ConfigEntry("Device", "not a mac", "192.0.2.10", "linux")
+        self.assertIsNone(entry.mac_bytes)
+        self.assertEqual(entry.mac, "not a mac")
+
+    def test_dataclass(self):
+        entry = ConfigEntry("Device", "AA:BB:CC:DD:EE:FF", "192.0.2.10", "linux")
+        self.assertEqual(entry, ConfigEntry("Device", "AA:BB:CC:DD:EE:FF", "192.0.2.10", "linux"))
+        self.assertEqual(dataclasses.asdict(entry)["mac"], "AA:BB:CC:DD:EE:FF")
+        other = dataclasses.replace(entry, device_name="Other")
+        self.assertEqual(other.device_name, "Other")
+        self.assertNotEqual(other, entry)
+        self.assertIn("mac='AA:BB:CC:DD:EE:FF'", repr(entry))
+
+    def test_slots(self):
+        entry = setup_device("Office PC", "AA:BB:CC:DD:EE:FF", "192.0.2.10", "", "windows")
+        for obj in (entry, *entry.entities):
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from womgr.revisions import RevisionLog
+
+
+class TestRevisionLog(unittest.TestCase):
+    def test_delta(self):
+        log = RevisionLog()
+        start = log.revision
+        self.assertEqual(log.since(start), ([], []))
+        log.touch("a")
+        log.touch("b")
+        middle = log.revision
+        log.touch("a")
+        log.remove("b")
+        self.assertEqual(log.since(start), (["a"], ["b"]))
+        self.assertEqual(log.since(middle), (["a"], ["b"]))
+        self.assertEqual(log.since(log.revision), ([], []))
+
+    def test_fingerprint_skips_unchanged(self):
+        log = RevisionLog()
+        self.assertTrue(log.touch("a", (True,)))
+        revision = log.revision
+        self.assertFalse(log.touch("a", (True,)))
+        self.assertEqual(log.revision, revision)
+        self.assertTrue(log.touch("a", (False,)))
+        self.assertEqual(log.since(revision), (["a"], []))
+
+    def test_readded_key_is_not_removed(self):
+        log = RevisionLog()
+        start = log.revision
+        log.remove("a")
+        log.touch("a")
+        self.assertEqual(log.since(start), (["a"], []))
+
+    def test_old_or_unknown_revision_needs_resync(self):
+        log = RevisionLog(max_tombstones=2)
+        start = log.revision
+        for key in "abc":
+            log.touch(key)
+            log.remove(key)
+        self.assertIsNone(log.since(start))
+        self.assertEqual(log.since(log.floor), ([], ["b", "c"]))
+        self.assertIsNone(log.since(log.revision + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import socket
+import unittest
+
+from womgr.entities import ServiceBinarySensor, setup_device
+from womgr.util import parse_ports
+
+
+class TestParsePorts(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(parse_ports("22, 3389 8080"), [22, 3389, 8080])
+        self.assertEqual(parse_ports(""), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_ports("ssh")
+        with self.assertRaises(ValueError):
+            parse_ports("70000")
+
+
+class TestDefaults(unittest.TestCase):
+    def test_os_defaults(self):
+        self.assertEqual(ServiceBinarySensor("dev", "1.2.3.4", "linux").ports, [22])
+        self.assertEqual(ServiceBinarySensor("dev", "1.2.3.4", "Windows").ports, [3389])
+
+    def test_setup_device_ports(self):
+        entry = setup_device(
+            "dev", "00:11:22:33:44:55", "1.2.3.4", "lab", "linux", service_ports=[8022]
+        )
+        service = entry.entities[-1]
+        self.assertIsInstance(service, ServiceBinarySensor)
+        self.assertEqual(service.entity_id, "womgr_dev_service")
+        self.assertEqual(service.ports, [8022])
+
+
+class TestServiceProbe(unittest.IsolatedAsyncioTestCase):
+    async def test_open_and_closed_ports(self):
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        open_port = server.sockets[0].getsockname()[1]
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            closed_port = probe.getsockname()[1]
+        sensor = ServiceBinarySensor(
+            "dev", "127.0.0.1", "linux", [open_port, closed_port], timeout=1
+        )
+        try:
+            self.assertTrue(await sensor.update())
+        finally:
+            server.close()
+            await server.wait_closed()
+        self.assertEqual(sensor.open_ports, {open_port: True, closed_port: False})
+
+
+if __name__ == "__main__":
+    unittest.main()
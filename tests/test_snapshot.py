@@ -0,0 +1,53 @@
+import gzip
+import unittest
+
+from womgr.snapshot import MIN_COMPRESS_SIZE, SnapshotCache, negotiate_encoding, render_json
+
+
+class TestRendered(unittest.TestCase):
+    def test_etag_matching(self):
+        rendered = render_json({"a": 1})
+        self.assertEqual(rendered.etag, render_json({"a": 1}).etag)
+        self.assertNotEqual(rendered.etag, render_json({"a": 2}).etag)
+        self.assertTrue(rendered.not_modified(rendered.etag))
+        self.assertTrue(rendered.not_modified(f'"other", W/{rendered.etag}'))
+        self.assertTrue(rendered.not_modified("*"))
+        self.assertFalse(rendered.not_modified('"other"'))
+        self.assertFalse(rendered.not_modified(None))
+
+    def test_gzip_is_cached(self):
+        rendered = render_json(["x" * MIN_COMPRESS_SIZE])
+        body, encoding = rendered.encode("gzip, deflate")
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(gzip.decompress(body), rendered.body)
+        self.assertIs(rendered.encode("gzip")[0], body)
+
+    def test_negotiation(self):
+        self.assertIsNone(negotiate_encoding("gzip", 10))
+        self.assertIsNone(negotiate_encoding(None, 4096))
+        self.assertIsNone(negotiate_encoding("gzip;q=0, identity", 4096))
+        self.assertEqual(negotiate_encoding("identity, gzip;q=0.5", 4096), "gzip")
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def test_rebuilt_when_key_changes(self):
+        builds = []
+        cache = SnapshotCache(lambda: builds.append(1) or len(builds))
+        first = cache.get(1)
+        self.assertIs(cache.get(1), first)
+        self.assertEqual(len(builds), 1)
+        self.assertIsNot(cache.get(2), first)
+        cache.invalidate()
+        cache.get(2)
+        self.assertEqual(len(builds), 3)
+
+    def test_max_age(self):
+        builds = []
+        cache = SnapshotCache(lambda: builds.append(1), max_age=0)
+        cache.get(1)
+        cache.get(1)
+        self.assertEqual(len(builds), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
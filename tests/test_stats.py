@@ -0,0 +1,50 @@
+import random
+import statistics
+import unittest
+
+from womgr.stats import LatencyHistory
+
+
+class TestLatencyHistory(unittest.TestCase):
+    def test_empty(self):
+        stats = LatencyHistory(5).stats()
+        self.assertEqual(stats["samples"], 0)
+        self.assertIsNone(stats["avg"])
+        self.assertIsNone(stats["loss"])
+
+    def test_window(self):
+        history = LatencyHistory(4)
+        for rtt in (0.010, None, 0.030, 0.020, 0.040, None):
+            history.add(rtt)
+        stats = history.stats()
+        # Window now holds 0.030, 0.020, 0.040, None
+        self.assertEqual(stats["samples"], 4)
+        self.assertEqual(stats["loss"], 25.0)
+        self.assertEqual(stats["min"], 20.0)
+        self.assertEqual(stats["max"], 40.0)
+        self.assertEqual(stats["avg"], 30.0)
+        # Differences to the previous reply: 0.03 - 0.01, 0.03 - 0.02, 0.04 - 0.02
+        self.assertEqual(stats["jitter"], 16.667)
+
+    def test_matches_recomputation(self):
+        rng = random.Random(1)
+        history = LatencyHistory(16)
+        samples = []
+        for _ in range(200):
+            rtt = None if rng.random() < 0.2 else rng.uniform(0.001, 0.1)
+            history.add(rtt)
+            samples.append(rtt)
+            window = samples[-16:]
+            rtts = [s for s in window if s is not None]
+            stats = history.stats()
+            self.assertEqual(len(history), len(window))
+            if rtts:
+                self.assertAlmostEqual(stats["min"], round(min(rtts) * 1000, 3))
+                self.assertAlmostEqual(stats["max"], round(max(rtts) * 1000, 3))
+                self.assertAlmostEqual(
+                    stats["avg"], round(statistics.mean(rtts) * 1000, 3), places=2
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import asyncio
+import sys
+import types
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+# Stub minimal homeassistant modules required for import
+ha = types.ModuleType("homeassistant")
+ha.config_entries = types.ModuleType("config_entries")
+ha.config_entries.ConfigEntry = object
+ha.core = types.ModuleType("core")
+ha.core.HomeAssistant = object
+ha.helpers = types.ModuleType("helpers")
+ha.helpers.typing = types.ModuleType("typing")
+ha.helpers.typing.ConfigType = dict
+ha.components = types.ModuleType("components")
+ha.components.http = types.ModuleType("http")
+class DummyView:
+    name = "dummy"
+    url = "/"
+    requires_auth = False
+    def __init__(self, hass=None):
+        pass
+ha.components.http.HomeAssistantView = DummyView
+
+@dataclass
+class StaticPathConfig:
+    url_path: str
+    path: str
+    cache_headers: bool = True
+
+ha.components.http.StaticPathConfig = StaticPathConfig
+lovelace = types.ModuleType("lovelace")
+lovelace.const = types.SimpleNamespace(
+    CONF_ALLOW_SINGLE_WORD="allow_single_word",
+    CONF_ICON="icon",
+    CONF_TITLE="title",
+    CONF_URL_PATH="url_path",
+)
+lovelace.dashboard = types.SimpleNamespace(
+    DashboardsCollection=object,
+    LovelaceStorage=object,
+    ConfigNotFound=Exception,
+)
+ha.components.lovelace = lovelace
+
+sys.modules.setdefault("homeassistant", ha)
+sys.modules.setdefault("homeassistant.config_entries", ha.config_entries)
+sys.modules.setdefault("homeassistant.core", ha.core)
+sys.modules.setdefault("homeassistant.helpers", ha.helpers)
+sys.modules.setdefault("homeassistant.helpers.typing", ha.helpers.typing)
+sys.modules.setdefault("homeassistant.components", ha.components)
+sys.modules.setdefault("homeassistant.components.http", ha.components.http)
+sys.modules.setdefault("homeassistant.components.lovelace", lovelace)
+sys.modules.setdefault("homeassistant.components.lovelace.const", lovelace.const)
+sys.modules.setdefault("homeassistant.components.lovelace.dashboard", lovelace.dashboard)
+
+from custom_components.womgr import api
+from custom_components.womgr.const import DATA_JOBS, DOMAIN
+from custom_components.womgr.womgr.entities import DeviceRegistry, setup_device
+from custom_components.womgr.womgr.jobs import FAILED, PENDING, SUCCEEDED, JobManager
+
+
+def _hass():
+    registry = DeviceRegistry()
+    for entry_id, location, os_type in (
+        ("a", "office", "linux"),
+        ("b", "office", "windows"),
+        ("c", "lab", "linux"),
+    ):
+        setup_device(
+            entry_id,
+            "00:11:22:33:44:0%s" % "abc".index(entry_id),
+            "192.0.2.%d" % (1 + "abc".index(entry_id)),
+            location,
+            os_type,
+            entry_id=entry_id,
+            registry=registry,
+        )
+    return SimpleNamespace(data={DOMAIN: registry, DATA_JOBS: JobManager()})
+
+
+def _view(hass):
+    view = api.BatchView(hass)
+    view.json = lambda data, status_code=200, headers=None: (status_code, data)
+    return view
+
+
+def _request(body):
+    async def json():
+        return body
+
+    return SimpleNamespace(json=json)
+
+
+def _run_batch(body, action=None):
+    async def run():
+        hass = _hass()
+        calls = []
+        original = api.async_run_action
+
+        async def fake_action(hass, config, action, options, job=None):
+            calls.append((config.entry_id, action))
+            await asyncio.sleep(0.01)
+            return {"online": True}
+
+        api.async_run_action = action or fake_action
+        try:
+            view = _view(hass)
+            status, data = await view.post(_request(body))
+            second = None
+            if status == 202:
+                _status, second = await view.post(_request(body))
+            manager = hass.data[DATA_JOBS]
+            for result in data.get("results", []):
+                if "job_id" in result:
+                    await manager.wait(result["job_id"])
+        finally:
+            api.async_run_action = original
+        return status, data, second, calls, manager
+
+    return asyncio.run(run())
+
+
+def test_batch_selector_submits_jobs():
+    status, data, _second, calls, manager = _run_batch(
+        {"selector": {"location": "office", "os_type": "linux"}, "action": "refresh"}
+    )
+    assert status == 202
+    assert [(r["entry_id"], r["status"]) for r in data["results"]] == [("a", PENDING)]
+    assert calls == [("a", "refresh")]
+    assert manager.get(data["results"][0]["job_id"]).status == SUCCEEDED
+
+
+def test_batch_reports_item_errors():
+    status, data, _second, calls, _manager = _run_batch(
+        {
+            "items": [
+                {"entry_id": "missing", "action": "refresh"},
+                {"entry_id": "a", "action": "wake", "packets": 99},
+                {"entry_id": "b", "action": "restart"},
+            ]
+        }
+    )
+    assert status == 202
+    missing, invalid, restart = data["results"]
+    assert (missing["status"], missing["error"]) == (FAILED, "unknown device")
+    assert invalid["status"] == FAILED and "job_id" not in invalid
+    assert restart["job_id"]
+    assert calls == [("b", "restart")]
+
+
+def test_batch_coalesces_running_jobs():
+    status, data, second, calls, _manager = _run_batch(
+        {"items": [{"entry_id": "c", "action": "wake"}, {"entry_id": "c", "action": "wake"}]}
+    )
+    assert status == 202
+    job_ids = {r["job_id"] for r in data["results"] + second["results"]}
+    assert len(job_ids) == 1
+    assert calls == [("c", "wake")]
+
+
+def test_batch_requires_a_target():
+    status, data, _second, calls, _manager = _run_batch({"action": "wake"})
+    assert status == 400
+    assert calls == []
+
+
+def test_wake_many_runs_as_job():
+    async def run():
+        hass = _hass()
+        manager = hass.data[DATA_JOBS]
+        updates = []
+        manager.add_listener(lambda job: updates.append(job.result))
+        release = asyncio.Event()
+        original = api.async_wake_many
+
+        async def fake_wake_many(hass, entries, stagger, concurrency, repeat, on_progress=None):
+            for done, entry_id in enumerate(sorted(entries), 1):
+                on_progress({"entry_id": entry_id, "success": True, "done": done, "total": len(entries)})
+            await release.wait()
+            return {entry_id: True for entry_id in entries}
+
+        api.async_wake_many = fake_wake_many
+        try:
+            view = api.WakeManyView(hass)
+            view.json = lambda data, status_code=200, headers=None: (status_code, data)
+            status, job = await view.post(_request({"location": "office"}))
+            _status, again = await view.post(_request({"location": "office"}))
+            await asyncio.sleep(0.01)
+            partial = manager.get(job["job_id"]).result
+            release.set()
+            await manager.wait(job["job_id"])
+        finally:
+            api.async_wake_many = original
+        return status, job, again, partial, updates, manager.get(job["job_id"])
+
+    status, job, again, partial, updates, finished = asyncio.run(run())
+    assert status == 202
+    assert again["job_id"] == job["job_id"]
+    assert partial["done"] == 2 and partial["total"] == 2
+    assert {"entry_id": "a", "success": True, "done": 1, "total": 2} in updates
+    assert finished.status == SUCCEEDED
+    assert finished.result == {"results": {"a": True, "b": True}}
@@ -0,0 +1,96 @@
+import asyncio
+import socket
+import unittest
+
+from womgr.entities import WakeOnLanSwitch
+from womgr.wol import build_magic_packet, get_sender, wake_many
+
+
+class TestMagicPacket(unittest.TestCase):
+    def test_layout(self):
+        packet = build_magic_packet("AA-BB-CC-DD-EE-FF")
+        self.assertEqual(len(packet), 102)
+        self.assertEqual(packet[:6], b"\xff" * 6)
+        self.assertEqual(packet[6:], bytes.fromhex("aabbccddeeff") * 16)
+
+    def test_built_once(self):
+        switch = WakeOnLanSwitch("dev", "AA:BB:CC:DD:EE:FF")
+        self.assertEqual(switch.packet, build_magic_packet("AA:BB:CC:DD:EE:FF"))
+
+    def test_invalid_mac(self):
+        switch = WakeOnLanSwitch("dev", "invalid")
+        self.assertEqual(switch.mac, "invalid")
+        with self.assertRaises(ValueError):
+            switch.turn_on()
+
+
+class TestAsyncSend(unittest.IsolatedAsyncioTestCase):
+    async def test_shared_sender(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+            receiver.bind(("127.0.0.1", 0))
+            receiver.settimeout(2)
+            port = receiver.getsockname()[1]
+            switches = [
+                WakeOnLanSwitch(f"dev{i}", f"00:11:22:33:44:5{i}", "127.0.0.1", port)
+                for i in range(3)
+            ]
+            senders = await asyncio.gather(get_sender(), get_sender())
+            self.assertIs(senders[0], senders[1])
+            for switch in switches:
+                await switch.async_turn_on()
+            received = {receiver.recv(200) for _ in switches}
+        self.assertEqual(received, {s.packet for s in switches})
+
+    async def test_concurrent_turn_on_sends_once(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+            receiver.bind(("127.0.0.1", 0))
+            receiver.setblocking(False)
+            port = receiver.getsockname()[1]
+            switch = WakeOnLanSwitch("dev", "00:11:22:33:44:55", "127.0.0.1", port)
+            await asyncio.gather(*(switch.async_turn_on() for _ in range(5)))
+            await asyncio.sleep(0.05)
+            received = []
+            while True:
+                try:
+                    received.append(receiver.recv(200))
+                except BlockingIOError:
+                    break
+        self.assertEqual(received, [switch.packet])
+
+
+class TestWakeMany(unittest.IsolatedAsyncioTestCase):
+    async def test_staggered_with_repeats(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+            receiver.bind(("127.0.0.1", 0))
+            receiver.settimeout(2)
+            port = receiver.getsockname()[1]
+            switches = [
+                WakeOnLanSwitch(f"dev{i}", f"00:11:22:33:44:5{i}", "127.0.0.1", port)
+                for i in range(4)
+            ]
+            events = []
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await wake_many(
+                switches,
+                stagger=0.02,
+                concurrency=2,
+                repeat=2,
+                repeat_interval=0.01,
+                progress=lambda s, ok, done, total: events.append((s, ok, done, total)),
+            )
+            elapsed = loop.time() - start
+            received = [receiver.recv(200) for _ in range(8)]
+
+        self.assertEqual(results, [True] * 4)
+        self.assertGreaterEqual(elapsed, 0.06)
+        self.assertEqual([e[2:] for e in events], [(i, 4) for i in range(1, 5)])
+        for switch in switches:
+            self.assertEqual(received.count(switch.packet), 2)
+
+    async def test_empty(self):
+        self.assertEqual(await wake_many([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
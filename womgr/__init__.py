@@ -2,21 +2,31 @@
 
 from .entities import (
     ConfigEntry,
+    DeviceRegistry,
     PingBinarySensor,
+    ServiceBinarySensor,
     SystemCommandSwitch,
     WakeOnLanSwitch,
     setup_device,
     remove_device,
 )
+from .coordinator import ReachabilityCoordinator
+from .stats import LatencyHistory
 from .util import pastel_color, slugify
+from .wol import wake_many
 
 __all__ = [
     "ConfigEntry",
+    "DeviceRegistry",
+    "LatencyHistory",
     "PingBinarySensor",
+    "ReachabilityCoordinator",
+    "ServiceBinarySensor",
     "SystemCommandSwitch",
     "WakeOnLanSwitch",
     "setup_device",
     "remove_device",
     "pastel_color",
     "slugify",
+    "wake_many",
 ]
@@ -0,0 +1,300 @@
+"""Fleet-wide polling of ping sensors."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from typing import Callable
+
+from .entities import ConfigEntry, PingBinarySensor, ServiceBinarySensor
+from .jobs import SingleFlight
+from .neighbor import Neighbor, NeighborTable
+from .probe import ProbeBackend
+
+logger = logging.getLogger(__name__)
+
+
+Sensor = PingBinarySensor | ServiceBinarySensor
+
+
+class ReachabilityCoordinator:
+    """Own the polling schedule for every registered ping or service sensor.
+
+    Sensors are probed individually as they fall due rather than all at
+    once. Initial probes are spread randomly across ``interval`` and each
+    following probe is jittered, so load stays flat as the fleet grows.
+    At most ``max_concurrency`` probes run at the same time. Listeners
+    registered with a sensor are called after each of its probes.
+
+    Online devices are probed every ``interval`` seconds. Offline devices
+    back off exponentially up to ``max_interval``. After :meth:`boost` a
+    device is probed every ``fast_interval`` seconds for ``fast_duration``
+    seconds so state changes caused by a wake or shutdown show up quickly.
+
+    Ping probes go through ``backend``, the default backend of
+    :meth:`PingBinarySensor.update` when not given. With a ``neighbors``
+    table, devices the kernel recently confirmed reachable are updated from
+    it without sending any packets, and neighbor events (including failed
+    resolution) are pushed to the sensors as they arrive.
+
+    Concurrent :meth:`async_refresh` calls for one sensor share a single
+    probe, and its result is reused for ``refresh_reuse`` seconds.
+    """
+
+    def __init__(
+        self,
+        interval: float = 30.0,
+        max_concurrency: int = 16,
+        jitter: float = 0.1,
+        max_interval: float = 600.0,
+        fast_interval: float = 2.0,
+        fast_duration: float = 90.0,
+        backend: ProbeBackend | None = None,
+        neighbors: NeighborTable | None = None,
+        refresh_reuse: float = 0.0,
+    ) -> None:
+        self.backend = backend
+        self.neighbors = neighbors
+        self._unsub_neighbors: Callable[[], None] | None = None
+        self._by_mac: dict[bytes, list[Sensor]] = {}
+        self.interval = interval
+        self.jitter = jitter
+        self.max_interval = max_interval
+        self.fast_interval = fast_interval
+        self.fast_duration = fast_duration
+        self._states: dict[Sensor, _PollState] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._listeners: dict[Sensor, list[Callable[[], None]]] = {}
+        self._global_listeners: list[Callable[[Sensor], None]] = []
+        self._tokens: dict[Sensor, int] = {}
+        self._queue: list[tuple[float, int, Sensor]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self._refreshes = SingleFlight(refresh_reuse)
+
+    @property
+    def sensors(self) -> list[Sensor]:
+        return list(self._listeners)
+
+    def add_sensor(
+        self,
+        sensor: Sensor,
+        listener: Callable[[], None] | None = None,
+    ) -> Callable[[], None]:
+        """Start polling ``sensor`` and return a callable that undoes it."""
+        if sensor not in self._listeners:
+            self._listeners[sensor] = []
+            self._states[sensor] = _PollState(_sensor_mac(sensor))
+            if self._states[sensor].mac is not None:
+                self._by_mac.setdefault(self._states[sensor].mac, []).append(sensor)
+            self._schedule(sensor, random.uniform(0, self.interval))
+        if listener is not None:
+            self._listeners[sensor].append(listener)
+
+        def remove() -> None:
+            listeners = self._listeners.get(sensor)
+            if listeners is None:
+                return
+            if listener is not None and listener in listeners:
+                listeners.remove(listener)
+            if not listeners:
+                self.remove_sensor(sensor)
+
+        self._ensure_running()
+        return remove
+
+    def add_listener(self, listener: Callable[[Sensor], None]) -> Callable[[], None]:
+        """Call ``listener(sensor)`` whenever any sensor is updated."""
+        self._global_listeners.append(listener)
+
+        def remove() -> None:
+            if listener in self._global_listeners:
+                self._global_listeners.remove(listener)
+
+        return remove
+
+    def remove_sensor(self, sensor: Sensor) -> None:
+        """Stop polling ``sensor``."""
+        self._listeners.pop(sensor, None)
+        self._tokens.pop(sensor, None)
+        self._refreshes.forget(sensor)
+        state = self._states.pop(sensor, None)
+        if state is not None and state.mac is not None:
+            sensors = self._by_mac.get(state.mac, [])
+            if sensor in sensors:
+                sensors.remove(sensor)
+            if not sensors:
+                self._by_mac.pop(state.mac, None)
+        if not self._listeners:
+            self.stop()
+
+    async def async_refresh(self, sensor: Sensor) -> bool:
+        """Probe ``sensor`` immediately and notify its listeners."""
+        return await self._refreshes.run(sensor, lambda: self._refresh(sensor))
+
+    async def _refresh(self, sensor: Sensor) -> bool:
+        async with self._semaphore:
+            await self._update(sensor)
+        self._finish(sensor)
+        return sensor.is_on
+
+    def boost(self, sensor: Sensor) -> None:
+        """Poll ``sensor`` quickly for a while, e.g. after waking it."""
+        state = self._states.get(sensor)
+        if state is None:
+            return
+        loop = asyncio.get_running_loop()
+        state.fast_until = loop.time() + self.fast_duration
+        state.offline_streak = 0
+        self._schedule(sensor, self.fast_interval)
+
+    def boost_entry(self, entry: ConfigEntry | None) -> None:
+        """Boost every ping and service sensor belonging to ``entry``."""
+        if entry is None:
+            return
+        for sensor in (entry.ping, entry.service):
+            if sensor is not None:
+                self.boost(sensor)
+
+    def stop(self) -> None:
+        """Cancel the scheduler and any probes in flight."""
+        if self.backend is not None:
+            self.backend.close()
+        if self._unsub_neighbors is not None:
+            self._unsub_neighbors()
+            self._unsub_neighbors = None
+            self.neighbors.stop()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._inflight):
+            task.cancel()
+        self._inflight.clear()
+
+    def _next_interval(self, sensor: Sensor) -> float:
+        state = self._states[sensor]
+        if asyncio.get_running_loop().time() < state.fast_until:
+            return self.fast_interval
+        if sensor.is_on:
+            state.offline_streak = 0
+            interval = self.interval
+        else:
+            interval = min(
+                self.interval * 2**state.offline_streak, self.max_interval
+            )
+            if interval < self.max_interval:
+                state.offline_streak += 1
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _schedule(self, sensor: Sensor, delay: float) -> None:
+        token = next(self._counter)
+        self._tokens[sensor] = token
+        due = asyncio.get_running_loop().time() + delay
+        heapq.heappush(self._queue, (due, token, sensor))
+        self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.neighbors is not None and self._unsub_neighbors is None:
+            self.neighbors.start()
+            self._unsub_neighbors = self.neighbors.add_listener(self._on_neighbor)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            while self._queue and self._queue[0][0] <= now:
+                _due, token, sensor = heapq.heappop(self._queue)
+                if self._tokens.get(sensor) != token:
+                    continue
+                await self._semaphore.acquire()
+                task = loop.create_task(self._probe(sensor))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+            delay = self._queue[0][0] - loop.time() if self._queue else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _probe(self, sensor: Sensor) -> None:
+        try:
+            await self._update(sensor)
+        finally:
+            self._semaphore.release()
+        self._finish(sensor)
+
+    def _passive(self, sensor: Sensor) -> bool | None:
+        state = self._states.get(sensor)
+        if (
+            self.neighbors is None
+            or state is None
+            or not isinstance(sensor, PingBinarySensor)
+        ):
+            return None
+        return self.neighbors.liveness(state.mac, sensor.ip)
+
+    def _on_neighbor(self, neighbor: Neighbor) -> None:
+        if neighbor.mac is None:
+            return
+        for sensor in list(self._by_mac.get(neighbor.mac, [])):
+            verdict = self._passive(sensor)
+            if verdict is None or verdict == sensor.is_on:
+                continue
+            sensor.is_on = verdict
+            self._notify(sensor, self._listeners.get(sensor, []))
+
+    async def _update(self, sensor: Sensor) -> None:
+        # Only a reachable verdict saves the probe. Failed entries are not
+        # re-resolved without traffic to the device, so offline devices are
+        # still probed at their backoff interval to notice them booting.
+        if self._passive(sensor):
+            sensor.is_on = True
+            return
+        try:
+            if isinstance(sensor, PingBinarySensor):
+                await sensor.update(self.backend)
+            else:
+                await sensor.update()
+        except Exception:
+            logger.exception("Failed to probe %s", sensor.entity_id)
+
+    def _finish(self, sensor: Sensor) -> None:
+        listeners = self._listeners.get(sensor)
+        if listeners is None:
+            return
+        self._schedule(sensor, self._next_interval(sensor))
+        self._notify(sensor, listeners)
+
+    def _notify(self, sensor: Sensor, listeners: list[Callable[[], None]]) -> None:
+        for listener in list(listeners):
+            listener()
+        for global_listener in list(self._global_listeners):
+            try:
+                global_listener(sensor)
+            except Exception:
+                logger.exception("Listener failed for %s", sensor.entity_id)
+
+
+class _PollState:
+    """Adaptive scheduling state of a single sensor."""
+
+    __slots__ = ("mac", "offline_streak", "fast_until")
+
+    def __init__(self, mac: bytes | None = None) -> None:
+        self.mac = mac
+        self.offline_streak = 0
+        self.fast_until = 0.0
+
+
+def _sensor_mac(sensor: Sensor) -> bytes | None:
+    if not isinstance(sensor, PingBinarySensor) or sensor.config_entry is None:
+        return None
+    return sensor.config_entry.mac_bytes
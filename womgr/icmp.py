@@ -0,0 +1,220 @@
+"""Asynchronous ICMP echo prober shared by all ping sensors."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+_HEADER = struct.Struct("!BBHHH")
+_PAYLOAD = b"womgr".ljust(16, b"\x00")
+
+
+def checksum(data: bytes) -> int:
+    """Return the RFC 1071 internet checksum of ``data``."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int, payload: bytes = _PAYLOAD) -> bytes:
+    """Build an ICMP echo request packet."""
+    header = _HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + payload)
+    return _HEADER.pack(ICMP_ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+def parse_echo_reply(data: bytes, raw: bool = False) -> tuple[int, int] | None:
+    """Return ``(identifier, sequence)`` of an echo reply or ``None``.
+
+    Packets read from raw sockets start with the IPv4 header which is
+    stripped when ``raw`` is true.
+    """
+    if raw:
+        if len(data) < 20:
+            return None
+        data = data[(data[0] & 0x0F) * 4 :]
+    if len(data) < _HEADER.size:
+        return None
+    icmp_type, _code, _csum, ident, seq = _HEADER.unpack_from(data)
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return ident, seq
+
+
+def is_ipv4(address: str) -> bool:
+    """Return ``True`` if ``address`` is an IPv4 literal."""
+    try:
+        ipaddress.IPv4Address(address)
+    except ValueError:
+        return False
+    return True
+
+
+class IcmpProber:
+    """Send ICMP echo requests to many hosts over a single socket.
+
+    Unprivileged ``SOCK_DGRAM`` ICMP sockets are preferred. If the kernel
+    does not allow them a raw socket is used instead. Replies are matched
+    to outstanding probes by identifier and sequence number.
+    """
+
+    def __init__(self) -> None:
+        self._sock: socket.socket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.raw = False
+        self.ident = 0
+        self._seq = 0
+        self._pending: dict[tuple[int, int], tuple[str, asyncio.Future]] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop | None:
+        return self._loop
+
+    @property
+    def is_open(self) -> bool:
+        return self._sock is not None
+
+    def open(self) -> None:
+        """Open the ICMP socket on the running loop.
+
+        ``OSError`` is raised if neither socket type is permitted.
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            raw = False
+        except OSError:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            raw = True
+        try:
+            sock.setblocking(False)
+            if raw:
+                ident = os.getpid() & 0xFFFF
+            else:
+                # The kernel rewrites the identifier to the local "port".
+                sock.bind(("", 0))
+                ident = sock.getsockname()[1]
+            loop = asyncio.get_running_loop()
+            loop.add_reader(sock.fileno(), self._read)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+        self._loop = loop
+        self.raw = raw
+        self.ident = ident
+
+    def close(self) -> None:
+        """Close the socket and cancel outstanding probes."""
+        if self._sock is None:
+            return
+        try:
+            self._loop.remove_reader(self._sock.fileno())
+        except (RuntimeError, ValueError):
+            pass
+        self._sock.close()
+        self._sock = None
+        for _ip, fut in self._pending.values():
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+
+    def _next_seq(self) -> int:
+        for _ in range(0x10000):
+            self._seq = (self._seq + 1) & 0xFFFF
+            if (self.ident, self._seq) not in self._pending:
+                return self._seq
+        raise RuntimeError("Too many outstanding ICMP probes")
+
+    async def ping(self, ip: str, timeout: float = 1.0) -> float | None:
+        """Probe ``ip`` and return the round-trip time in seconds.
+
+        ``None`` is returned if no reply arrives within ``timeout``.
+        """
+        if self._sock is None:
+            raise RuntimeError("ICMP prober is not open")
+        seq = self._next_seq()
+        key = (self.ident, seq)
+        fut = self._loop.create_future()
+        self._pending[key] = (ip, fut)
+        try:
+            sent = time.monotonic()
+            try:
+                self._sock.sendto(build_echo_request(self.ident, seq), (ip, 0))
+            except OSError as exc:
+                logger.debug("Failed to send ICMP echo to %s: %s", ip, exc)
+                return None
+            try:
+                received = await asyncio.wait_for(fut, timeout)
+            except asyncio.TimeoutError:
+                return None
+            return received - sent
+        finally:
+            self._pending.pop(key, None)
+
+    def _read(self) -> None:
+        while self._sock is not None:
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                logger.debug("ICMP receive failed: %s", exc)
+                return
+            self._handle(data, addr, time.monotonic())
+
+    def _handle(self, data: bytes, addr: tuple, received: float) -> None:
+        reply = parse_echo_reply(data, self.raw)
+        if reply is None:
+            return
+        if not self.raw:
+            # Identifier is owned by the socket; the kernel only delivers ours.
+            reply = (self.ident, reply[1])
+        pending = self._pending.get(reply)
+        if pending is None:
+            return
+        ip, fut = pending
+        if addr[0] == ip and not fut.done():
+            fut.set_result(received)
+
+
+_shared: IcmpProber | None = None
+_unavailable = False
+
+
+def get_prober() -> IcmpProber | None:
+    """Return the prober shared on the running loop.
+
+    ``None`` is returned if ICMP sockets cannot be opened, in which case
+    callers should fall back to the ``ping`` command.
+    """
+    global _shared, _unavailable
+    loop = asyncio.get_running_loop()
+    if _shared is not None and _shared.is_open and _shared.loop is loop:
+        return _shared
+    if _unavailable:
+        return None
+    if _shared is not None:
+        _shared.close()
+        _shared = None
+    prober = IcmpProber()
+    try:
+        prober.open()
+    except OSError as exc:
+        logger.debug("ICMP sockets unavailable, using ping command: %s", exc)
+        _unavailable = True
+        return None
+    _shared = prober
+    return prober
@@ -0,0 +1,246 @@
+"""Sorted and filtered views over many devices without scanning them."""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import ipaddress
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .entities import ConfigEntry
+
+
+def _ip_key(ip: str) -> tuple:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return (99, 0, ip)
+    return (address.version, int(address), "")
+
+
+SORT_KEYS: dict[str, Callable[[ConfigEntry], Any]] = {
+    "name": lambda config: config.device_name.casefold(),
+    "ip": lambda config: _ip_key(config.ip),
+    "location": lambda config: (config.location.casefold(), config.device_name.casefold()),
+    "os_type": lambda config: (config.os_type, config.device_name.casefold()),
+}
+
+
+class DeviceIndex:
+    """Keep devices ordered by every sort key, overall and per filter value.
+
+    Adding or removing a device costs ``O(log n)`` per sort key and filter
+    group (plus list insertion). :meth:`query` starts from the smallest
+    sorted list matching one filter, finds the cursor position by bisection
+    and walks it, checking the other filters, until the page is full.
+    """
+
+    def __init__(self) -> None:
+        self._configs: dict[str, ConfigEntry] = {}
+        self._keys: dict[str, dict[str, tuple]] = {name: {} for name in SORT_KEYS}
+        self._sorted: dict[str, list[tuple]] = {name: [] for name in SORT_KEYS}
+        # Sorted keys per filter group, e.g. ("location", "office")
+        self._groups: dict[tuple[str, Any], dict[str, list[tuple]]] = {}
+        self._online: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._configs
+
+    def add(self, entry_id: str, config: ConfigEntry) -> None:
+        """Index ``config`` under ``entry_id``, replacing an older version."""
+        self.remove(entry_id)
+        self._configs[entry_id] = config
+        for name, key_func in SORT_KEYS.items():
+            key = (key_func(config), entry_id)
+            self._keys[name][entry_id] = key
+            bisect.insort(self._sorted[name], key)
+        for group in self._group_names(entry_id, config):
+            self._group_add(group, entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        config = self._configs.get(entry_id)
+        if config is None:
+            return
+        for group in self._group_names(entry_id, config):
+            self._group_remove(group, entry_id)
+        del self._configs[entry_id]
+        for name in SORT_KEYS:
+            key = self._keys[name].pop(entry_id)
+            keys = self._sorted[name]
+            del keys[bisect.bisect_left(keys, key)]
+        self._online.discard(entry_id)
+
+    def set_online(self, entry_id: str, online: bool) -> None:
+        if entry_id not in self._configs or (entry_id in self._online) == online:
+            return
+        self._group_remove(("online", not online), entry_id)
+        if online:
+            self._online.add(entry_id)
+        else:
+            self._online.discard(entry_id)
+        self._group_add(("online", online), entry_id)
+
+    def _group_names(self, entry_id: str, config: ConfigEntry) -> list[tuple[str, Any]]:
+        return [
+            ("location", config.location),
+            ("os_type", config.os_type),
+            ("online", entry_id in self._online),
+        ]
+
+    def _group_add(self, group: tuple[str, Any], entry_id: str) -> None:
+        lists = self._groups.setdefault(group, {name: [] for name in SORT_KEYS})
+        for name, keys in lists.items():
+            bisect.insort(keys, self._keys[name][entry_id])
+
+    def _group_remove(self, group: tuple[str, Any], entry_id: str) -> None:
+        lists = self._groups[group]
+        for name, keys in lists.items():
+            del keys[bisect.bisect_left(keys, self._keys[name][entry_id])]
+        if not lists["name"]:
+            del self._groups[group]
+
+    def query(
+        self,
+        location: str | None = None,
+        os_type: str | None = None,
+        online: bool | None = None,
+        prefix: str | None = None,
+        sort: str = "name",
+        descending: bool = False,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[str], str | None, int]:
+        """Return ``(entry_ids, next_cursor, total)`` for one page.
+
+        ``total`` counts all devices matching the filters and
+        ``next_cursor`` is ``None`` on the last page. ``ValueError`` is
+        raised for an unknown sort key or a malformed cursor.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        filters = self._filters(location, os_type, online, prefix)
+        keys = self._sorted[sort]
+        lo, hi = 0, len(keys)
+        walked = None
+        for matcher in filters:
+            span = matcher.spans.get(sort)
+            if span is not None and span[2] - span[1] < hi - lo:
+                (keys, lo, hi), walked = span, matcher
+        checks = [matcher.check for matcher in filters if matcher is not walked]
+
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            if descending:
+                end = bisect.bisect_left(keys, after, lo, hi) if after is not None else hi
+                positions = range(end - 1, lo - 1, -1)
+            else:
+                start = bisect.bisect_right(keys, after, lo, hi) if after is not None else lo
+                positions = range(start, hi)
+        except TypeError:
+            raise ValueError("Cursor does not match the sort key") from None
+        page: list[tuple] = []
+        more = False
+        for position in positions:
+            key = keys[position]
+            if all(check(key[1]) for check in checks):
+                if len(page) == limit:
+                    more = True
+                    break
+                page.append(key)
+        next_cursor = encode_cursor(page[-1]) if more and page else None
+        return [key[1] for key in page], next_cursor, self._total(filters)
+
+    def _filters(
+        self,
+        location: str | None,
+        os_type: str | None,
+        online: bool | None,
+        prefix: str | None,
+    ) -> list[_Filter]:
+        filters = []
+        groups = (("location", location), ("os_type", os_type), ("online", online))
+        for group, value in groups:
+            if value is None:
+                continue
+            lists = self._groups.get((group, value))
+            if lists is None:
+                lists = {name: [] for name in SORT_KEYS}
+            filters.append(
+                _Filter(
+                    {name: (keys, 0, len(keys)) for name, keys in lists.items()},
+                    self._check(group, value),
+                )
+            )
+        if prefix:
+            keys = self._sorted["name"]
+            folded = prefix.casefold()
+            lo = hi = bisect.bisect_left(keys, (folded,))
+            while hi < len(keys) and keys[hi][0].startswith(folded):
+                hi += 1
+            name_keys = self._keys["name"]
+            filters.append(
+                _Filter(
+                    {"name": (keys, lo, hi)},
+                    lambda entry_id: name_keys[entry_id][0].startswith(folded),
+                )
+            )
+        return filters
+
+    def _check(self, group: str, value: Any) -> Callable[[str], bool]:
+        if group == "online":
+            return lambda entry_id: (entry_id in self._online) == value
+        return lambda entry_id: getattr(self._configs[entry_id], group) == value
+
+    def _total(self, filters: list[_Filter]) -> int:
+        """Count the devices matching every filter, scanning the smallest."""
+        if not filters:
+            return len(self._configs)
+        smallest = min(filters, key=lambda matcher: matcher.size)
+        keys, lo, hi = smallest.spans["name"]
+        checks = [matcher.check for matcher in filters if matcher is not smallest]
+        if not checks:
+            return hi - lo
+        return sum(
+            1 for position in range(lo, hi) if all(check(keys[position][1]) for check in checks)
+        )
+
+
+@dataclass(frozen=True)
+class _Filter:
+    """Devices matching one query filter.
+
+    ``spans`` maps sort keys to ``(keys, lo, hi)``, a slice of a sorted list
+    holding exactly the matching devices; sort keys without one are missing.
+    """
+
+    spans: dict[str, tuple[list[tuple], int, int]]
+    check: Callable[[str], bool]
+
+    @property
+    def size(self) -> int:
+        _keys, lo, hi = self.spans["name"]
+        return hi - lo
+
+
+def encode_cursor(key: tuple) -> str:
+    data = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return _as_tuple(json.loads(data))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _as_tuple(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_as_tuple(item) for item in value)
+    return value
@@ -0,0 +1,246 @@
+"""Reachability probe backends."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import re
+import shutil
+import socket
+import sys
+import time
+
+from .icmp import get_prober, is_ipv4
+
+logger = logging.getLogger(__name__)
+
+_PING_TIME_RE = re.compile(rb"time[=<]\s*([\d.]+)\s*ms")
+_FPING_RE = re.compile(
+    r"^(?P<host>\S+) is (?P<state>alive|unreachable)(?: \((?P<rtt>[\d.]+) ms\))?"
+)
+
+
+def build_ping_args(ip: str) -> list[str]:
+    """Return the ``ping`` command line probing ``ip`` once."""
+    ping_bin = shutil.which("ping") or "ping"
+    args = [ping_bin]
+    if sys.platform.startswith("win"):
+        args += ["-n", "1", "-w", "1000", ip]
+    else:
+        args += ["-c", "1", "-W", "1", ip]
+    return args
+
+
+async def ping_command(ip: str) -> float | None:
+    """Probe ``ip`` with the ``ping`` command.
+
+    The round-trip time is parsed from the output when present, otherwise
+    ``0.0`` is returned for a reachable host.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *build_ping_args(ip),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await proc.communicate()
+    except FileNotFoundError:
+        return None
+    if proc.returncode != 0:
+        return None
+    match = _PING_TIME_RE.search(stdout)
+    return float(match.group(1)) / 1000 if match else 0.0
+
+
+async def tcp_connect(ip: str, port: int, timeout: float = 2.0) -> float | None:
+    """Open a TCP connection to ``ip``:``port`` without blocking the loop.
+
+    Returns the connect time in seconds or ``None`` if the port did not
+    accept the connection within ``timeout``.
+    """
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+    try:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    with sock:
+        sock.setblocking(False)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        return time.monotonic() - start
+
+
+class ProbeBackend:
+    """Check whether a host answers and how long it took.
+
+    :meth:`probe` returns the round-trip time in seconds or ``None`` if
+    the host did not answer.
+    """
+
+    name = "auto"
+
+    async def probe(self, ip: str, timeout: float = 1.0) -> float | None:
+        prober = get_prober() if is_ipv4(ip) else None
+        if prober is not None:
+            return await prober.ping(ip, timeout)
+        return await ping_command(ip)
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class PingCommandBackend(ProbeBackend):
+    """Run one ``ping`` process per probe."""
+
+    name = "ping"
+
+    async def probe(self, ip: str, timeout: float = 1.0) -> float | None:
+        return await ping_command(ip)
+
+
+class FpingBackend(ProbeBackend):
+    """Probe many hosts with a single ``fping`` process per batch.
+
+    Probes requested within ``window`` seconds of each other are collected
+    and handed to one ``fping`` invocation. Results are parsed as they are
+    printed and each waiting caller is resumed as soon as its host is
+    reported. Without ``fping`` the batch is probed concurrently over the
+    shared ICMP socket, or with the ``ping`` command as a last resort.
+    """
+
+    name = "fping"
+
+    def __init__(self, window: float = 1.0, max_parallel: int = 16) -> None:
+        self.window = window
+        self.max_parallel = max_parallel
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._timeout = 1.0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def probe(self, ip: str, timeout: float = 1.0) -> float | None:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.setdefault(ip, []).append(fut)
+        self._timeout = max(self._timeout, timeout)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in list(self._batches):
+            task.cancel()
+        for futures in self._pending.values():
+            for fut in futures:
+                fut.cancel()
+        self._pending.clear()
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, {}
+        timeout, self._timeout = self._timeout, 1.0
+        self._flush_handle = None
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch, timeout))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(
+        self, batch: dict[str, list[asyncio.Future]], timeout: float
+    ) -> None:
+        try:
+            fping = shutil.which("fping")
+            if fping is not None:
+                await self._run_fping(fping, batch, timeout)
+            else:
+                await self._run_python(batch, timeout)
+        except Exception:
+            logger.exception("Batch probe of %d hosts failed", len(batch))
+        finally:
+            for ip in list(batch):
+                _resolve(batch, ip, None)
+
+    async def _run_fping(
+        self, fping: str, batch: dict[str, list[asyncio.Future]], timeout: float
+    ) -> None:
+        args = [fping, "-e", "-r", "0", "-t", str(int(timeout * 1000)), *batch]
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            async with asyncio.timeout(timeout + 5):
+                async for line in proc.stdout:
+                    parsed = parse_fping_line(line.decode(errors="replace"))
+                    if parsed is not None:
+                        _resolve(batch, *parsed)
+                await proc.wait()
+        except TimeoutError:
+            logger.warning("fping did not finish, terminating it")
+        finally:
+            # Also reached when the batch is cancelled by close()
+            if proc.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+                await proc.wait()
+
+    async def _run_python(
+        self, batch: dict[str, list[asyncio.Future]], timeout: float
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        prober = get_prober()
+
+        async def run(ip: str) -> None:
+            async with semaphore:
+                if prober is not None and is_ipv4(ip):
+                    rtt = await prober.ping(ip, timeout)
+                else:
+                    rtt = await ping_command(ip)
+            _resolve(batch, ip, rtt)
+
+        await asyncio.gather(*(run(ip) for ip in batch))
+
+
+def parse_fping_line(line: str) -> tuple[str, float | None] | None:
+    """Parse one line of ``fping -e`` output.
+
+    Returns ``(host, rtt)`` where ``rtt`` is in seconds and ``None`` for
+    unreachable hosts, or ``None`` if the line is not a result.
+    """
+    match = _FPING_RE.match(line.strip())
+    if match is None:
+        return None
+    if match["state"] == "unreachable":
+        return match["host"], None
+    rtt = match["rtt"]
+    return match["host"], float(rtt) / 1000 if rtt else 0.0
+
+
+def _resolve(
+    batch: dict[str, list[asyncio.Future]], ip: str, rtt: float | None
+) -> None:
+    for fut in batch.pop(ip, []):
+        if not fut.done():
+            fut.set_result(rtt)
+
+
+PROBE_BACKENDS = {
+    ProbeBackend.name: ProbeBackend,
+    PingCommandBackend.name: PingCommandBackend,
+    FpingBackend.name: FpingBackend,
+}
+
+
+def get_backend(name: str = "auto") -> ProbeBackend:
+    """Create the probe backend called ``name``."""
+    try:
+        return PROBE_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown probe backend: {name}") from None
@@ -0,0 +1,110 @@
+"""Cached, conditionally served and compressed response bodies."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import time
+from typing import Any, Callable, Hashable
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+class Rendered:
+    """A serialized body with its entity tag and compressed variants."""
+
+    __slots__ = ("body", "etag", "content_type", "_encoded")
+
+    def __init__(self, body: bytes, content_type: str = "application/json") -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._encoded: dict[str, bytes] = {}
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """Return whether an ``If-None-Match`` header matches this body."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def encode(self, accept_encoding: str | None) -> tuple[bytes, str | None]:
+        """Return the body and its content encoding for ``Accept-Encoding``.
+
+        Compressed variants are created once and reused.
+        """
+        encoding = negotiate_encoding(accept_encoding, len(self.body))
+        if encoding is None:
+            return self.body, None
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=5)
+            else:
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self._encoded[encoding] = data
+        return data, encoding
+
+
+def negotiate_encoding(accept_encoding: str | None, size: int) -> str | None:
+    """Pick ``br`` or ``gzip`` from ``Accept-Encoding`` for a ``size`` byte body."""
+    if not accept_encoding or size < MIN_COMPRESS_SIZE:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def render_json(data: Any) -> Rendered:
+    return Rendered(json.dumps(data, separators=(",", ":")).encode())
+
+
+class SnapshotCache:
+    """Keep the rendered body of ``build()`` until ``key`` changes.
+
+    With ``max_age`` the body is also rebuilt once it is older than that
+    many seconds, for data that changes without changing the key.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Any],
+        max_age: float | None = None,
+        render: Callable[[Any], Rendered] = render_json,
+    ) -> None:
+        self._build = build
+        self._render = render
+        self.max_age = max_age
+        self._key: Hashable = None
+        self._built = 0.0
+        self._rendered: Rendered | None = None
+
+    def get(self, key: Hashable) -> Rendered:
+        now = time.monotonic()
+        if (
+            self._rendered is None
+            or key != self._key
+            or (self.max_age is not None and now - self._built >= self.max_age)
+        ):
+            self._rendered = self._render(self._build())
+            self._key = key
+            self._built = now
+        return self._rendered
+
+    def invalidate(self) -> None:
+        self._rendered = None
@@ -0,0 +1,201 @@
+"""Wake-on-LAN magic packets and a shared asynchronous sender."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
+
+from .util import parse_mac_address
+
+if TYPE_CHECKING:
+    from .entities import WakeOnLanSwitch
+
+logger = logging.getLogger(__name__)
+
+
+def build_magic_packet(mac: str) -> bytes:
+    """Return the 102 byte magic packet waking ``mac``.
+
+    ``ValueError`` is raised for invalid MAC addresses.
+    """
+    return b"\xff" * 6 + parse_mac_address(mac) * 16
+
+
+class WolSender(asyncio.DatagramProtocol):
+    """Broadcast-enabled datagram transport shared by all WOL switches.
+
+    The socket is opened once on the event loop; :meth:`send` only queues
+    the datagram and never blocks.
+    """
+
+    def __init__(self) -> None:
+        self._transport: asyncio.DatagramTransport | None = None
+        self._opening: asyncio.Task | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.closed = False
+
+    async def open(self) -> None:
+        """Create the datagram transport on the running loop.
+
+        Concurrent callers share a single attempt.
+        """
+        if self._opening is None:
+            self.loop = asyncio.get_running_loop()
+            self._opening = self.loop.create_task(
+                self.loop.create_datagram_endpoint(
+                    lambda: self, family=socket.AF_INET, allow_broadcast=True
+                )
+            )
+        await asyncio.shield(self._opening)
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._transport = None
+        self.closed = True
+
+    def error_received(self, exc: Exception) -> None:
+        logger.error("Failed to send WOL packet: %s", exc)
+
+    def send(self, packet: bytes, address: str = "<broadcast>", port: int = 9) -> None:
+        """Send ``packet`` to ``address``:``port``."""
+        if self._transport is None:
+            raise RuntimeError("WOL sender is not open")
+        self._transport.sendto(packet, (address, port))
+
+    def close(self) -> None:
+        self.closed = True
+        if self._transport is not None:
+            try:
+                self._transport.close()
+            except RuntimeError:
+                # The loop the transport belongs to is already closed.
+                pass
+            self._transport = None
+
+
+_shared: WolSender | None = None
+
+
+async def get_sender() -> WolSender:
+    """Return the sender shared on the running loop, opening it if needed."""
+    global _shared
+    loop = asyncio.get_running_loop()
+    if _shared is None or _shared.closed or _shared.loop not in (None, loop):
+        if _shared is not None:
+            _shared.close()
+        _shared = WolSender()
+    sender = _shared
+    try:
+        await sender.open()
+    except OSError:
+        sender.close()
+        raise
+    return sender
+
+
+async def wake_many(
+    switches: Iterable[WakeOnLanSwitch],
+    stagger: float = 1.0,
+    concurrency: int = 4,
+    repeat: int = 3,
+    repeat_interval: float = 1.0,
+    progress: Callable[[WakeOnLanSwitch, bool, int, int], None] | None = None,
+) -> list[bool]:
+    """Wake many devices over the shared sender without waking them all at once.
+
+    Devices are started in order at least ``stagger`` seconds apart and at
+    most ``concurrency`` of them are being sent packets at the same time.
+    Each device receives ``repeat`` magic packets ``repeat_interval``
+    seconds apart. ``progress`` is called as ``(switch, ok, done, total)``
+    whenever a device completes. Returns whether sending succeeded for
+    each device, in input order.
+    """
+    switches = list(switches)
+    total = len(switches)
+    results = [False] * total
+    if not switches:
+        return results
+    sender = await get_sender()
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    done = 0
+
+    async def wake(index: int, switch: WakeOnLanSwitch) -> None:
+        nonlocal done
+        try:
+            for attempt in range(max(repeat, 1)):
+                if attempt:
+                    await asyncio.sleep(repeat_interval)
+                sender.send(switch.packet, switch.broadcast, switch.port)
+        except (OSError, RuntimeError, ValueError) as exc:
+            logger.error("Failed to wake %s: %s", switch.device_name, exc)
+        else:
+            results[index] = True
+        finally:
+            semaphore.release()
+        done += 1
+        if progress is not None:
+            progress(switch, results[index], done, total)
+
+    tasks = []
+    try:
+        for index, switch in enumerate(switches):
+            if index:
+                await asyncio.sleep(stagger)
+            await semaphore.acquire()
+            tasks.append(asyncio.ensure_future(wake(index, switch)))
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+    return results
+
+
+async def wake_and_confirm(
+    switch: WakeOnLanSwitch,
+    is_online: Callable[[], Awaitable[bool]],
+    packets: int = 3,
+    retry_interval: float = 1.0,
+    poll_interval: float = 2.0,
+    timeout: float = 180.0,
+    on_sent: Callable[[], None] | None = None,
+) -> dict[str, Any]:
+    """Wake a device and wait until ``is_online`` reports it reachable.
+
+    ``packets`` magic packets are sent ``retry_interval`` seconds apart
+    while reachability is polled every ``poll_interval`` seconds until the
+    device is online or ``timeout`` seconds have passed. ``on_sent`` is
+    called once the last packet has been sent. The result holds
+    ``online``, the number of ``packets`` sent and ``wake_to_online``, the
+    seconds from the first packet until the device answered.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout
+    next_send = start
+    sent = 0
+    while True:
+        now = loop.time()
+        if sent < packets and now >= next_send:
+            await switch.async_turn_on()
+            sent += 1
+            next_send = now + retry_interval
+            if sent == packets and on_sent is not None:
+                on_sent()
+        if await is_online():
+            return {
+                "online": True,
+                "packets": sent,
+                "wake_to_online": round(loop.time() - start, 3),
+            }
+        now = loop.time()
+        if now >= deadline:
+            return {"online": False, "packets": sent, "wake_to_online": None}
+        wake_at = min(now + poll_interval, deadline)
+        if sent < packets:
+            wake_at = min(wake_at, next_send)
+        await asyncio.sleep(max(wake_at - now, 0))